@@ -0,0 +1,118 @@
+# app/api/endpoints/feed.py
+"""
+WebSocket でゲームの状態の差分を配信する。
+
+接続すると全体のスナップショット、その後はエンドポイントの処理が終わるたびと
+ラウンドが進むたびに、変わった部分だけの差分をバージョン番号付きで送る
+（アクション1つごとには状態を組み立てない）。
+
+    {"type": "snapshot", "version": 12, "state": {...GameStateResponse...}}
+    {"type": "delta", "version": 13, "changes": {"pot": 300, ...}, "seats": [{...変わった座席...}]}
+
+切断後は ?since=<最後に受け取ったバージョン> で再接続すると、残っている差分から再開する
+（古すぎる場合はスナップショットが送られる）。
+"""
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from app.models.enum import GameEvent
+from app.models.events import EventSink
+from app.models.game_state import GameState
+from .helpers import format_game_state_for_response
+
+# 差分を配信するきっかけになるイベント（ラウンドの区切り）。アクションはエンドポイントがまとめて配信する
+_PUBLISH_EVENTS = (GameEvent.ROUND_STARTED, GameEvent.HAND_COMPLETE)
+DEFAULT_HISTORY = 256
+
+
+def diff_states(old: Dict[str, Any], new: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """2つの状態 (JSON) の差分。座席は変わったものだけを入れる。変化がなければ None"""
+    changes = {key: value for key, value in new.items() if key != "seats" and old.get(key) != value}
+    seats = [seat for seat, before in zip(new["seats"], old["seats"]) if seat != before]
+    if not changes and not seats:
+        return None
+    return {"changes": changes, "seats": seats}
+
+
+def apply_delta(state: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """差分を状態に適用した新しい状態を返す（クライアントと同じ手順）"""
+    state = {**state, **delta["changes"]}
+    seats = list(state["seats"])
+    for seat in delta["seats"]:
+        seats[seat["index"]] = seat
+    state["seats"] = seats
+    return state
+
+
+class GameFeed(EventSink):
+    """
+    1ゲーム分の配信。ゲームのイベントを受け取るたびに直近の状態との差分を購読者に送る。
+    購読者がいない間は状態を組み立てない（次の接続ではスナップショットを送る）。
+    game_lock はエンドポイントがゲームを進める間に持つロックで、スナップショットもその中で作る。
+    """
+
+    def __init__(self, game_id: str, game_state: GameState, game_lock: Optional[threading.Lock] = None,
+                 history: int = DEFAULT_HISTORY):
+        self.game_id = game_id
+        self.game_state = game_state
+        self.game_lock = game_lock if game_lock is not None else threading.Lock()
+        self.version = 0
+        self._state: Optional[Dict[str, Any]] = None
+        self._message: Optional[str] = None
+        self._deltas: deque = deque(maxlen=history)
+        # 購読者のキュー -> そのキューのイベントループ（エンドポイントは別スレッドから publish する）
+        self._subscribers: Dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        self._lock = threading.Lock()
+
+    def emit(self, event: GameEvent, **data) -> None:
+        if event in _PUBLISH_EVENTS:
+            self.publish()
+
+    def _render(self) -> Dict[str, Any]:
+        response = format_game_state_for_response(self.game_id, self.game_state, self._message)
+        return response.model_dump(mode="json")
+
+    def publish(self, message: Optional[str] = None) -> None:
+        """現在の状態との差分を購読者に送る。message を渡すと last_message を更新する"""
+        with self._lock:
+            if message is not None:
+                self._message = message
+            if not self._subscribers:
+                self._state = None
+                self._deltas.clear()
+                return
+            state = self._render()
+            delta = diff_states(self._state, state)
+            if delta is None:
+                return
+            self.version += 1
+            update = {"type": "delta", "version": self.version, **delta}
+            self._deltas.append(update)
+            self._state = state
+            for queue, loop in self._subscribers.items():
+                loop.call_soon_threadsafe(queue.put_nowait, update)
+
+    def subscribe(self, queue: asyncio.Queue, loop: asyncio.AbstractEventLoop,
+                  since: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        購読を始め、最初に送るメッセージ（since 以降の差分、またはスナップショット）を返す。
+        ゲームのロックを待つので、イベントループからはスレッドで呼ぶこと。
+        """
+        with self.game_lock, self._lock:
+            if self._state is None:
+                # 購読者がいない間の差分は残していないので、新しいバージョンとして状態を作る
+                self._state = self._render()
+                self.version += 1
+                self._deltas.clear()
+            self._subscribers[queue] = loop
+            if since is not None and since <= self.version:
+                oldest = self._deltas[0]["version"] if self._deltas else self.version + 1
+                if since + 1 >= oldest:
+                    return [d for d in self._deltas if d["version"] > since]
+            return [{"type": "snapshot", "version": self.version, "state": self._state}]
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers.pop(queue, None)
@@ -1,7 +1,9 @@
 # app/api/endpoints/games.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional, Any
+import asyncio
+import threading
 import uuid
 
 # 必要なモデルとサービスをインポート
@@ -9,14 +11,18 @@ from app.models.game_state import GameState
 from app.models.player import Player
 from app.models.action import Action as GameAction
 from app.models.enum import GameStatus, SeatStatus, ActionType
+from app.models.events import CompositeEventSink
 from app.services import hand_manager, action_service, round_manager
 from .helpers import (
     format_game_state_for_response, 
     get_game_or_404,
     _advance_game_until_human_action,
     _progress_to_next_stage,
-    GameStateResponse
+    GameStateResponse,
+    PlayerStatsInfo,
+    PLAYER_STATS,
 )
+from .feed import GameFeed
 
 # --- ルーターの作成 ---
 router = APIRouter(
@@ -26,6 +32,10 @@ router = APIRouter(
 
 # --- グローバルなゲームストレージ ---
 games: Dict[str, GameState] = {}
+# ゲームごとの WebSocket 配信
+feeds: Dict[str, GameFeed] = {}
+# ゲームごとのロック。状態を読み書きするエンドポイントと配信のスナップショットはこの中で行う
+game_locks: Dict[str, threading.Lock] = {}
 
 # --- Pydanticモデル (APIリクエストの型定義) ---
 
@@ -56,6 +66,9 @@ def create_game(req: GameCreateRequest):
         small_blind=req.small_blind,
         seat_count=req.seat_count
     )
+    lock = threading.Lock()
+    feed = GameFeed(game_id, game_state, lock)
+    game_state.event_sink = CompositeEventSink(PLAYER_STATS.game_sink(), feed)
 
     human_player_found = False
     for i, p_info in enumerate(req.players):
@@ -68,29 +81,53 @@ def create_game(req: GameCreateRequest):
     if not human_player_found:
         raise HTTPException(status_code=400, detail="At least one human player is required.")
 
-    games[game_id] = game_state
-    
-    hand_manager.start_new_hand(game_state)
-    message = "New hand started. "
-    
-    if game_state.status == GameStatus.IN_PROGRESS:
-        message += _advance_game_until_human_action(game_state, games)
+    with lock:
+        games[game_id] = game_state
+        feeds[game_id] = feed
+        game_locks[game_id] = lock
 
-    return format_game_state_for_response(game_id, game_state, message)
+        hand_manager.start_new_hand(game_state)
+        message = "New hand started. "
+
+        if game_state.status == GameStatus.IN_PROGRESS:
+            message += _advance_game_until_human_action(game_state, games)
+
+        feed.publish(message)
+        return format_game_state_for_response(game_id, game_state, message)
 
 
 @router.get("/{game_id}", response_model=GameStateResponse)
 def get_game_state(game_id: str):
     """指定されたゲームの現在の状態を取得します。"""
     game_state = get_game_or_404(game_id, games)
-    return format_game_state_for_response(game_id, game_state)
+    with game_locks[game_id]:
+        return format_game_state_for_response(game_id, game_state)
+
+
+@router.get("/{game_id}/stats", response_model=List[PlayerStatsInfo])
+def get_player_stats(game_id: str):
+    """着席しているプレイヤーの統計（VPIP・PFR・AFなど）を取得します。"""
+    game_state = get_game_or_404(game_id, games)
+    with game_locks[game_id]:
+        players = [seat.player for seat in game_state.table.seats if seat.is_occupied]
+    stats = []
+    for player in players:
+        profile = PLAYER_STATS.profile(player.player_id)
+        if profile is None:
+            continue
+        stats.append(PlayerStatsInfo(player_id=player.player_id, name=player.name, **profile._asdict()))
+    return stats
 
 
 @router.post("/{game_id}/action", response_model=GameStateResponse)
 def player_action(game_id: str, action: ActionPayload):
     """人間プレイヤーのアクションを処理します。"""
     game_state = get_game_or_404(game_id, games)
-    
+    with game_locks[game_id]:
+        return _player_action(game_id, game_state, action)
+
+
+def _player_action(game_id: str, game_state: GameState, action: ActionPayload) -> GameStateResponse:
     if game_state.status != GameStatus.IN_PROGRESS:
         raise HTTPException(status_code=400, detail="Game is not in progress.")
 
@@ -102,10 +139,11 @@ def player_action(game_id: str, action: ActionPayload):
     if not current_seat.player or current_seat.player.player_id != action.player_id:
         raise HTTPException(status_code=403, detail="It's not your turn.")
 
-    # TODO: アクションの正当性検証 (ValidActionに含まれているかなど)
-    
     game_action = GameAction(player_id=action.player_id, action_type=action.action_type, amount=action.amount)
-    action_service.process_action(game_state, game_action)
+    try:
+        action_service.process_action(game_state, game_action, validate=True)
+    except action_service.InvalidActionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     message = f"{current_seat.player.name} chose {action.action_type.name} {action.amount or ''}. "
     
     if round_manager.is_betting_round_over(game_state):
@@ -118,6 +156,7 @@ def player_action(game_id: str, action: ActionPayload):
     if game_state.status == GameStatus.IN_PROGRESS:
         message += _advance_game_until_human_action(game_state, games)
 
+    feeds[game_id].publish(message)
     return format_game_state_for_response(game_id, game_state, message)
 
 
@@ -125,7 +164,11 @@ def player_action(game_id: str, action: ActionPayload):
 def start_next_hand(game_id: str):
     """現在のハンドを終了し、次のハンドを開始します。"""
     game_state = get_game_or_404(game_id, games)
-    
+    with game_locks[game_id]:
+        return _start_next_hand(game_id, game_state)
+
+
+def _start_next_hand(game_id: str, game_state: GameState) -> GameStateResponse:
     if game_state.status not in [GameStatus.HAND_COMPLETE, GameStatus.WAITING]:
         raise HTTPException(status_code=400, detail="Cannot start a new hand yet.")
          
@@ -135,11 +178,51 @@ def start_next_hand(game_id: str):
 
     hand_manager.start_new_hand(game_state)
     if game_state.status == GameStatus.WAITING:
+        feeds[game_id].publish("Waiting for more players.")
         return format_game_state_for_response(game_id, game_state, "Waiting for more players.")
 
     message = "Started next hand. "
     if game_state.status == GameStatus.IN_PROGRESS:
         message += _advance_game_until_human_action(game_state, games)
     
+    feeds[game_id].publish(message)
     return format_game_state_for_response(game_id, game_state, message)
 
+
+@router.websocket("/{game_id}/ws")
+async def game_updates(websocket: WebSocket, game_id: str, since: Optional[int] = None):
+    """
+    ゲームの状態を配信します。接続時にスナップショット（since を渡すとその続きの差分）、
+    以降は状態が変わるたびに差分を送ります。
+    """
+    feed = feeds.get(game_id)
+    if feed is None:
+        await websocket.close(code=4404)
+        return
+    await websocket.accept()
+
+    queue: asyncio.Queue = asyncio.Queue()
+    # エンドポイントがゲームを進めている間はスナップショットを作らないよう、ロックはスレッドで待つ
+    initial = await asyncio.to_thread(feed.subscribe, queue, asyncio.get_running_loop(), since)
+    receiver = asyncio.ensure_future(websocket.receive())
+    try:
+        for update in initial:
+            await websocket.send_json(update)
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                await websocket.send_json(getter.result())
+            else:
+                getter.cancel()
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    break
+                # クライアントからのメッセージは使わない
+                receiver = asyncio.ensure_future(websocket.receive())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        feed.unsubscribe(queue)
+
@@ -5,10 +5,16 @@ from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
 
 from app.models.game_state import GameState
+from app.models.deck import FULL_DECK
 from app.models.enum import ActionType, Round, GameStatus, SeatStatus, Position
 from app.models.action import Action as GameAction
 from app.services import action_service, hand_manager, round_manager
 from app.services.ai import ai_agent_service
+from app.services.ai.decision_cache import DecisionCache
+from app.services.ai.postflop_policy import PostflopPolicy
+from app.services.ai.preflop_tree_solver import get_preflop_tree_table
+from app.services.ai.push_fold_solver import get_push_fold_table
+from app.services.stats_service import PlayerStatsTracker
 
 # --- Pydanticモデル (APIレスポンスの型定義) ---
 class PlayerInfo(BaseModel):
@@ -20,6 +26,9 @@ class CardInfo(BaseModel):
     rank: str
     suit: str
 
+# 52枚分のCardInfoを事前に生成しておき、カードIDで引く
+_CARD_INFOS = tuple(CardInfo(rank=c.rank, suit=c.suit) for c in FULL_DECK)
+
 class SeatInfo(BaseModel):
     index: int
     is_occupied: bool
@@ -31,20 +40,43 @@ class SeatInfo(BaseModel):
     position: Optional[Position]
     hole_cards: List[CardInfo]
 
+class PotInfo(BaseModel):
+    amount: int
+    eligible_seats: List[int]
+
 class GameStateResponse(BaseModel):
     game_id: str
     status: GameStatus
     seats: List[SeatInfo]
     community_cards: List[CardInfo]
     pot: int
+    pots: List[PotInfo] = []
     current_round: Round
     current_seat_index: Optional[int]
     amount_to_call: int
     last_message: Optional[str] = None
     valid_actions: Optional[List[Dict[str, Any]]] = None
 
+class PlayerStatsInfo(BaseModel):
+    player_id: str
+    name: str
+    hands: int
+    vpip: float
+    pfr: float
+    three_bet: float
+    fold_to_cbet: float
+    aggression_factor: float
+    went_to_showdown: float
+
 # --- ヘルパー関数 ---
 
+# AIの判断のキャッシュ（全ゲームで共有。キーはBB単位に正規化されている）
+DECISION_CACHE = DecisionCache(maxsize=8192)
+# フロップ以降のAI（1回の判断は20ms以内）
+POSTFLOP_POLICY = PostflopPolicy(time_budget=0.02)
+# プレイヤーごとの統計（全ゲームで共有。ゲームごとに game_sink() で受け取り先を作る）
+PLAYER_STATS = PlayerStatsTracker()
+
 def get_game_or_404(game_id: str, games: Dict[str, GameState]) -> GameState:
     if game_id not in games:
         raise HTTPException(status_code=404, detail="Game not found")
@@ -71,11 +103,15 @@ def format_game_state_for_response(game_id: str, game_state: GameState, message:
                 bet_total=s.bet_total,
                 status=s.status,
                 position=s.position,
-                hole_cards=[CardInfo(rank=c.rank, suit=c.suit) for c in s.hole_cards] if s.player and not s.player.is_ai else [],
+                hole_cards=[_CARD_INFOS[c.id] for c in s.hole_cards] if s.player and not s.player.is_ai else [],
             ) for s in game_state.table.seats
         ],
-        community_cards=[CardInfo(rank=c.rank, suit=c.suit) for c in game_state.table.community_cards],
+        community_cards=[_CARD_INFOS[c.id] for c in game_state.table.community_cards],
         pot=game_state.table.pot,
+        pots=[
+            PotInfo(amount=p.amount, eligible_seats=sorted(p.eligible))
+            for p in game_state.table.pot_ledger.active_pots()
+        ],
         current_round=game_state.current_round,
         current_seat_index=game_state.current_seat_index,
         amount_to_call=game_state.amount_to_call,
@@ -95,7 +131,10 @@ def _advance_game_until_human_action(game_state: GameState, games: Dict[str, Gam
             return message
 
         if current_seat.status == SeatStatus.ACTIVE:
-            action = ai_agent_service.decide_action(game_state)
+            action = ai_agent_service.decide_action(
+                game_state, cache=DECISION_CACHE, postflop=POSTFLOP_POLICY, push_fold=get_push_fold_table(),
+                preflop_tree=get_preflop_tree_table(),
+            )
             message += f"{current_seat.player.name} chose {action.action_type.name} {action.amount or ''}. "
             action_service.process_action(game_state, action)
 
@@ -117,6 +156,7 @@ def _progress_to_next_stage(game_state: GameState) -> str:
         return "Hand concluded."
 
     game_state.table.collect_bets()
+    game_state.version += 1
     
     current_round_index = list(Round).index(game_state.current_round)
     if current_round_index < list(Round).index(Round.RIVER):
@@ -0,0 +1,9 @@
+# app/config.py
+import os
+from pathlib import Path
+
+# 事前計算テーブルなどの生成物を置くディレクトリ（環境変数 POKER_DATA_DIR で上書き可能）
+DATA_DIR = Path(os.environ.get("POKER_DATA_DIR", Path(__file__).resolve().parent.parent / "data"))
+
+# 1 にすると、差分で更新しているカウンタを毎回座席の走査と突き合わせる（デバッグ用）
+CHECK_COUNTERS = os.environ.get("POKER_CHECK_COUNTERS", "") == "1"
@@ -1,14 +1,33 @@
 # app/main.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .api.endpoints import games
+from .services import preflop_equity
+from .services.ai import card_abstraction, postflop_policy, preflop_tree_solver, push_fold_solver
+from .services.hand_evaluator import get_hand_evaluator
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 事前計算テーブルは起動時に読み込み (memmap) しておき、リクエスト中に構築しない
+    get_hand_evaluator()
+    postflop_policy.warm_up()
+    preflop_equity.get_preflop_tables()
+    push_fold_solver.get_push_fold_table()
+    preflop_tree_solver.get_preflop_tree_table()
+    for street in card_abstraction.STREETS:
+        card_abstraction.get_card_abstraction(street)
+    yield
 
 # FastAPIアプリケーションのインスタンスを作成
 app = FastAPI(
     title="Texas Hold'em API",
     description="A simple API to manage a Texas Hold'em game.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # --- CORSミドルウェアの設定 ---
@@ -1,5 +1,5 @@
 # holdem_app/app/models/action.py
-from typing import Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 from dataclasses import dataclass
 from .enum import ActionType
 
@@ -8,4 +8,67 @@ class Action:
     """プレイヤーのアクションを表すクラス"""
     player_id: str
     action_type: ActionType
-    amount: Optional[int] = None
\ No newline at end of file
+    amount: Optional[int] = None
+
+class ValidActions(NamedTuple):
+    """
+    ある座席が選べるアクションとその額の範囲。
+    選べないアクションの額は None（コールできなければ call_amount は 0）。
+    """
+    can_check: bool
+    call_amount: int = 0
+    min_bet: Optional[int] = None
+    max_bet: Optional[int] = None
+    min_raise: Optional[int] = None
+    max_raise: Optional[int] = None
+
+    @property
+    def can_fold(self) -> bool:
+        return not self.can_check
+
+    @property
+    def can_call(self) -> bool:
+        return self.call_amount > 0
+
+    @property
+    def can_bet(self) -> bool:
+        return self.min_bet is not None
+
+    @property
+    def can_raise(self) -> bool:
+        return self.min_raise is not None
+
+    def allows(self, action_type: ActionType) -> bool:
+        if action_type == ActionType.CHECK:
+            return self.can_check
+        if action_type == ActionType.FOLD:
+            return not self.can_check
+        if action_type == ActionType.CALL:
+            return self.call_amount > 0
+        if action_type == ActionType.BET:
+            return self.min_bet is not None
+        if action_type == ActionType.RAISE:
+            return self.min_raise is not None
+        return False
+
+    def bounds(self, action_type: ActionType) -> Optional[Tuple[int, int]]:
+        """ベット・レイズの (最小, 最大) の額。選べなければ None"""
+        if action_type == ActionType.BET and self.min_bet is not None:
+            return self.min_bet, self.max_bet
+        if action_type == ActionType.RAISE and self.min_raise is not None:
+            return self.min_raise, self.max_raise
+        return None
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """API などで使う辞書のリスト形式（get_valid_actions と同じ）"""
+        if self.can_check:
+            actions = [{"type": ActionType.CHECK}]
+            if self.min_bet is not None:
+                actions.append({"type": ActionType.BET, "min": self.min_bet, "max": self.max_bet})
+            return actions
+        actions = [{"type": ActionType.FOLD}]
+        if self.call_amount > 0:
+            actions.append({"type": ActionType.CALL, "amount": self.call_amount})
+        if self.min_raise is not None:
+            actions.append({"type": ActionType.RAISE, "min": self.min_raise, "max": self.max_raise})
+        return actions
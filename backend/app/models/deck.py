@@ -1,51 +1,161 @@
 # app/models/deck.py
 import random
-from typing import List
+from typing import List, Optional, Tuple
+
+import numpy as np
 from treys import Card as TreysCard
 
 
 class Card:
-    
+    """
+    トランプ1枚を表すクラス。
+    52枚すべてがモジュール読み込み時に1度だけ生成され、以降は同じインスタンスが共有される。
+    treys形式の整数・ランク/スートのインデックス・ビットマスクも生成時に計算済み。
+    """
+
+    __slots__ = ("rank", "suit", "id", "rank_index", "suit_index", "treys_int", "mask")
+
     rank_order = "23456789TJQKA"
     suit_map = {"s": "♠", "h": "♥", "d": "♦", "c": "♣"}
+    suit_order = "shdc"
 
-    def __init__(self, rank: str, suit: str):
-        if rank not in self.rank_order:
+    def __new__(cls, rank: str, suit: str) -> "Card":
+        # 生成済みのカードを返す（新しいインスタンスは作らない）
+        card = _CARDS_BY_NAME.get((rank, suit))
+        if card is not None:
+            return card
+        if rank not in cls.rank_order:
             raise ValueError(f"Invalid card rank: {rank}")
-        if suit not in self.suit_map:
-            raise ValueError(f"Invalid card suit: {suit}")
+        raise ValueError(f"Invalid card suit: {suit}")
+
+    @classmethod
+    def _create(cls, rank: str, suit: str) -> "Card":
+        """モジュール初期化時にのみ使う生成処理"""
+        card = object.__new__(cls)
+        rank_index = cls.rank_order.index(rank)
+        suit_index = cls.suit_order.index(suit)
+        card_id = rank_index * 4 + suit_index
+        set_attr = object.__setattr__
+        set_attr(card, "rank", rank)
+        set_attr(card, "suit", suit)
+        set_attr(card, "id", card_id)
+        set_attr(card, "rank_index", rank_index)
+        set_attr(card, "suit_index", suit_index)
+        set_attr(card, "treys_int", TreysCard.new(rank + suit))
+        set_attr(card, "mask", 1 << card_id)
+        return card
+
+    @staticmethod
+    def from_id(card_id: int) -> "Card":
+        """カードID (0-51) から対応するカードを返す"""
+        return FULL_DECK[card_id]
 
-        self.rank = rank
-        self.suit = suit
+    def __setattr__(self, name, value):
+        raise AttributeError("Card is immutable")
+
+    def __reduce__(self):
+        # pickle 後も同じインスタンスに復元されるようにする
+        return (Card, (self.rank, self.suit))
+
+    def __copy__(self) -> "Card":
+        return self
+
+    def __deepcopy__(self, memo) -> "Card":
+        return self
 
     def __str__(self) -> str:
         return f"{self.rank}{self.suit_map[self.suit]}"
-    
+
     def __repr__(self) -> str:
         return f"Card('{self.rank}', '{self.suit}')"
 
     def to_treys_int(self) -> int:
-        return TreysCard.new(self.rank + self.suit)
+        return self.treys_int
+
+
+_CARDS_BY_NAME: dict = {}
+
+# カードID順 (rank_index * 4 + suit_index) に並んだ52枚
+FULL_DECK: Tuple[Card, ...] = tuple(
+    Card._create(rank, suit)
+    for rank in Card.rank_order
+    for suit in Card.suit_order
+)
+_CARDS_BY_NAME.update({(c.rank, c.suit): c for c in FULL_DECK})
+
+
+class PermutationPool:
+    """
+    NumPy でまとめて生成したシャッフル順を保持する（大量シミュレーション用）。
+    index 番目の並びは (seed, index) だけで決まるので、同じ seed のプールから再現できる。
+    """
+
+    BATCH_SIZE = 1024
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self._batch_index: Optional[int] = None
+        self._batch: Optional[np.ndarray] = None
+
+    def permutation(self, index: int) -> np.ndarray:
+        """index 番目のシャッフル順（カードIDの並び）を返す"""
+        if index < 0:
+            raise ValueError("Permutation index must be non-negative")
+        batch_index, row = divmod(index, self.BATCH_SIZE)
+        if batch_index != self._batch_index:
+            rng = np.random.default_rng([self.seed, batch_index])
+            self._batch = rng.random((self.BATCH_SIZE, 52)).argsort(axis=1).astype(np.int8)
+            self._batch_index = batch_index
+        return self._batch[row]
 
 
 class Deck:
+    """
+    52枚の並びを1つのリストで持ち、先頭から順に引くデッキ。
+    シャッフルはリストを並べ替えて引く位置を戻すだけで、カードは生成しない。
+    """
 
-    def __init__(self):
-        self.cards: List[Card] = [
-            Card(rank, suit)
-            for suit in Card.suit_map.keys()
-            for rank in Card.rank_order
-        ]
-        self.shuffle()
+    def __init__(self, seed: Optional[int] = None, permutations: Optional[PermutationPool] = None):
+        self.cards: List[Card] = list(FULL_DECK)
+        self.position: int = 0
+        self._rng = random.Random()
+        self._permutations = permutations
+        if permutations is not None and seed is None:
+            seed = 0
+        self.shuffle(seed)
 
-    def shuffle(self):
-        """デッキをシャッフル"""
-        random.shuffle(self.cards)
+    def shuffle(self, seed: Optional[int] = None):
+        """デッキをシャッフル。seed を指定すると、その seed だけで並びが決まる"""
+        if self._permutations is not None:
+            if seed is None:
+                raise ValueError("A seed (permutation index) is required for pooled shuffles")
+            order = self._permutations.permutation(seed)
+            self.cards = [FULL_DECK[i] for i in order.tolist()]
+        else:
+            if seed is not None:
+                # 直前の並びに依存しないよう、初期順に戻してからシャッフルする
+                self._rng.seed(seed)
+                self.cards[:] = FULL_DECK
+            self._rng.shuffle(self.cards)
+        self.position = 0
 
     def draw(self, n: int = 1) -> List[Card]:
         """カードをn枚引く"""
-        if n > len(self.cards):
+        end = self.position + n
+        if end > len(self.cards):
             raise ValueError("Not enough cards in the deck")
-        drawn = self.cards[:n]
-        self.cards = self.cards[n:]
+        drawn = self.cards[self.position:end]
+        self.position = end
         return drawn
+
+    def snapshot(self) -> tuple:
+        """並びと引く位置（シャッフルはリストをその場で並べ替えるのでコピーする）"""
+        return (list(self.cards), self.position)
+
+    def restore(self, state: tuple) -> None:
+        cards, self.position = state
+        self.cards = list(cards)
+
+    def __len__(self) -> int:
+        """残りの枚数"""
+        return len(self.cards) - self.position
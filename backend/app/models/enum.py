@@ -37,3 +37,17 @@ class GameStatus(str, Enum):
     WAITING = "WAITING"
     IN_PROGRESS = "IN_PROGRESS"
     HAND_COMPLETE = "HAND_COMPLETE"
+
+
+class GameEvent(str, Enum):
+    HAND_STARTED = "HAND_STARTED"
+    DEALER_BUTTON = "DEALER_BUTTON"
+    POSITION_ASSIGNED = "POSITION_ASSIGNED"
+    ROUND_STARTED = "ROUND_STARTED"
+    TURN_STARTED = "TURN_STARTED"
+    ACTION = "ACTION"
+    SHOWDOWN = "SHOWDOWN"
+    POT_AWARDED = "POT_AWARDED"
+    HAND_COMPLETE = "HAND_COMPLETE"
+    PLAYER_ELIMINATED = "PLAYER_ELIMINATED"
+    GAME_OVER = "GAME_OVER"
@@ -0,0 +1,26 @@
+# app/models/events.py
+from .enum import GameEvent
+
+
+class EventSink:
+    """
+    ゲーム進行中のイベントの受け取り先。
+    既定の実装は何もしないので、シミュレーションなどではコンソール出力のコストがかからない。
+    """
+
+    def emit(self, event: GameEvent, **data) -> None:
+        pass
+
+
+class CompositeEventSink(EventSink):
+    """複数の受け取り先にイベントを配る"""
+
+    def __init__(self, *sinks: EventSink):
+        self.sinks = list(sinks)
+
+    def emit(self, event: GameEvent, **data) -> None:
+        for sink in self.sinks:
+            sink.emit(event, **data)
+
+
+NULL_SINK = EventSink()
@@ -1,14 +1,17 @@
+import copy
 from typing import Optional
 from .deck import Deck
 from .table import Table
 from .action import Action
 from .enum import Round, GameStatus, ActionType
+from .events import EventSink, NULL_SINK
 
 class GameState:
     """ゲーム全体の進行状態を管理するクラス"""
-    def __init__(self, big_blind: int=100, small_blind: int=50, seat_count: int=6):
+    def __init__(self, big_blind: int=100, small_blind: int=50, seat_count: int=6,
+                 seed: Optional[int] = None, batch_shuffle: bool = False):
         # self.config: GameConfig = config  <- 削除
-        self.table: Table = Table(seat_count=seat_count)
+        self.table: Table = Table(seat_count=seat_count, seed=seed, batch_shuffle=batch_shuffle)
         self.status: GameStatus = GameStatus.WAITING
         self.current_round: Round = Round.PREFLOP
         self.history: list[Action] = []
@@ -24,15 +27,79 @@ class GameState:
         self.min_raise_amount: int = 0
         self.last_raiser_seat_index: Optional[int] = None
 
+        # 進行中のイベントの通知先（既定では何もしない）
+        self.event_sink: EventSink = NULL_SINK
+
+        # 状態が変わるたびに進む番号と、それに紐づく有効なアクションのキャッシュ
+        # (version, 座席インデックス, ValidActions)。直接状態を書き換えたら version を進めること
+        self.version: int = 0
+        self.valid_actions_cache: Optional[tuple] = None
+
+    def snapshot(self) -> tuple:
+        """
+        ハンド中に変化する状態だけをコピーしたスナップショットを返す（探索用）。
+        Player オブジェクトやブラインドなどの設定は共有し、restore() で元に戻せる。
+        """
+        return (
+            self.table.snapshot(),
+            self.status,
+            self.current_round,
+            list(self.history),
+            self.current_seat_index,
+            self.dealer_seat_index,
+            self.amount_to_call,
+            self.min_raise_amount,
+            self.last_raiser_seat_index,
+        )
+
+    def restore(self, snapshot: tuple) -> None:
+        """snapshot() の時点の状態に戻す"""
+        (table, self.status, self.current_round, history,
+         self.current_seat_index, self.dealer_seat_index, self.amount_to_call,
+         self.min_raise_amount, self.last_raiser_seat_index) = snapshot
+        self.table.restore(table)
+        self.history = list(history)
+        self.recount_settled()
+        self.version += 1
+
+    def clone(self) -> "GameState":
+        """
+        同じ状態の別の GameState を返す。Player・設定・イベントの受け取り先は共有する。
+        テーブル・座席・デッキ・台帳・hand_seed の乱数列は新しいオブジェクトになる
+        （複製でハンドを配っても元のゲームの次の配札は変わらない）。
+        """
+        table = copy.copy(self.table)
+        table._seed_rng = copy.copy(self.table._seed_rng)
+        table.seats = [copy.copy(seat) for seat in self.table.seats]
+        table.attach_seats()
+        table.deck = copy.copy(self.table.deck)
+        table.pot_ledger = copy.copy(self.table.pot_ledger)
+        clone = copy.copy(self)
+        clone.table = table
+        clone.restore(self.snapshot())
+        return clone
+
+    def recount_settled(self) -> None:
+        """
+        座席を走査して「アクション済みでコール額に揃っている」座席のビットマスクを作り直す。
+        通常は action_service が差分で更新するので、座席を直接書き換えたときだけ呼ぶ。
+        """
+        settled = 0
+        for seat in self.table.seats:
+            if seat.acted and seat.current_bet == self.amount_to_call:
+                settled |= 1 << seat.index
+        self.table.mask.settled = settled
+
     def add_action(self, player_id: str, action_type: ActionType, amount: Optional[int] = None):
         """アクションを履歴に追加する"""
         action = Action(player_id=player_id, action_type=action_type, amount=amount)
         self.history.append(action)
 
-    def clear_for_new_hand(self):
+    def clear_for_new_hand(self, hand_seed: Optional[int] = None):
         """次のハンドのためにゲーム状態をリセットする"""
-        self.table.reset()
+        self.table.reset(hand_seed)
         self.history = []
+        self.version += 1
 
         self.status = GameStatus.WAITING
         self.current_round = Round.PREFLOP
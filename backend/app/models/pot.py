@@ -0,0 +1,128 @@
+# app/models/pot.py
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+from .enum import SeatStatus
+
+
+@dataclass
+class Pot:
+    """メインポットまたはサイドポット"""
+    amount: int = 0
+    # このポットに入る1人あたりの累計拠出額の上限（オールイン額）。最上位のポットは None
+    cap: Optional[int] = None
+    # 獲得資格のある座席インデックス
+    eligible: Set[int] = field(default_factory=set)
+
+
+class PotLedger:
+    """
+    ベットが入るたびにメインポット・サイドポットを更新する台帳。
+    オールインが発生した額でポットを分割しておくので、ショウダウンでは結果を読むだけでよい。
+    """
+
+    def __init__(self, seat_count: int):
+        self.contributions: List[int] = [0] * seat_count
+        self.folded: List[bool] = [False] * seat_count
+        self.all_in_seats: Set[int] = set()
+        self.pots: List[Pot] = [Pot()]
+        self.total: int = 0
+
+    def reset(self) -> None:
+        """次のハンドのために台帳を空にする"""
+        seat_count = len(self.contributions)
+        self.contributions = [0] * seat_count
+        self.folded = [False] * seat_count
+        self.all_in_seats = set()
+        self.pots = [Pot()]
+        self.total = 0
+
+    def snapshot(self) -> tuple:
+        """台帳の状態をタプルで返す"""
+        return (
+            list(self.contributions),
+            list(self.folded),
+            set(self.all_in_seats),
+            [(pot.amount, pot.cap, set(pot.eligible)) for pot in self.pots],
+            self.total,
+        )
+
+    def restore(self, state: tuple) -> None:
+        contributions, folded, all_in_seats, pots, self.total = state
+        self.contributions = list(contributions)
+        self.folded = list(folded)
+        self.all_in_seats = set(all_in_seats)
+        self.pots = [Pot(amount, cap, set(eligible)) for amount, cap, eligible in pots]
+
+    def add(self, seat_index: int, amount: int) -> None:
+        """座席の拠出額を増やし、該当するポットに振り分ける"""
+        if amount <= 0:
+            return
+        before = self.contributions[seat_index]
+        after = before + amount
+        self.contributions[seat_index] = after
+        self.total += amount
+
+        lower = 0
+        for pot in self.pots:
+            upper = pot.cap
+            portion = (after if upper is None else min(after, upper)) - max(before, lower)
+            if portion > 0:
+                pot.amount += portion
+                if not self.folded[seat_index]:
+                    pot.eligible.add(seat_index)
+            if upper is None or after <= upper:
+                break
+            lower = upper
+
+    def fold(self, seat_index: int) -> None:
+        """フォールドした座席をすべてのポットの獲得資格から外す"""
+        self.folded[seat_index] = True
+        for pot in self.pots:
+            pot.eligible.discard(seat_index)
+
+    def all_in(self, seat_index: int) -> None:
+        """オールインした座席の拠出額でポットを分割する"""
+        if seat_index in self.all_in_seats:
+            return
+        self.all_in_seats.add(seat_index)
+        level = self.contributions[seat_index]
+        if level <= 0:
+            return
+
+        lower = 0
+        for i, pot in enumerate(self.pots):
+            upper = pot.cap
+            if level == upper:
+                return
+            if upper is None or level < upper:
+                break
+            lower = upper
+
+        # [lower, upper] のポットを [lower, level] と [level, upper] に分ける
+        below = sum(min(max(c - lower, 0), level - lower) for c in self.contributions)
+        split = Pot(
+            amount=below,
+            cap=level,
+            eligible=set(pot.eligible),
+        )
+        pot.amount -= below
+        pot.eligible = {s for s in pot.eligible if self.contributions[s] > level}
+        self.pots.insert(i, split)
+
+    def sync(self, seats) -> None:
+        """
+        座席の bet_total・ステータスと台帳の差分を取り込む。
+        process_action を通さずに直接ベットされた場合でも台帳を整合させる。
+        """
+        for seat in seats:
+            missing = seat.bet_total - self.contributions[seat.index]
+            if missing > 0:
+                self.add(seat.index, missing)
+            if seat.status == SeatStatus.FOLDED and not self.folded[seat.index]:
+                self.fold(seat.index)
+            elif seat.status == SeatStatus.ALL_IN:
+                self.all_in(seat.index)
+
+    def active_pots(self) -> List[Pot]:
+        """チップが入っているポットを下から順に返す"""
+        return [pot for pot in self.pots if pot.amount > 0]
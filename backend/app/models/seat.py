@@ -3,28 +3,93 @@ from .deck import Card
 from .player import Player
 from .enum import SeatStatus, Position
 
+class SeatMask:
+    """
+    テーブル全体の座席の状態のビットマスク（座席 i がビット i）。
+    座席の player / status が変わったときだけ更新される。
+    """
+
+    __slots__ = ("occupied", "active", "in_hand", "settled")
+
+    def __init__(self):
+        self.occupied = 0   # プレイヤーが座っている
+        self.active = 0     # まだアクションできる (ACTIVE)
+        self.in_hand = 0    # ハンドに残っている (ACTIVE / ALL_IN)
+        # このラウンドでアクション済みで、ベット額がコール額に揃っている（action_service が更新する）
+        self.settled = 0
+
+    def update(self, seat: "Seat") -> None:
+        bit = 1 << seat.index
+        status = seat._status
+        self.occupied = self.occupied | bit if seat._player is not None else self.occupied & ~bit
+        self.active = self.active | bit if status == SeatStatus.ACTIVE else self.active & ~bit
+        if status == SeatStatus.ACTIVE or status == SeatStatus.ALL_IN:
+            self.in_hand |= bit
+        else:
+            self.in_hand &= ~bit
+
+
 class Seat:
-    def __init__(self, index: int, player: Optional[Player] = None):
+    def __init__(self, index: int, player: Optional[Player] = None, mask: Optional[SeatMask] = None):
         self.index: int = index
-        self.player: Optional[Player] = player
+        self._mask = mask
+        self._player: Optional[Player] = None
+        self._status: SeatStatus = SeatStatus.OUT
+        self.player = player
         self.stack: int = 0
         self.hole_cards: list[Card] = []
         self.position: Optional[Position] = None
         self.current_bet: int = 0
         self.bet_total: int = 0
-        self.status: SeatStatus = SeatStatus.OUT
+        self.status = SeatStatus.OUT
         self.acted: bool = False
-        
+
+    @property
+    def player(self) -> Optional[Player]:
+        return self._player
+
+    @player.setter
+    def player(self, player: Optional[Player]) -> None:
+        self._player = player
+        if self._mask is not None:
+            self._mask.update(self)
+
+    @property
+    def status(self) -> SeatStatus:
+        return self._status
+
+    @status.setter
+    def status(self, status: SeatStatus) -> None:
+        self._status = status
+        if self._mask is not None:
+            self._mask.update(self)
+
+    def attach(self, mask: Optional[SeatMask]) -> None:
+        """状態を反映させるビットマスクを付け替える（テーブルの複製用）"""
+        self._mask = mask
+        if mask is not None:
+            mask.update(self)
+
     @property
     def is_occupied(self) -> bool:
         """プレイヤーが座っているかどうか"""
-        return self.player is not None
+        return self._player is not None
     
     @property
     def is_active(self) -> bool:
         """この座席がアクティブかどうか"""
         return self.is_occupied and self.status == SeatStatus.ACTIVE
 
+    def snapshot(self) -> tuple:
+        """ハンド中に変化する状態をタプルで返す（Player は共有する）"""
+        return (self.player, self.stack, self.hole_cards, self.position,
+                self.current_bet, self.bet_total, self.status, self.acted)
+
+    def restore(self, state: tuple) -> None:
+        """snapshot() の状態に戻す"""
+        (self.player, self.stack, self.hole_cards, self.position,
+         self.current_bet, self.bet_total, self.status, self.acted) = state
+
     def reset(self) -> None:
         """座席の状態をリセットする"""
         self.current_bet = 0
@@ -1,22 +1,131 @@
-from typing import List, Optional
-from .deck import Deck, Card
-from .seat import Seat
+import random
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from .deck import Deck, Card, PermutationPool
+from .enum import Position
+from .seat import Seat, SeatMask
 from .player import Player
+from .pot import PotLedger
+
+@lru_cache(maxsize=None)
+def mask_indices(seat_count: int) -> Tuple[Tuple[int, ...], ...]:
+    """ビットマスク -> 立っているビットの座席インデックス（昇順）の表"""
+    return tuple(
+        tuple(i for i in range(seat_count) if mask >> i & 1)
+        for mask in range(1 << seat_count)
+    )
+
+
+@lru_cache(maxsize=None)
+def next_seat_table(seat_count: int) -> Tuple[Tuple[int, ...], ...]:
+    """
+    [ビットマスク][開始座席] -> 開始座席の次（時計回り）でビットが立っている座席の表。
+    他に該当する座席がなければ開始座席自身（ビットが立っていなくても）を返す。
+    """
+    table = []
+    for mask in range(1 << seat_count):
+        row = []
+        for start in range(seat_count):
+            order = ((start + i) % seat_count for i in range(1, seat_count + 1))
+            row.append(next((i for i in order if mask >> i & 1), start))
+        table.append(tuple(row))
+    return tuple(table)
+
 
 class Table:
-    def __init__(self, seat_count: int = 6):
-        self.deck = Deck()
-        self.seats: List[Seat] = [Seat(index=i) for i in range(seat_count)]
+    def __init__(self, seat_count: int = 6, seed: Optional[int] = None, batch_shuffle: bool = False):
+        # テーブルごとに独立した乱数列からハンドごとの seed を作る（グローバルな random は使わない）
+        self.seed: Optional[int] = seed
+        self._seed_rng = random.Random(seed)
+        # batch_shuffle の場合は NumPy で事前生成した並びを順に使い、hand_seed はその通し番号になる
+        self._permutations = PermutationPool(seed or 0) if batch_shuffle else None
+        self._hands_dealt = 0
+        self.hand_seed: Optional[int] = None
+        self.deck = Deck(permutations=self._permutations)
+        # 座席の状態のビットマスクと、それを引く表（座席の状態が変わったときだけマスクが更新される）
+        self.mask = SeatMask()
+        self.seats: List[Seat] = [Seat(index=i, mask=self.mask) for i in range(seat_count)]
+        self._mask_indices = mask_indices(seat_count)
+        self._next_seat = next_seat_table(seat_count)
+        # 直近に割り当てたポジション -> 座席インデックス
+        self.position_seats: Dict[Position, int] = {}
+        # プレイヤーID -> 座席インデックス（sit_player / stand_player で更新）
+        self.player_seats: Dict[str, int] = {}
         self.community_cards: List[Card] = []
         self.pot: int = 0
+        self.pot_ledger = PotLedger(seat_count)
 
-    def reset(self):
-        """テーブルの状態をリセットする"""
-        self.deck = Deck()
+    def reset(self, hand_seed: Optional[int] = None):
+        """テーブルの状態をリセットする。hand_seed を指定するとそのハンドの配札を再現できる"""
+        if hand_seed is None:
+            hand_seed = self._next_hand_seed()
+        self.hand_seed = hand_seed
+        self.deck.shuffle(hand_seed)
         self.community_cards = []
         self.pot = 0
+        self.pot_ledger.reset()
         for seat in self.seats:
             seat.reset()
+        self.mask.settled = 0
+
+    def snapshot(self) -> tuple:
+        """
+        ハンド中に変化する状態をタプルで返す。
+        Player・設定・乱数の状態は含まない（restore しても次のハンドの seed は戻らない）。
+        """
+        return (
+            self.hand_seed,
+            self.deck.snapshot(),
+            [seat.snapshot() for seat in self.seats],
+            list(self.community_cards),
+            self.pot,
+            self.pot_ledger.snapshot(),
+        )
+
+    def attach_seats(self) -> None:
+        """新しいビットマスクを作り、現在の座席の状態を反映させる（座席を複製したとき用）"""
+        self.mask = SeatMask()
+        for seat in self.seats:
+            seat.attach(self.mask)
+        self.position_seats = dict(self.position_seats)
+        self.player_seats = dict(self.player_seats)
+
+    def occupied_indices(self) -> Tuple[int, ...]:
+        """着席している座席のインデックス（昇順）"""
+        return self._mask_indices[self.mask.occupied]
+
+    @property
+    def num_occupied(self) -> int:
+        return len(self._mask_indices[self.mask.occupied])
+
+    def next_occupied_index(self, start_index: int) -> int:
+        """start_index の次に着席している座席（いなければ start_index）"""
+        return self._next_seat[self.mask.occupied][start_index]
+
+    def next_active_index(self, start_index: int) -> int:
+        """start_index の次にアクションできる (ACTIVE) 座席（いなければ start_index）"""
+        return self._next_seat[self.mask.active][start_index]
+
+    def restore(self, state: tuple) -> None:
+        """snapshot() の状態に戻す"""
+        self.hand_seed, deck, seats, community_cards, self.pot, ledger = state
+        self.deck.restore(deck)
+        for seat, seat_state in zip(self.seats, seats):
+            seat.restore(seat_state)
+        self.community_cards = list(community_cards)
+        self.pot_ledger.restore(ledger)
+
+    @property
+    def batch_shuffle(self) -> bool:
+        """事前生成したシャッフル順を使っているか（hand_seed はその通し番号）"""
+        return self._permutations is not None
+
+    def _next_hand_seed(self) -> int:
+        if self._permutations is not None:
+            seed = self._hands_dealt
+            self._hands_dealt += 1
+            return seed
+        return self._seed_rng.getrandbits(63)
 
     def sit_player(self, player: Player, seat_index: int, stack: int) -> None:
         """指定した座席にプレイヤーを座らせる"""
@@ -25,15 +134,35 @@ class Table:
         
         # seat.sit_down を呼び出すように変更
         self.seats[seat_index].sit_down(player, stack)
+        self.player_seats[player.player_id] = seat_index
 
     def stand_player(self, seat_index: int) -> None:
         """指定した座席からプレイヤーを立たせる"""
         if seat_index < 0 or seat_index >= len(self.seats):
             raise IndexError("Invalid seat index")
-        self.seats[seat_index].stand_up()
+        seat = self.seats[seat_index]
+        if seat.player is not None and self.player_seats.get(seat.player.player_id) == seat_index:
+            del self.player_seats[seat.player.player_id]
+        seat.stand_up()
+
+    def seat_of(self, player_id: str) -> Optional[Seat]:
+        """プレイヤーが座っている座席（いなければ None）"""
+        seat_index = self.player_seats.get(player_id)
+        if seat_index is not None:
+            seat = self.seats[seat_index]
+            if seat.player is not None and seat.player.player_id == player_id:
+                return seat
+        # 座席の player を直接書き換えた場合は探し直す
+        for seat in self.seats:
+            if seat.player is not None and seat.player.player_id == player_id:
+                self.player_seats[player_id] = seat.index
+                return seat
+        return None
 
     def collect_bets(self) -> None:
         """全座席のベット額をポットに集めてリセット"""
+        # 台帳を通さずに置かれたベットがあれば取り込んでおく
+        self.pot_ledger.sync(self.seats)
         for seat in self.seats:
             self.pot += seat.current_bet
             seat.current_bet = 0
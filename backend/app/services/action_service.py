@@ -1,64 +1,181 @@
 # holdem_app/app/services/action_service.py
-from typing import List, Dict, Any
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 from app.models.game_state import GameState
-from app.models.action import Action
-from app.models.enum import ActionType, SeatStatus
+from app.models.action import Action, ValidActions
+from app.models.seat import Seat
+from app.models.enum import ActionType, SeatStatus, GameEvent
+
+def get_legal_actions(game_state: GameState, seat_index: int) -> ValidActions:
+    """
+    指定された座席のプレイヤーが現在取りうるアクションを ValidActions で返す。
+    結果は game_state.version ごとにキャッシュする（状態を変える処理が version を進める）。
+    """
+    cached = game_state.valid_actions_cache
+    if cached is not None and cached[0] == game_state.version and cached[1] == seat_index:
+        return cached[2]
+    legal = _compute_legal_actions(game_state, game_state.table.seats[seat_index])
+    game_state.valid_actions_cache = (game_state.version, seat_index, legal)
+    return legal
+
+
+def _compute_legal_actions(game_state: GameState, seat: Seat) -> ValidActions:
+    if seat.current_bet == game_state.amount_to_call:
+        min_bet = game_state.big_blind
+        if min_bet <= seat.stack:
+            return ValidActions(True, min_bet=min_bet, max_bet=seat.stack)
+        return ValidActions(True)
+
+    call_amount = game_state.amount_to_call - seat.current_bet
+    call = min(call_amount, seat.stack) if call_amount > 0 and seat.stack > 0 else 0
+    # レイズするには、コール額をカバーしてさらに上乗せできるスタックが必要で、
+    # 自分の全スタック + 現在のベット額が、ミニマムレイズ額以上であること
+    max_raise = seat.stack + seat.current_bet
+    if seat.stack > call_amount and max_raise >= game_state.min_raise_amount:
+        return ValidActions(False, call, min_raise=game_state.min_raise_amount, max_raise=max_raise)
+    return ValidActions(False, call)
+
 
 def get_valid_actions(game_state: GameState, seat_index: int) -> List[Dict[str, Any]]:
     """
     指定された座席のプレイヤーが現在取りうる有効なアクションをリストで返す
     """
-    valid_actions = []
-    seat = game_state.table.seats[seat_index]
-    
-    can_check = seat.current_bet == game_state.amount_to_call
+    return get_legal_actions(game_state, seat_index).to_list()
 
-    if can_check:
-        valid_actions.append({"type": ActionType.CHECK})
-        min_bet = game_state.big_blind
-        max_bet = seat.stack
-        if min_bet <= max_bet:
-            valid_actions.append({"type": ActionType.BET, "min": min_bet, "max": max_bet})
+
+class InvalidActionError(ValueError):
+    """現在の局面では選べないアクション"""
+
+
+def validate_action(game_state: GameState, action: Action) -> Seat:
+    """
+    アクションが手番のプレイヤーにとって有効か、get_valid_actions と同じ条件で確かめる。
+    有効なら座席を返し、無効なら InvalidActionError を送出する。
+    """
+    seat = _find_seat(game_state, action.player_id)
+    if seat is None:
+        raise InvalidActionError(f"Player {action.player_id} is not seated")
+    if seat.index != game_state.current_seat_index:
+        raise InvalidActionError("It's not this player's turn")
+    if seat.status != SeatStatus.ACTIVE:
+        raise InvalidActionError(f"Seat {seat.index} cannot act ({seat.status.value})")
+
+    action_type = action.action_type
+    legal = get_legal_actions(game_state, seat.index)
+    if not legal.allows(action_type):
+        raise InvalidActionError(f"{action_type.value} is not allowed now")
+    if action_type == ActionType.CALL:
+        if action.amount is not None and action.amount != legal.call_amount:
+            raise InvalidActionError(f"Call amount must be {legal.call_amount}")
+    elif action_type in (ActionType.BET, ActionType.RAISE):
+        _check_amount(action.amount, *legal.bounds(action_type))
+    return seat
+
+
+def _check_amount(amount: Optional[int], low: int, high: int) -> None:
+    if not isinstance(amount, int) or isinstance(amount, bool):
+        raise InvalidActionError("Amount is required")
+    if not low <= amount <= high:
+        raise InvalidActionError(f"Amount must be between {low} and {high}")
+
+
+def process_action(game_state: GameState, action: Action, validate: bool = False):
+    """
+    プレイヤーのアクションを処理し、ゲーム状態を更新する。
+    validate=True なら先に validate_action で確かめ、無効なら状態を変えずに InvalidActionError を送出する。
+    """
+    if validate:
+        seat = validate_action(game_state, action)
     else:
-        valid_actions.append({"type": ActionType.FOLD})
-        
-        call_amount = game_state.amount_to_call - seat.current_bet
-        if call_amount > 0 and seat.stack > 0:
-            amount = min(call_amount, seat.stack)
-            valid_actions.append({"type": ActionType.CALL, "amount": amount})
+        seat = _find_seat(game_state, action.player_id)
+        if seat is None:
+            return
 
-        min_raise = game_state.min_raise_amount
-        # レイズするには、コール額をカバーしてさらに上乗せできるスタックが必要
-        if seat.stack > call_amount:
-             # 自分の全スタック + 現在のベット額が、ミニマムレイズ額以上であること
-            if (seat.stack + seat.current_bet) >= min_raise:
-                valid_actions.append({"type": ActionType.RAISE, "min": min_raise, "max": seat.stack + seat.current_bet})
+    _apply(game_state, seat, action)
+    game_state.event_sink.emit(GameEvent.ACTION, seat=seat, action=action)
 
-    return valid_actions
 
+class UndoRecord(NamedTuple):
+    """apply_action で変更される前の値"""
+    seat_index: int
+    seat_state: Tuple[int, int, int, SeatStatus, bool]  # stack, current_bet, bet_total, status, acted
+    amount_to_call: int
+    min_raise_amount: int
+    last_raiser_seat_index: Optional[int]
+    acted_flags: Optional[List[bool]]   # ベット・レイズで他の座席の acted が変わる場合のみ
+    ledger_state: Optional[tuple]       # 台帳が変わる場合のみ
+    history_length: int
+    settled_mask: int
 
-def process_action(game_state: GameState, action: Action):
-    """プレイヤーのアクションを処理し、ゲーム状態を更新する"""
-    try:
-        seat = next(s for s in game_state.table.seats if s.player and s.player.player_id == action.player_id)
-    except StopIteration:
-        return
 
+def apply_action(game_state: GameState, action: Action) -> UndoRecord:
+    """
+    process_action と同じ更新を行い、undo_action で元に戻すための記録を返す。
+    探索用なのでイベントは通知しない。
+    """
+    seat = _find_seat(game_state, action.player_id)
+    if seat is None:
+        raise ValueError(f"Player {action.player_id} is not seated")
+
+    action_type = action.action_type
+    seats = game_state.table.seats
+    record = UndoRecord(
+        seat_index=seat.index,
+        seat_state=(seat.stack, seat.current_bet, seat.bet_total, seat.status, seat.acted),
+        amount_to_call=game_state.amount_to_call,
+        min_raise_amount=game_state.min_raise_amount,
+        last_raiser_seat_index=game_state.last_raiser_seat_index,
+        acted_flags=[s.acted for s in seats] if action_type in (ActionType.BET, ActionType.RAISE) else None,
+        ledger_state=None if action_type == ActionType.CHECK else game_state.table.pot_ledger.snapshot(),
+        history_length=len(game_state.history),
+        settled_mask=game_state.table.mask.settled,
+    )
+    _apply(game_state, seat, action)
+    return record
+
+
+def undo_action(game_state: GameState, record: UndoRecord) -> None:
+    """apply_action の変更を元に戻す（apply と逆の順で呼ぶこと）"""
+    game_state.version += 1
+    seat = game_state.table.seats[record.seat_index]
+    seat.stack, seat.current_bet, seat.bet_total, seat.status, seat.acted = record.seat_state
+    game_state.amount_to_call = record.amount_to_call
+    game_state.min_raise_amount = record.min_raise_amount
+    game_state.last_raiser_seat_index = record.last_raiser_seat_index
+    if record.acted_flags is not None:
+        for s, acted in zip(game_state.table.seats, record.acted_flags):
+            s.acted = acted
+    if record.ledger_state is not None:
+        game_state.table.pot_ledger.restore(record.ledger_state)
+    game_state.table.mask.settled = record.settled_mask
+    del game_state.history[record.history_length:]
+
+
+def _find_seat(game_state: GameState, player_id: str) -> Optional[Seat]:
+    return game_state.table.seat_of(player_id)
+
+
+def _apply(game_state: GameState, seat: Seat, action: Action):
+    game_state.version += 1
     seat.acted = True
+    game_state.history.append(action)
+    ledger = game_state.table.pot_ledger
 
     if action.action_type == ActionType.FOLD:
         seat.status = SeatStatus.FOLDED
+        ledger.fold(seat.index)
 
     elif action.action_type == ActionType.CALL:
         call_amount = game_state.amount_to_call - seat.current_bet
         actual_call = min(call_amount, seat.stack)
         seat.bet(actual_call)
+        ledger.add(seat.index, actual_call)
 
     elif action.action_type == ActionType.CHECK:
         pass
 
     elif action.action_type in [ActionType.BET, ActionType.POST_SB, ActionType.POST_BB]:
         seat.bet(action.amount)
+        ledger.add(seat.index, action.amount)
         game_state.amount_to_call = seat.current_bet
         game_state.min_raise_amount = seat.current_bet * 2
         game_state.last_raiser_seat_index = seat.index
@@ -70,6 +187,7 @@ def process_action(game_state: GameState, action: Action):
         total_bet_amount = action.amount
         bet_amount = total_bet_amount - seat.current_bet
         seat.bet(bet_amount)
+        ledger.add(seat.index, bet_amount)
 
         game_state.amount_to_call = total_bet_amount
         raise_delta = total_bet_amount - previous_amount_to_call
@@ -80,6 +198,24 @@ def process_action(game_state: GameState, action: Action):
     if seat.stack <= 0:
         seat.stack = 0
         seat.status = SeatStatus.ALL_IN
+        ledger.all_in(seat.index)
+
+    _update_settled(game_state, seat, action.action_type)
+
+def _update_settled(game_state: GameState, seat: Seat, action_type: ActionType):
+    """「アクション済みでコール額に揃っている」座席のビットマスクを差分で更新する"""
+    mask = game_state.table.mask
+    bit = 1 << seat.index
+    if action_type in (ActionType.BET, ActionType.RAISE):
+        # 他の座席の acted はリセットされるので、揃っているのはベットした本人だけ
+        mask.settled = bit
+    elif action_type in (ActionType.POST_SB, ActionType.POST_BB):
+        # ブラインドはハンドに2回だけなので作り直す
+        game_state.recount_settled()
+    elif seat.current_bet == game_state.amount_to_call:
+        mask.settled |= bit
+    else:
+        mask.settled &= ~bit
 
 def _reset_acted_flags_except(game_state: GameState, current_player_index: int):
     """レイズがあった場合に、他のプレイヤーが再度アクションできるようにactedフラグをリセット"""
@@ -1,15 +1,50 @@
+from typing import Optional, Tuple
 from app.models.game_state import GameState
 from app.models.action import Action
-from app.models.enum import ActionType, Round, Position
+from app.models.enum import ActionType, Round, Position, SeatStatus
+from app.models.seat import Seat
 from app.services import action_service
-from app.services.ai.ai_strategy import get_hand_representation, OPENING_RANGES
+from app.services.ai.ai_strategy import hand_class_index, in_opening_range
+from app.services.ai.decision_cache import DecisionCache
+from app.services.ai.postflop_policy import PostflopPolicy
+from app.services.ai import preflop_tree_solver
+from app.services.ai.preflop_tree_solver import PreflopTreeTable
+from app.services.ai.push_fold_solver import PushFoldTable
 
-def decide_action(game_state: GameState) -> Action:
+def decide_action(
+    game_state: GameState,
+    cache: Optional[DecisionCache] = None,
+    postflop: Optional[PostflopPolicy] = None,
+    push_fold: Optional[PushFoldTable] = None,
+    preflop_tree: Optional[PreflopTreeTable] = None,
+) -> Action:
     """
     AIのアクションを決定する。
     プリフロップのオープンシチュエーションではレンジ表に基づきレイズ or フォールド。
     それ以外の状況では、チェック -> コール -> フォールドの順で選択。
+    postflop を渡すと、フロップ以降はそのポリシー（エクイティとポットオッズ）で判断する。
+    push_fold を渡すと、ヘッズアップの浅いスタックでは解いたプッシュ/フォールド戦略に従う。
+    preflop_tree を渡すと、それより深いヘッズアップではオープン / 3ベットの木を解いた戦略に従う。
+    マルチウェイのプリフロップは常にレンジ表 (OPENING_RANGES) で判断する。
+    cache を渡すと、同じ情報集合での判断はキャッシュから返す。
     """
+    if game_state.current_round == Round.PREFLOP:
+        # 解いた表は1BBごとに判断が変わり、引くのも O(1) なのでキャッシュは通さない
+        action = None
+        if push_fold is not None:
+            action = _push_fold_action(game_state, push_fold)
+        if action is None and preflop_tree is not None:
+            action = _preflop_tree_action(game_state, preflop_tree)
+        if action is not None:
+            return action
+    if cache is not None:
+        return cache.decide(game_state, lambda gs: _decide_action(gs, postflop))
+    return _decide_action(game_state, postflop)
+
+def _decide_action(game_state: GameState, postflop: Optional[PostflopPolicy] = None) -> Action:
+    if postflop is not None and game_state.current_round != Round.PREFLOP:
+        return postflop.decide(game_state)
+
     seat_index = game_state.current_seat_index
     seat = game_state.table.seats[seat_index]
     player_id = seat.player.player_id
@@ -20,36 +55,111 @@ def decide_action(game_state: GameState) -> Action:
     is_open_opportunity = game_state.amount_to_call == game_state.big_blind
 
     if is_preflop and is_open_opportunity:
-        hand_str = get_hand_representation(seat.hole_cards)
-        position = seat.position
-        
-        # レンジ表にポジションが存在し、かつハンドがレンジ内にあるか
-        if position in OPENING_RANGES and hand_str in OPENING_RANGES[position]:
+        # レンジ表にポジションが存在し、かつハンドがレンジ内にあるか（コンパイル済みの表を引く）
+        if len(seat.hole_cards) == 2 and in_opening_range(seat.position, seat.hole_cards):
             # レンジ内ならレイズ
             # オープンレイズ額をBBの2.5倍とする
             raise_amount = int(game_state.big_blind * 2.5)
             
             # 念のため有効なアクションの中からRAISEを探し、min/max額を考慮
-            valid_actions = action_service.get_valid_actions(game_state, seat_index)
-            raise_action_info = next((a for a in valid_actions if a['type'] == ActionType.RAISE), None)
+            legal = action_service.get_legal_actions(game_state, seat_index)
 
-            if raise_action_info:
+            if legal.can_raise:
                 # レイズ額がmin以上max以下になるように調整
-                final_amount = max(raise_action_info['min'], min(raise_amount, raise_action_info['max']))
+                final_amount = max(legal.min_raise, min(raise_amount, legal.max_raise))
                 return Action(player_id, ActionType.RAISE, amount=final_amount)
 
     # --- 上記の条件に当てはまらない場合（ポストフロップや、誰かがレイズした後など） ---
-    valid_actions = action_service.get_valid_actions(game_state, seat_index)
-    valid_action_types = [a['type'] for a in valid_actions]
+    legal = action_service.get_legal_actions(game_state, seat_index)
 
     # 1. チェックが可能か確認
-    if ActionType.CHECK in valid_action_types:
+    if legal.can_check:
         return Action(player_id, ActionType.CHECK)
 
     # 2. コールが可能か確認
-    if ActionType.CALL in valid_action_types:
-        call_action_info = next(a for a in valid_actions if a['type'] == ActionType.CALL)
-        return Action(player_id, ActionType.CALL, amount=call_action_info.get('amount'))
+    if legal.can_call:
+        return Action(player_id, ActionType.CALL, amount=legal.call_amount)
 
     # 3. 上記以外の場合はフォールド
-    return Action(player_id, ActionType.FOLD)
\ No newline at end of file
+    return Action(player_id, ActionType.FOLD)
+
+def _push_fold_action(game_state: GameState, push_fold: PushFoldTable) -> Optional[Action]:
+    """
+    ヘッズアップで有効スタックが表の範囲内なら、プッシュ/フォールド戦略でのアクションを返す。
+    オープンの機会なら push (オールイン) かフォールド、相手のオールインに対してはコールかフォールド。
+    それ以外の局面（相手がオールインでないレイズなど）や、表を解いたブラインドの比が
+    このハンドで払われたブラインドと違う場合は None。
+    """
+    spot = _heads_up_spot(game_state, push_fold.small_blind_ratio)
+    if spot is None or not push_fold.covers(spot[2]):
+        return None
+    seat, opponent, stack_bb = spot
+    big_blind = game_state.big_blind
+
+    hand_class = hand_class_index(seat.hole_cards)
+    player_id = seat.player.player_id
+    legal = action_service.get_legal_actions(game_state, seat.index)
+    if game_state.amount_to_call == big_blind and seat.current_bet < big_blind:
+        if push_fold.push_probability(stack_bb, hand_class) < 0.5:
+            return Action(player_id, ActionType.FOLD)
+        if legal.can_raise:
+            return Action(player_id, ActionType.RAISE, amount=legal.max_raise)
+        return Action(player_id, ActionType.CALL, amount=legal.call_amount)
+    if game_state.amount_to_call > big_blind and opponent.stack == 0 and legal.can_call:
+        if push_fold.call_probability(stack_bb, hand_class) < 0.5:
+            return Action(player_id, ActionType.FOLD)
+        return Action(player_id, ActionType.CALL, amount=legal.call_amount)
+    return None
+
+def _preflop_tree_action(game_state: GameState, tree: PreflopTreeTable) -> Optional[Action]:
+    """
+    ヘッズアップで有効スタックが表の範囲内なら、オープン / 3ベットの木の戦略でのアクションを返す。
+    相手のオープン額が木のオープン額と違っても同じ情報集合として扱う。
+    木にない局面（リンプや、オールインでない3ベットなど）や、ブラインドの比が違う場合は None。
+    """
+    spot = _heads_up_spot(game_state, tree.small_blind_ratio)
+    if spot is None or not tree.covers(spot[2]):
+        return None
+    seat, opponent, stack_bb = spot
+    raises = sum(1 for a in game_state.history if a.action_type in (ActionType.RAISE, ActionType.ALL_IN))
+    if seat.position == Position.BTN and raises == 0 and game_state.amount_to_call == game_state.big_blind:
+        node = preflop_tree_solver.BTN_OPEN
+    elif seat.position == Position.BB and raises == 1:
+        node = preflop_tree_solver.BB_VS_JAM if opponent.stack == 0 else preflop_tree_solver.BB_VS_OPEN
+    elif seat.position == Position.BTN and raises == 2 and opponent.stack == 0:
+        node = preflop_tree_solver.BTN_VS_3BET
+    else:
+        return None
+
+    choice = tree.action(node, stack_bb, hand_class_index(seat.hole_cards))
+    player_id = seat.player.player_id
+    legal = action_service.get_legal_actions(game_state, seat.index)
+    if choice == "open" and legal.can_raise:
+        amount = max(legal.min_raise, min(round(tree.open_size * game_state.big_blind), legal.max_raise))
+        return Action(player_id, ActionType.RAISE, amount=amount)
+    if choice == "jam" and legal.can_raise:
+        return Action(player_id, ActionType.RAISE, amount=legal.max_raise)
+    if choice != "fold" and legal.can_call:
+        return Action(player_id, ActionType.CALL, amount=legal.call_amount)
+    return Action(player_id, ActionType.FOLD)
+
+def _heads_up_spot(game_state: GameState, small_blind_ratio: float) -> Optional[Tuple[Seat, Seat, float]]:
+    """
+    ヘッズアップなら (手番の座席, 相手の座席, 有効スタックのBB数) を返す。
+    マルチウェイや、表を解いたブラインドの比がこのハンドで払われたブラインドと違う場合は None。
+    """
+    seats = [s for s in game_state.table.seats if s.is_occupied and s.status != SeatStatus.OUT]
+    if len(seats) != 2:
+        return None
+    if abs(small_blind_ratio - _small_blind_ratio(game_state)) > 1e-3:
+        return None
+    seat = game_state.table.seats[game_state.current_seat_index]
+    opponent = seats[1] if seats[0] is seat else seats[0]
+    stack_bb = min(seat.stack + seat.bet_total, opponent.stack + opponent.bet_total) / game_state.big_blind
+    return seat, opponent, stack_bb
+
+def _small_blind_ratio(game_state: GameState) -> float:
+    """このハンドの SB / BB の比（SB が払われていなければ 0）"""
+    if any(a.action_type == ActionType.POST_SB for a in game_state.history):
+        return game_state.small_blind / game_state.big_blind
+    return 0.0
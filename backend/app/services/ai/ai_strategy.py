@@ -1,7 +1,47 @@
 # holdem_app/app/services/ai_strategy.py
-from app.models.deck import Card
+import re
+from pathlib import Path
+from typing import Iterable, Union
+
+from app.models.deck import Card, FULL_DECK
 from app.models.enum import Position
 
+# 169種類のスターティングハンド（13×13 のグリッド順）
+# 行・列はランクの強い順。対角線がペア、右上がスーテッド、左下がオフスーテッド。
+_GRID_RANKS = "AKQJT98765432"
+HAND_CLASSES = [
+    _GRID_RANKS[row] + _GRID_RANKS[col] if row == col
+    else _GRID_RANKS[row] + _GRID_RANKS[col] + "s" if row < col
+    else _GRID_RANKS[col] + _GRID_RANKS[row] + "o"
+    for row in range(13) for col in range(13)
+]
+HAND_CLASS_INDEX = {label: i for i, label in enumerate(HAND_CLASSES)}
+
+def _build_hand_class(card1: Card, card2: Card) -> int:
+    """2枚のカードからハンドクラスのインデックスを求める（テーブル生成用）"""
+    high = 12 - max(card1.rank_index, card2.rank_index)
+    low = 12 - min(card1.rank_index, card2.rank_index)
+    if card1.suit_index == card2.suit_index:
+        return high * 13 + low
+    return low * 13 + high
+
+# カードIDの組 (id1 * 52 + id2) から引けるハンドクラスの事前計算テーブル（配列での一括処理用に公開）
+HAND_CLASS_TABLE = [_build_hand_class(c1, c2) for c1 in FULL_DECK for c2 in FULL_DECK]
+
+def _build_class_combos() -> list[list[tuple[int, int]]]:
+    combos = [[] for _ in range(169)]
+    for id1 in range(52):
+        for id2 in range(id1 + 1, 52):
+            combos[HAND_CLASS_TABLE[id1 * 52 + id2]].append((id1, id2))
+    return combos
+
+# ハンドクラスごとの具体的な組み合わせ (カードIDの組, 小さい順)
+HAND_CLASS_COMBOS = _build_class_combos()
+
+def hand_class_index(cards: list[Card]) -> int:
+    """2枚のカードのハンドクラス (0-168, HAND_CLASSES のインデックス) を返す"""
+    return HAND_CLASS_TABLE[cards[0].id * 52 + cards[1].id]
+
 def get_hand_representation(cards: list[Card]) -> str:
     """
     2枚のカードをポーカーで一般的な文字列表現（例: "AKs", "T9o", "77"）に変換する
@@ -9,27 +49,12 @@ def get_hand_representation(cards: list[Card]) -> str:
     if len(cards) != 2:
         return ""
 
-    card1, card2 = cards
-    
-    rank_order = "AKQJT98765432"
-    rank1 = card1.rank
-    rank2 = card2.rank
-
-    # ランクを強い順に並べる
-    if rank_order.index(rank1) > rank_order.index(rank2):
-        rank1, rank2 = rank2, rank1
-
-    # スーテッドかオフスーテッドか
-    suited_suffix = "s" if card1.suit == card2.suit else "o"
-    
-    # ポケットペアの場合
-    if rank1 == rank2:
-        return f"{rank1}{rank2}"
-    
-    return f"{rank1}{rank2}{suited_suffix}"
+    return HAND_CLASSES[hand_class_index(cards)]
 
 # 6-maxテーブル用のシンプルなオープンレンジ表
 # キー: ポジション, バリュー: オープンレイズするハンドのセット
+# ヘッズアップは解いた表 (push_fold_solver / preflop_tree_solver) があればそちらが優先され、
+# マルチウェイのプリフロップは常にこの表で判断する
 OPENING_RANGES = {
     # アーリーポジション (LJ) は非常にタイト
     Position.LJ: {
@@ -86,3 +111,97 @@ OPENING_RANGES = {
         "AKo", "AQo", "AJo", "KQo"
     }
 }
+
+
+# --- レンジ表記の解析とコンパイル ---
+
+_RANK_VALUE = {rank: i for i, rank in enumerate(Card.rank_order)}
+_HAND_PATTERN = re.compile(r"^([2-9TJQKA])([2-9TJQKA])([so]?)(\+?)$")
+
+def _parse_hand(token: str) -> tuple[int, int, str, bool]:
+    """"A2s+" -> (高いランク, 低いランク, スート指定, プラス) に分解する"""
+    match = _HAND_PATTERN.match(token)
+    if not match:
+        raise ValueError(f"Invalid range token: {token!r}")
+    r1, r2, suited, plus = match.groups()
+    high, low = sorted((_RANK_VALUE[r1], _RANK_VALUE[r2]), reverse=True)
+    if high == low and suited:
+        raise ValueError(f"Pairs cannot be suited or offsuit: {token!r}")
+    return high, low, suited, bool(plus)
+
+def _labels(high: int, low: int, suited: str) -> list[str]:
+    ranks = Card.rank_order
+    if high == low:
+        return [ranks[high] * 2]
+    return [ranks[high] + ranks[low] + s for s in (suited or "so")]
+
+def parse_range(notation: str) -> frozenset[int]:
+    """
+    "22+, A2s+, KTo+" のようなレンジ表記をハンドクラスのインデックスの集合に変換する。
+    - "77" / "AKs" / "AKo" / "AK"（スーテッドとオフスート両方）
+    - "77+" はAAまでのペア、"A2s+" "KTo+" はキッカーを1つ下のランクまで上げたもの
+    - "22-55" "A2s-A5s" は範囲指定（高いランクとスート指定が同じもの同士）
+    """
+    classes = set()
+    for token in notation.replace(" ", "").split(","):
+        if not token:
+            continue
+        if "-" in token:
+            start, _, end = token.partition("-")
+            h1, l1, s1, p1 = _parse_hand(start)
+            h2, l2, s2, p2 = _parse_hand(end)
+            pairs = h1 == l1 and h2 == l2
+            same_high = h1 == h2 and h1 != l1 and h2 != l2
+            if p1 or p2 or s1 != s2 or not (pairs or same_high):
+                raise ValueError(f"Invalid range: {token!r}")
+            if pairs:
+                hands = [(r, r) for r in range(min(h1, h2), max(h1, h2) + 1)]
+            else:
+                hands = [(h1, k) for k in range(min(l1, l2), max(l1, l2) + 1)]
+            suited = s1
+        else:
+            high, low, suited, plus = _parse_hand(token)
+            if not plus:
+                hands = [(high, low)]
+            elif high == low:
+                hands = [(r, r) for r in range(high, 13)]
+            else:
+                hands = [(high, k) for k in range(low, high)]
+        for high, low in hands:
+            classes.update(HAND_CLASS_INDEX[label] for label in _labels(high, low, suited))
+    return frozenset(classes)
+
+def compile_range(hands: Union[str, Iterable[str]]) -> bytes:
+    """
+    レンジ（表記文字列またはハンドラベルの集合）を、カードIDの組 (id1 * 52 + id2) で
+    引ける 52×52 の表にする。レンジ内なら 1。
+    """
+    if isinstance(hands, str):
+        classes = parse_range(hands)
+    else:
+        classes = frozenset(HAND_CLASS_INDEX[label] for label in hands)
+    return bytes(1 if hand_class in classes else 0 for hand_class in HAND_CLASS_TABLE)
+
+def load_opening_ranges(path: Path) -> dict[Position, bytes]:
+    """
+    "BTN: 22+, A2s+, K8s+" のように1行に1ポジションずつ書いたファイルを読み込んでコンパイルする。
+    "#" 以降はコメント。
+    """
+    tables = {}
+    for line_no, line in enumerate(Path(path).read_text(encoding="utf-8").splitlines(), 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        name, sep, notation = line.partition(":")
+        if not sep or name.strip() not in Position.__members__:
+            raise ValueError(f"{path}:{line_no}: expected '<position>: <range>'")
+        tables[Position[name.strip()]] = compile_range(notation)
+    return tables
+
+# OPENING_RANGES をコンパイルした表（decide_action はこちらを引く）
+OPENING_TABLES = {position: compile_range(hands) for position, hands in OPENING_RANGES.items()}
+
+def in_opening_range(position: Position, cards: list[Card], tables: dict[Position, bytes] = OPENING_TABLES) -> bool:
+    """ポジションのオープンレンジに2枚のハンドが含まれるか"""
+    table = tables.get(position)
+    return table is not None and table[cards[0].id * 52 + cards[1].id] == 1
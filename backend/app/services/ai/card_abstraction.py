@@ -0,0 +1,332 @@
+# app/services/ai/card_abstraction.py
+"""
+フロップ・ターン・リバーのハンド強度のバケット（カードの抽象化）。
+
+スートの入れ替えで同一視できる (ホールカード, ボード) の組を代表形にして、
+EHS² (リバーまでの各ランアウトでのハンド強度 HS の2乗の期待値) で num_buckets 個に分ける。
+バケットは各組が実際に配られる頻度で重み付けした等頻度の区切りで決める。
+
+生成はオフラインで行い、ストリートごとにソート済みのキーとバケットをバイナリファイルに保存する。
+実行時は読み取り専用で memmap するので、複数のワーカープロセスでも同じページを共有する。
+
+    python -m app.services.ai.card_abstraction [--streets flop turn river] [--buckets N] [--runouts N] [--workers N]
+
+    bucket(hole_cards, board)  # ボードの枚数でストリートを選んで引く
+"""
+import argparse
+import os
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import combinations, permutations
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import DATA_DIR
+from app.models.deck import Card
+from app.services.evaluation_service import evaluate_hands_batch
+
+STREETS = {"flop": 3, "turn": 4, "river": 5}
+DEFAULT_BUCKETS = 50
+DEFAULT_RUNOUTS = 64
+
+_MAGIC = b"CAB1"
+_HEADER = struct.Struct("<4sBBHQ")  # magic, ボードの枚数, バケット数, 予備, 件数
+
+# スートの並べ替え24通りを、カードIDの置換 (24, 52) として持つ
+_CARD_PERMUTATIONS = np.array(
+    [[(c & ~3) | perm[c & 3] for c in range(52)] for perm in permutations(range(4))],
+    dtype=np.int64,
+)
+_PERMUTATION_LISTS = _CARD_PERMUTATIONS.tolist()
+# 1326通りのホールカード (小さいID, 大きいID)
+_ALL_HOLES = np.array(list(combinations(range(52), 2)), dtype=np.int64)
+_RANK_SPAN = 8192  # evaluate_hands_batch の役の強さ (1〜7462) より大きい2のべき
+
+
+def table_path(street: str) -> Path:
+    return DATA_DIR / f"buckets_{street}_v1.bin"
+
+
+def _pack(cards: Sequence[int]) -> int:
+    key = 0
+    for card in cards:
+        key = key << 6 | card
+    return key
+
+
+@lru_cache(maxsize=4096)
+def _canonical_board(board: Tuple[int, ...]) -> Tuple[int, Tuple[int, ...]]:
+    """ボードの代表形のキーと、ボードを代表形に移すスートの並べ替え（のインデックス）"""
+    keys = [_pack(sorted(perm[c] for c in board)) for perm in _PERMUTATION_LISTS]
+    best = min(keys)
+    return best, tuple(i for i, key in enumerate(keys) if key == best)
+
+
+def canonical_key(hole: Sequence[int], board: Sequence[int]) -> int:
+    """
+    (ホールカード, ボード) の代表形のキー（カードIDで指定）。
+    上位ビットがボード、下位12ビットがホールカードなので、キーの順はボードごとにまとまる。
+    """
+    board_key, perms = _canonical_board(tuple(sorted(board)))
+    h0, h1 = hole
+    hole_key = min(
+        (a << 6 | b) if a < b else (b << 6 | a)
+        for a, b in ((_PERMUTATION_LISTS[i][h0], _PERMUTATION_LISTS[i][h1]) for i in perms)
+    )
+    return board_key << 12 | hole_key
+
+
+def canonical_keys(holes: np.ndarray, board: Sequence[int]) -> np.ndarray:
+    """同じボードに対する複数のホールカード (N, 2) の代表形のキー（生成用）"""
+    board_key, perms = _canonical_board(tuple(sorted(board)))
+    mapped = np.sort(_CARD_PERMUTATIONS[list(perms)][:, holes], axis=2)  # (並べ替え, N, 2)
+    hole_keys = (mapped[..., 0] << 6 | mapped[..., 1]).min(axis=0)
+    return (np.uint64(board_key) << np.uint64(12)) | hole_keys.astype(np.uint64)
+
+
+def canonical_boards(num_cards: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    代表形のボード（キーの昇順）と、それぞれと同一視されるボードの数を返す。
+    """
+    boards = np.array(list(combinations(range(52), num_cards)), dtype=np.int64)
+    shifts = 6 * np.arange(num_cards - 1, -1, -1, dtype=np.int64)
+    best = None
+    for perm in _CARD_PERMUTATIONS:
+        keys = (np.sort(perm[boards], axis=1) << shifts).sum(axis=1)
+        best = keys if best is None else np.minimum(best, keys)
+    _, first, counts = np.unique(best, return_index=True, return_counts=True)
+    return boards[first], counts
+
+
+def river_strength(board: Sequence[int]) -> np.ndarray:
+    """
+    5枚のボードでの各ホールカードのハンド強度 HS（ランダムな1人に勝つ確率 + 引き分けの半分）。
+    (1326,) の配列で、ボードと重なるホールカードは NaN。
+    相手のハンドからは自分のカードと重なるものを除く（カードごとにソートした役の強さで数える）。
+    """
+    board = np.asarray(board, dtype=np.int64)
+    dead = np.zeros(52, dtype=bool)
+    dead[board] = True
+    live = np.flatnonzero(~(dead[_ALL_HOLES[:, 0]] | dead[_ALL_HOLES[:, 1]]))
+    holes = _ALL_HOLES[live]
+    ranks = evaluate_hands_batch(holes, np.broadcast_to(board, (len(live), 5)))
+
+    # 全体の中で自分より弱い（役の値が大きい）数と同じ強さの数
+    ordered = np.sort(ranks)
+    right = np.searchsorted(ordered, ranks, "right")
+    worse = len(ranks) - right
+    ties = right - np.searchsorted(ordered, ranks, "left") + 1
+
+    # 自分のカードを含むハンドの分を引く（自分自身は両方のカードで引かれるので上で +1 している）
+    card_keys = np.sort(np.concatenate([holes[:, 0], holes[:, 1]]) * _RANK_SPAN + np.concatenate([ranks, ranks]))
+    per_card = np.bincount(holes.ravel(), minlength=52)
+    for side in (0, 1):
+        base = holes[:, side] * _RANK_SPAN
+        right = np.searchsorted(card_keys, base + ranks, "right")
+        worse -= np.searchsorted(card_keys, base + _RANK_SPAN - 1, "right") - right
+        ties -= right - np.searchsorted(card_keys, base + ranks, "left")
+    opponents = len(ranks) - (per_card[holes[:, 0]] + per_card[holes[:, 1]] - 1)
+
+    strength = np.full(len(_ALL_HOLES), np.nan)
+    strength[live] = (worse + 0.5 * ties) / opponents
+    return strength
+
+
+def board_strengths(board: Sequence[int], runouts: Optional[int] = None,
+                    rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    3〜5枚のボードでの各ホールカードの (EHS, EHS²)。
+    runouts を指定すると、残りのカードの出方をその数だけ無作為に選んで平均する（None なら全通り）。
+    """
+    board = list(board)
+    needed = 5 - len(board)
+    if needed == 0:
+        strength = river_strength(board)
+        return strength, strength ** 2
+
+    remaining = [c for c in range(52) if c not in board]
+    all_runouts = np.array(list(combinations(remaining, needed)), dtype=np.int64)
+    if runouts is not None and runouts < len(all_runouts):
+        rng = rng or np.random.default_rng()
+        all_runouts = all_runouts[rng.choice(len(all_runouts), runouts, replace=False)]
+
+    total = np.zeros(len(_ALL_HOLES))
+    total_sq = np.zeros(len(_ALL_HOLES))
+    count = np.zeros(len(_ALL_HOLES))
+    for runout in all_runouts:
+        strength = river_strength(board + runout.tolist())
+        seen = ~np.isnan(strength)
+        total[seen] += strength[seen]
+        total_sq[seen] += strength[seen] ** 2
+        count[seen] += 1
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, np.nan), np.where(count > 0, total_sq / count, np.nan)
+
+
+def _board_job(args) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """1つの代表形のボードについて、(キー, EHS², 頻度の重み) を代表形のホールカードごとに返す"""
+    board, orbit, runouts, seed = args
+    board = [int(c) for c in board]
+    board_key, _ = _canonical_board(tuple(board))
+    rng = np.random.default_rng([seed, board_key])
+    _, ehs2 = board_strengths(board, runouts, rng)
+
+    live = np.flatnonzero(~np.isnan(ehs2))
+    keys = canonical_keys(_ALL_HOLES[live], board)
+    keys, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    return keys, ehs2[live[first]], counts * orbit
+
+
+def _weighted_edges(values: np.ndarray, weights: np.ndarray, num_buckets: int) -> np.ndarray:
+    """重み付きで等頻度になるバケットの境界 (num_buckets - 1 個)"""
+    order = np.argsort(values, kind="stable")
+    cumulative = np.cumsum(weights[order]) / weights.sum()
+    targets = np.arange(1, num_buckets) / num_buckets
+    return values[order][np.minimum(np.searchsorted(cumulative, targets), len(values) - 1)]
+
+
+def build_street(street: str, num_buckets: int = DEFAULT_BUCKETS, runouts: Optional[int] = DEFAULT_RUNOUTS,
+                 seed: int = 0, boards: Optional[np.ndarray] = None,
+                 workers: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    ストリートのバケット表を (ソート済みのキー, バケット) として生成する。
+    boards を指定すると、その代表形のボードだけを対象にする（テストや部分的な生成用）。
+    """
+    if not 1 <= num_buckets <= 255:
+        raise ValueError("num_buckets must be between 1 and 255")
+    num_cards = STREETS[street]
+    if boards is None:
+        all_boards, orbits = canonical_boards(num_cards)
+    else:
+        # 指定されたボードの代表形（キーの昇順）と、同一視されるボードの数 (24 / 固定する並べ替えの数)
+        selected = {}
+        for board in boards:
+            if len(board) != num_cards:
+                raise ValueError(f"The {street} has {num_cards} board cards")
+            key, perms = _canonical_board(tuple(sorted(int(c) for c in board)))
+            selected[key] = (sorted(_PERMUTATION_LISTS[perms[0]][int(c)] for c in board), 24 // len(perms))
+        all_boards = np.array([selected[key][0] for key in sorted(selected)], dtype=np.int64)
+        orbits = np.array([selected[key][1] for key in sorted(selected)], dtype=np.int64)
+
+    jobs = [(board, int(orbit), runouts, seed) for board, orbit in zip(all_boards, orbits)]
+    if (workers is not None and workers <= 1) or len(jobs) <= 1:
+        results = [_board_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            results = list(executor.map(_board_job, jobs, chunksize=16))
+
+    # ボードはキーの昇順に処理しているので、連結するだけでキー全体がソートされる
+    keys = np.concatenate([r[0] for r in results])
+    values = np.concatenate([r[1] for r in results])
+    weights = np.concatenate([r[2] for r in results]).astype(np.float64)
+    edges = _weighted_edges(values, weights, num_buckets)
+    buckets = np.searchsorted(edges, values, "right").astype(np.uint8)
+    return keys, buckets
+
+
+class CardAbstraction:
+    """1ストリート分のバケット表（memmap したソート済みキーを二分探索で引く）"""
+
+    def __init__(self, keys: np.ndarray, buckets: np.ndarray, board_cards: int, num_buckets: int):
+        self.keys = keys
+        self.buckets = buckets
+        self.board_cards = board_cards
+        self.num_buckets = num_buckets
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def bucket_of_ids(self, hole: Sequence[int], board: Sequence[int]) -> int:
+        if len(board) != self.board_cards:
+            raise ValueError(f"Expected {self.board_cards} board cards, got {len(board)}")
+        key = canonical_key(hole, board)
+        i = int(np.searchsorted(self.keys, np.uint64(key)))
+        if i == len(self.keys) or int(self.keys[i]) != key:
+            raise KeyError("Hand is not in the bucket table")
+        return int(self.buckets[i])
+
+    def bucket(self, hole_cards: Sequence[Card], board: Sequence[Card]) -> int:
+        return self.bucket_of_ids([c.id for c in hole_cards], [c.id for c in board])
+
+
+def save_abstraction(path: Path, keys: np.ndarray, buckets: np.ndarray, board_cards: int, num_buckets: int) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, board_cards, num_buckets, 0, len(keys)))
+        f.write(np.ascontiguousarray(keys, dtype="<u8").tobytes())
+        f.write(np.ascontiguousarray(buckets, dtype=np.uint8).tobytes())
+    tmp_path.replace(path)
+
+
+def load_abstraction(path: Path) -> CardAbstraction:
+    """バケット表を読み取り専用で memmap する"""
+    path = Path(path)
+    with open(path, "rb") as f:
+        magic, board_cards, num_buckets, _, count = _HEADER.unpack(f.read(_HEADER.size))
+        f.seek(0, 2)
+        size = f.tell()
+    if magic != _MAGIC or board_cards not in STREETS.values():
+        raise ValueError(f"Invalid bucket table: {path}")
+    if size != _HEADER.size + count * 9 or count == 0:
+        raise ValueError(f"Truncated bucket table: {path}")
+    keys = np.memmap(path, dtype="<u8", mode="r", offset=_HEADER.size, shape=(count,))
+    buckets = np.memmap(path, dtype=np.uint8, mode="r", offset=_HEADER.size + count * 8, shape=(count,))
+    return CardAbstraction(keys, buckets, board_cards, num_buckets)
+
+
+_abstractions: Dict[str, Optional[CardAbstraction]] = {}
+_lock = threading.Lock()
+
+
+def get_card_abstraction(street: str) -> Optional[CardAbstraction]:
+    """プロセス全体で共有するストリートのバケット表を返す（未生成なら None）"""
+    if street not in _abstractions:
+        with _lock:
+            if street not in _abstractions:
+                try:
+                    _abstractions[street] = load_abstraction(table_path(street))
+                except (OSError, ValueError):
+                    _abstractions[street] = None
+    return _abstractions[street]
+
+
+_STREET_BY_CARDS = {cards: street for street, cards in STREETS.items()}
+
+
+def bucket(hole_cards: Sequence[Card], board: Sequence[Card]) -> int:
+    """ボードの枚数に対応するストリートの表でバケットを引く"""
+    street = _STREET_BY_CARDS.get(len(board))
+    if street is None:
+        raise ValueError("Board must have 3, 4 or 5 cards")
+    abstraction = get_card_abstraction(street)
+    if abstraction is None:
+        raise RuntimeError(f"Bucket table for the {street} has not been built")
+    return abstraction.bucket(hole_cards, board)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the card-abstraction bucket tables.")
+    parser.add_argument("--streets", nargs="+", choices=list(STREETS), default=list(STREETS))
+    parser.add_argument("--buckets", type=int, default=DEFAULT_BUCKETS)
+    parser.add_argument("--runouts", type=int, default=DEFAULT_RUNOUTS, help="Sampled runouts per board (0: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    for street in args.streets:
+        start = time.perf_counter()
+        keys, buckets = build_street(street, args.buckets, args.runouts or None, args.seed, workers=args.workers)
+        path = table_path(street)
+        save_abstraction(path, keys, buckets, STREETS[street], args.buckets)
+        print(f"Wrote {path} ({len(keys)} hands) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
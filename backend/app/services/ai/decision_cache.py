@@ -0,0 +1,168 @@
+# app/services/ai/decision_cache.py
+"""
+AIの判断を情報集合（抽象化した局面）ごとに覚えておく LRU キャッシュ。
+
+同じポジション・同じハンドクラス・同じアクションの流れ・同じスタックの深さの局面では
+同じ判断になるので、2回目からは判断処理を呼ばずに覚えておいたアクションを返す。
+フロップ以降はカードそのものが違えば判断も変わり、同じ局面はほとんど繰り返さないので覚えない。
+
+    cache = DecisionCache(maxsize=4096)
+    action = ai_agent_service.decide_action(game_state, cache=cache)
+    print(cache.hits, cache.misses)
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, NamedTuple, Optional, Tuple
+
+from app.models.action import Action
+from app.models.enum import ActionType, Round, SeatStatus
+from app.models.game_state import GameState
+from app.services import action_service
+from app.services.ai.ai_strategy import hand_class_index
+from app.services.ai.push_fold_solver import DEFAULT_MAX_BB
+
+# スタックの深さ（有効スタックのBB数）の区切り。浅いほど判断が変わりやすいので細かく分ける
+# プッシュ/フォールド表の範囲 (max_bb + 0.5 未満) の境目で区切り、表の内と外を同じバケツに入れない
+STACK_BUCKETS = (2, 4, 6, 8, 10, 13, 16, 20, DEFAULT_MAX_BB + 0.5, 40, 100)
+
+_ACTION_CODES = {
+    ActionType.FOLD: "f",
+    ActionType.CHECK: "x",
+    ActionType.CALL: "c",
+    ActionType.BET: "b",
+    ActionType.RAISE: "r",
+    ActionType.ALL_IN: "a",
+}
+_IN_HAND = (SeatStatus.ACTIVE, SeatStatus.ALL_IN)
+
+
+class ActionTemplate(NamedTuple):
+    """キャッシュに保存するアクション（金額はBB単位。all_in ならその時点の最大額）"""
+    action_type: ActionType
+    amount_bb: Optional[float] = None
+    all_in: bool = False
+
+    @classmethod
+    def from_action(cls, action: Action, big_blind: int, all_in: bool = False) -> "ActionTemplate":
+        if action.action_type in (ActionType.BET, ActionType.RAISE) and action.amount is not None:
+            return cls(action.action_type, action.amount / big_blind, all_in)
+        return cls(action.action_type)
+
+    def to_action(self, game_state: GameState) -> Optional[Action]:
+        """現在の局面で有効なアクションに戻す。そのアクションが選べなければ None"""
+        seat_index = game_state.current_seat_index
+        seat = game_state.table.seats[seat_index]
+        legal = action_service.get_legal_actions(game_state, seat_index)
+        if not legal.allows(self.action_type):
+            return None
+        if self.action_type == ActionType.CALL:
+            return Action(seat.player.player_id, ActionType.CALL, amount=legal.call_amount)
+        bounds = legal.bounds(self.action_type)
+        if bounds is not None and self.all_in:
+            return Action(seat.player.player_id, self.action_type, amount=bounds[1])
+        if bounds is not None and self.amount_bb is not None:
+            amount = max(bounds[0], min(round(self.amount_bb * game_state.big_blind), bounds[1]))
+            return Action(seat.player.player_id, self.action_type, amount=amount)
+        return Action(seat.player.player_id, self.action_type)
+
+
+def _stack_bucket(effective_bb: float) -> int:
+    for i, edge in enumerate(STACK_BUCKETS):
+        if effective_bb < edge:
+            return i
+    return len(STACK_BUCKETS)
+
+
+def info_state_key(game_state: GameState) -> Optional[Tuple[Hashable, ...]]:
+    """
+    手番のプレイヤーから見たプリフロップの局面のキー。フロップ以降は None（キャッシュしない）。
+    (ラウンド, ポジション, ハンドクラス, アクションの流れ, コール額, 残っている人数, スタックの深さ)
+    """
+    if game_state.current_round != Round.PREFLOP:
+        return None
+    seat = game_state.table.seats[game_state.current_seat_index]
+    big_blind = game_state.big_blind
+    cards = hand_class_index(seat.hole_cards)
+    sequence = "".join(_ACTION_CODES.get(a.action_type, "") for a in game_state.history)
+
+    in_hand = [s for s in game_state.table.seats if s.is_occupied and s.status in _IN_HAND]
+    opponents = [s.stack + s.current_bet for s in in_hand if s is not seat]
+    effective = min(seat.stack + seat.current_bet, max(opponents, default=0))
+    return (
+        game_state.current_round,
+        seat.position,
+        cards,
+        sequence,
+        (game_state.amount_to_call - seat.current_bet) * 4 // big_blind,  # 1/4 BB 単位
+        len(in_hand),
+        _stack_bucket(effective / big_blind),
+    )
+
+
+class DecisionCache:
+    """
+    情報集合のキー -> ActionTemplate の LRU キャッシュ。key_fn が None を返した局面は覚えない。
+    API では複数のスレッドから共有されるので、辞書とカウンタはロックして更新する。
+    """
+
+    def __init__(self, maxsize: int = 4096, key_fn: Callable[[GameState], Optional[Hashable]] = info_state_key):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.key_fn = key_fn
+        self._entries: "OrderedDict[Hashable, ActionTemplate]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key: Hashable) -> Optional[ActionTemplate]:
+        with self._lock:
+            template = self._entries.get(key)
+            if template is not None:
+                self._entries.move_to_end(key)
+            return template
+
+    def put(self, key: Hashable, template: ActionTemplate) -> None:
+        with self._lock:
+            self._entries[key] = template
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def decide(self, game_state: GameState, decide: Callable[[GameState], Action]) -> Action:
+        """
+        キャッシュにあればそのアクションを、なければ decide で判断して保存する。
+        decide はロックの外で呼ぶ（同じキーを2つのスレッドが同時に判断することはありうる）。
+        """
+        key = self.key_fn(game_state)
+        if key is None:
+            return decide(game_state)
+        template = self.get(key)
+        if template is not None:
+            action = template.to_action(game_state)
+            if action is not None:
+                with self._lock:
+                    self.hits += 1
+                return action
+        with self._lock:
+            self.misses += 1
+        action = decide(game_state)
+        seat = game_state.table.seats[game_state.current_seat_index]
+        all_in = action.amount is not None and action.amount >= seat.stack + seat.current_bet
+        self.put(key, ActionTemplate.from_action(action, game_state.big_blind, all_in))
+        return action
@@ -0,0 +1,213 @@
+# app/services/ai/postflop_policy.py
+"""
+フロップ以降のエクイティに基づくAI。
+
+相手のレンジに対するエクイティをモンテカルロ法で推定し、ポットオッズと比べて
+フォールド・コール・ベット/レイズを選ぶ。推定は小さなバッチを締め切りまで繰り返す
+anytime 方式で、締め切りを過ぎないようにバッチの大きさを計測した処理速度から決める。
+
+    policy = PostflopPolicy(time_budget=0.02)
+    action = ai_agent_service.decide_action(game_state, postflop=policy)
+"""
+import math
+import time
+from dataclasses import dataclass
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from app.models.action import Action
+from app.models.deck import Card
+from app.models.enum import ActionType, SeatStatus
+from app.models.game_state import GameState
+from app.services import action_service
+from app.services.evaluation_service import evaluate_hands_batch
+from app.services.hand_evaluator import get_hand_evaluator
+
+# 最初のバッチの大きさ（処理速度を測るために小さくする）
+_FIRST_BATCH = 32
+_IN_HAND = (SeatStatus.ACTIVE, SeatStatus.ALL_IN)
+
+
+class EquityEstimate(NamedTuple):
+    equity: float
+    samples: int
+
+    @property
+    def std_error(self) -> float:
+        if not self.samples:
+            return 1.0
+        return math.sqrt(max(self.equity * (1 - self.equity), 1e-4) / self.samples)
+
+
+# 1326通りのホールカードの組 (小さいID, 大きいID)
+_ALL_COMBOS = np.array([(c1, c2) for c1 in range(52) for c2 in range(c1 + 1, 52)], dtype=np.int64)
+
+
+def _range_combos(villain_range: Optional[bytes], known: Sequence[int]) -> np.ndarray:
+    """レンジ（compile_range の表）に含まれ、既知のカードを使わないホールカードの組"""
+    dead = np.zeros(52, dtype=bool)
+    dead[list(known)] = True
+    keep = ~(dead[_ALL_COMBOS[:, 0]] | dead[_ALL_COMBOS[:, 1]])
+    if villain_range is not None:
+        table = np.frombuffer(villain_range, dtype=np.uint8)
+        keep &= table[_ALL_COMBOS[:, 0] * 52 + _ALL_COMBOS[:, 1]] == 1
+    if not keep.any():
+        raise ValueError("Villain range has no combos left")
+    return _ALL_COMBOS[keep]
+
+
+def warm_up() -> None:
+    """
+    評価エンジンの表と一括評価の配列を用意しておく（初回は表の読み込み・構築に時間がかかる）。
+    締め切りを決める前に呼ぶこと。2回目以降は何もしない。
+    """
+    global _warmed_up
+    if _warmed_up:
+        return
+    get_hand_evaluator()
+    evaluate_hands_batch(_ALL_COMBOS[:2], np.array([[2, 3, 4, 5, 6], [7, 8, 9, 10, 11]], dtype=np.int64))
+    _warmed_up = True
+
+
+_warmed_up = False
+
+
+def _rollout(rng, hero: np.ndarray, board: np.ndarray, combos: np.ndarray, opponents: int, size: int):
+    """size 回のロールアウトを行い、(エクイティの合計, 有効な試行数) を返す"""
+    villains = combos[rng.integers(0, len(combos), size=(size, opponents))]  # (size, 相手, 2)
+    if opponents > 1:
+        # 相手同士でカードが重なった試行は捨てる
+        flat = np.sort(villains.reshape(size, -1), axis=1)
+        villains = villains[~(np.diff(flat, axis=1) == 0).any(axis=1)]
+        size = len(villains)
+        if not size:
+            return 0.0, 0
+
+    boards = np.empty((size, 5), dtype=np.int64)
+    boards[:, :len(board)] = board
+    needed = 5 - len(board)
+    if needed:
+        keys = rng.random((size, 52))
+        keys[:, hero] = 2.0
+        keys[:, board] = 2.0
+        np.put_along_axis(keys, villains.reshape(size, -1), 2.0, axis=1)
+        boards[:, len(board):] = keys.argpartition(needed - 1, axis=1)[:, :needed]
+
+    holes = np.concatenate([np.broadcast_to(hero, (size, 2)), villains.reshape(-1, 2)])
+    ranks = evaluate_hands_batch(holes, np.concatenate([boards, np.repeat(boards, opponents, axis=0)]))
+    hero_rank = ranks[:size]
+    villain_ranks = ranks[size:].reshape(size, opponents)
+    best = villain_ranks.min(axis=1)
+    ties = (villain_ranks == hero_rank[:, None]).sum(axis=1)
+    shares = np.where(hero_rank < best, 1.0, np.where(hero_rank == best, 1.0 / (ties + 1), 0.0))
+    return float(shares.sum()), size
+
+
+def estimate_equity(
+    hole_cards: Sequence[Card],
+    board: Sequence[Card],
+    opponents: int,
+    deadline: float,
+    villain_range: Optional[bytes] = None,
+    max_samples: int = 20000,
+    target_error: float = 0.0,
+    max_batch: int = 1000,
+    rng: Optional[np.random.Generator] = None,
+) -> EquityEstimate:
+    """
+    opponents 人の相手（全員が villain_range から配られる）に対するエクイティを、
+    deadline (time.perf_counter の値) まで推定を更新し続けて返す。
+    max_samples に達するか、標準誤差が target_error を下回った時点でも打ち切る。
+    評価エンジンの準備時間も締め切りに含まれるので、時間を守るには先に warm_up() を呼んでおく。
+    """
+    if opponents < 1:
+        raise ValueError("At least one opponent is required")
+    rng = rng or np.random.default_rng()
+    hero = np.array([c.id for c in hole_cards], dtype=np.int64)
+    board_ids = np.array([c.id for c in board], dtype=np.int64)
+    combos = _range_combos(villain_range, hero.tolist() + board_ids.tolist())
+
+    total, samples = 0.0, 0
+    size = _FIRST_BATCH
+    while samples < max_samples:
+        start = time.perf_counter()
+        shares, done = _rollout(rng, hero, board_ids, combos, opponents, min(size, max_samples - samples))
+        total += shares
+        samples += done
+        now = time.perf_counter()
+        estimate = EquityEstimate(total / samples if samples else 0.0, samples)
+        if samples and estimate.std_error < target_error:
+            break
+        # 次のバッチが締め切りまでの残り時間の半分で終わる大きさにする
+        per_sample = (now - start) / max(done, 1)
+        size = min(max_batch, int((deadline - now) * 0.5 / per_sample)) if per_sample > 0 else max_batch
+        if size < 1:
+            break
+    return EquityEstimate(total / samples if samples else 0.0, samples)
+
+
+@dataclass(frozen=True)
+class PostflopPolicy:
+    """
+    エクイティとポットオッズで判断するフロップ以降のAI。
+    - time_budget: 1回の判断にかける時間（秒）。これを超えないようにロールアウトを打ち切る
+    - villain_range: 相手のレンジ（compile_range の表）。None ならすべてのハンド
+    - value_equity / strong_equity: ベット（レイズ）する、ポットサイズで打つエクイティの下限
+    """
+    time_budget: float = 0.02
+    villain_range: Optional[bytes] = None
+    max_samples: int = 20000
+    target_error: float = 0.01
+    value_equity: float = 0.6
+    strong_equity: float = 0.75
+    seed: Optional[int] = None
+
+    def estimate(self, game_state: GameState, deadline: Optional[float] = None) -> EquityEstimate:
+        seat = game_state.table.seats[game_state.current_seat_index]
+        opponents = sum(
+            1 for s in game_state.table.seats
+            if s.is_occupied and s.status in _IN_HAND and s is not seat
+        )
+        if deadline is None:
+            warm_up()
+            deadline = time.perf_counter() + self.time_budget
+        return estimate_equity(
+            seat.hole_cards,
+            game_state.table.community_cards,
+            max(opponents, 1),
+            deadline,
+            villain_range=self.villain_range,
+            max_samples=self.max_samples,
+            target_error=self.target_error,
+            rng=np.random.default_rng(self.seed),
+        )
+
+    def decide(self, game_state: GameState) -> Action:
+        warm_up()
+        deadline = time.perf_counter() + self.time_budget
+        seat_index = game_state.current_seat_index
+        seat = game_state.table.seats[seat_index]
+        player_id = seat.player.player_id
+        legal = action_service.get_legal_actions(game_state, seat_index)
+        equity = self.estimate(game_state, deadline).equity
+
+        pot = game_state.table.pot + sum(s.current_bet for s in game_state.table.seats)
+        to_call = legal.call_amount
+        # ポットサイズ（強い手）またはハーフポット（価値のある手）でベット/レイズする
+        if equity >= self.value_equity:
+            fraction = 1.0 if equity >= self.strong_equity else 0.5
+            for action_type in (ActionType.BET, ActionType.RAISE):
+                bounds = legal.bounds(action_type)
+                if bounds is None:
+                    continue
+                # レイズ後の合計額 = コールしたあとのポットの fraction 倍を上乗せ
+                target = seat.current_bet + to_call + int((pot + to_call) * fraction)
+                amount = max(bounds[0], min(target, bounds[1]))
+                return Action(player_id, action_type, amount=amount)
+
+        if legal.can_check:
+            return Action(player_id, ActionType.CHECK)
+        if legal.can_call and equity >= to_call / (pot + to_call):
+            return Action(player_id, ActionType.CALL, amount=to_call)
+        return Action(player_id, ActionType.FOLD)
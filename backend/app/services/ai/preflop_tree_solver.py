@@ -0,0 +1,273 @@
+# app/services/ai/preflop_tree_solver.py
+"""
+ヘッズアップのプリフロップを、オープン / 3ベット（オールイン）の小さな木に抽象化して CFR+ で解く（オフライン処理）。
+
+ゲーム木（BTN が先に動く。金額は BB 単位、S は有効スタック）:
+    BTN: フォールド / オープン (open_size) / オールイン (S)
+      オープン   -> BB: フォールド / コール / 3ベット (S)
+                       3ベット -> BTN: フォールド / コール
+      オールイン -> BB: フォールド / コール
+オープンにコールしてフロップに進んだ場合は、ポットをエクイティの割合で分けるものとする（フロップ以降の木は持たない）。
+ハンドは169のハンドクラスで抽象化し、リグレットと戦略の更新はクラスの次元で NumPy で一括に行う。
+浅いスタックは push_fold_solver の表に任せ、既定ではその上 (26〜100BB) を解く。
+マルチウェイのプリフロップは対象外で、ai_strategy.OPENING_RANGES のまま。
+
+有効スタックごとに解いた結果を、(スタック, 情報集合の行動, ハンドクラス) の uint8 の確率として保存し、
+実行時は memmap で読み込んで O(1) で引く。
+
+    python -m app.services.preflop_equity --samples 2000   # エクイティ表がなければ先に生成
+    python -m app.services.ai.preflop_tree_solver [--out PATH] [--min-bb N] [--max-bb N] [--open-size X] [--iterations N]
+"""
+import argparse
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.config import DATA_DIR
+from app.services.ai import push_fold_solver
+from app.services.ai.push_fold_solver import DEFAULT_ITERATIONS, HEADS_UP_SMALL_BLIND, NUM_CLASSES, matchup_weights
+
+TABLE_FILE = DATA_DIR / "preflop_tree_v1.bin"
+DEFAULT_MIN_BB = push_fold_solver.DEFAULT_MAX_BB + 1
+DEFAULT_MAX_BB = 100
+DEFAULT_OPEN_SIZE = 2.5   # ai_agent_service のオープン額と同じ
+
+# 情報集合
+BTN_OPEN, BB_VS_OPEN, BTN_VS_3BET, BB_VS_JAM = range(4)
+# 情報集合ごとの行動（表の行はこの順に並べる）
+NODE_ACTIONS = (
+    ("fold", "open", "jam"),    # BTN_OPEN
+    ("fold", "call", "jam"),    # BB_VS_OPEN
+    ("fold", "call"),           # BTN_VS_3BET
+    ("fold", "call"),           # BB_VS_JAM
+)
+_ROW_OFFSETS = tuple(int(x) for x in np.cumsum([0] + [len(a) for a in NODE_ACTIONS[:-1]]))
+NUM_ROWS = sum(len(a) for a in NODE_ACTIONS)
+
+_MAGIC = b"PFT1"
+_HEADER = struct.Struct("<4sHHHHff")  # magic, クラス数, 行数, 最小BB, 最大BB, SB/BB の比, オープン額 (BB)
+
+
+class PreflopTreeSolution(NamedTuple):
+    strategies: Tuple[np.ndarray, ...]   # 情報集合ごとの (169, 行動数) の平均戦略
+    exploitability: float                # 両者の最適反応での利得の合計の半分 (BB単位)
+
+
+class _Tree:
+    """終端の BTN の利得に組み合わせの重みを掛けたものを持ち、行動ごとの反実仮想値を計算する"""
+
+    def __init__(self, weights, heads_up, stack_bb, open_size, small_blind):
+        self.weights = weights
+        self.open_size = open_size
+        self.small_blind = small_blind
+        # オープンにコールされてフロップへ / オールインにコールされてショウダウン
+        self.flop = weights * (heads_up * 2 * open_size - open_size)
+        self.all_in = weights * (heads_up * 2 * stack_bb - stack_bb)
+
+    def btn_values(self, vs_open, vs_jam, vs_3bet):
+        """BB の戦略に対する BTN の値: (根の (169, 3), 3ベットを受けたときの (169, 2))"""
+        w = self.weights
+        three_bet = np.stack([-self.open_size * (w @ vs_open[:, 2]), self.all_in @ vs_open[:, 2]], axis=1)
+        fold = -self.small_blind * w.sum(axis=1)
+        opened = w @ vs_open[:, 0] + self.flop @ vs_open[:, 1] + (vs_3bet * three_bet).sum(axis=1)
+        jam = w @ vs_jam[:, 0] + self.all_in @ vs_jam[:, 1]
+        return np.stack([fold, opened, jam], axis=1), three_bet
+
+    def bb_values(self, root, vs_3bet):
+        """BTN の戦略に対する BB の値: (オープンを受けたときの (169, 3), オールインを受けたときの (169, 2))"""
+        w = self.weights
+        opened, jammed = root[:, 1], root[:, 2]
+        vs_open = np.stack([
+            -(w.T @ opened),
+            -(self.flop.T @ opened),
+            self.open_size * (w.T @ (opened * vs_3bet[:, 0])) - self.all_in.T @ (opened * vs_3bet[:, 1]),
+        ], axis=1)
+        vs_jam = np.stack([-(w.T @ jammed), -(self.all_in.T @ jammed)], axis=1)
+        return vs_open, vs_jam
+
+    def exploitability(self, root, vs_open, vs_3bet, vs_jam) -> float:
+        """それぞれが相手の戦略に最適反応したときに得られる利得の平均（ナッシュ均衡なら0）"""
+        btn, three_bet = self.btn_values(vs_open, vs_jam, vs_3bet)
+        btn[:, 1] += (np.max(three_bet, axis=1) - (vs_3bet * three_bet).sum(axis=1))
+        bb_open, bb_jam = self.bb_values(root, vs_3bet)
+        # BB は BTN がフォールドしたハンドでは SB を得る
+        folded = self.small_blind * (self.weights.sum(axis=1) * root[:, 0]).sum()
+        btn_best = np.max(btn, axis=1).sum()
+        bb_best = np.max(bb_open, axis=1).sum() + np.max(bb_jam, axis=1).sum() + folded
+        return float((btn_best + bb_best) / 2)
+
+
+def _regret_matching(regret: np.ndarray) -> np.ndarray:
+    total = regret.sum(axis=1, keepdims=True)
+    return np.where(total > 0, regret / np.where(total > 0, total, 1), 1 / regret.shape[1])
+
+
+def solve_preflop_tree(
+    heads_up: np.ndarray,
+    stack_bb: float,
+    open_size: float = DEFAULT_OPEN_SIZE,
+    small_blind: float = HEADS_UP_SMALL_BLIND,
+    iterations: int = DEFAULT_ITERATIONS,
+    weights: Optional[np.ndarray] = None,
+) -> PreflopTreeSolution:
+    """
+    有効スタック stack_bb (BB単位、ブラインドを含む) のオープン / 3ベットの木を CFR+ で解く。
+    heads_up[a, b] はハンドクラス a が b に対してオールインしたときのエクイティ。
+    """
+    if stack_bb <= open_size:
+        raise ValueError("stack_bb must be deeper than the open size")
+    if weights is None:
+        weights = matchup_weights()
+    tree = _Tree(weights, np.asarray(heads_up, dtype=np.float64), stack_bb, open_size, small_blind)
+
+    shapes = [(NUM_CLASSES, len(actions)) for actions in NODE_ACTIONS]
+    regrets = [np.zeros(shape) for shape in shapes]
+    averages = [np.zeros(shape) for shape in shapes]
+    strategies = [np.full(shape, 1 / shape[1]) for shape in shapes]
+
+    def update(node, values):
+        value = (strategies[node] * values).sum(axis=1, keepdims=True)
+        regrets[node] = np.maximum(regrets[node] + values - value, 0)
+        strategies[node] = _regret_matching(regrets[node])
+
+    for t in range(1, iterations + 1):
+        # 交互に更新する（BTN の更新結果を使って BB を更新）
+        root, three_bet = tree.btn_values(strategies[BB_VS_OPEN], strategies[BB_VS_JAM], strategies[BTN_VS_3BET])
+        update(BTN_OPEN, root)
+        update(BTN_VS_3BET, three_bet)
+        # CFR+ の平均戦略は反復回数と自分の到達確率で重み付けする
+        averages[BTN_OPEN] += t * strategies[BTN_OPEN]
+        averages[BTN_VS_3BET] += t * strategies[BTN_OPEN][:, 1:2] * strategies[BTN_VS_3BET]
+
+        vs_open, vs_jam = tree.bb_values(strategies[BTN_OPEN], strategies[BTN_VS_3BET])
+        update(BB_VS_OPEN, vs_open)
+        update(BB_VS_JAM, vs_jam)
+        averages[BB_VS_OPEN] += t * strategies[BB_VS_OPEN]
+        averages[BB_VS_JAM] += t * strategies[BB_VS_JAM]
+
+    # 平均戦略の重みを確率にする（一度も到達しなかったハンドは一様）
+    average = tuple(_regret_matching(a) for a in averages)
+    return PreflopTreeSolution(
+        average, tree.exploitability(average[BTN_OPEN], average[BB_VS_OPEN], average[BTN_VS_3BET], average[BB_VS_JAM])
+    )
+
+
+def build_table(heads_up: np.ndarray, min_bb: int = DEFAULT_MIN_BB, max_bb: int = DEFAULT_MAX_BB,
+                open_size: float = DEFAULT_OPEN_SIZE, small_blind: float = HEADS_UP_SMALL_BLIND,
+                iterations: int = DEFAULT_ITERATIONS) -> np.ndarray:
+    """有効スタック min_bb〜max_bb BB の戦略を (深さ, 行, 169) の確率の配列にまとめる"""
+    weights = matchup_weights()
+    table = np.zeros((max_bb - min_bb + 1, NUM_ROWS, NUM_CLASSES))
+    for i, depth in enumerate(range(min_bb, max_bb + 1)):
+        solution = solve_preflop_tree(heads_up, depth, open_size, small_blind, iterations, weights)
+        for node, strategy in enumerate(solution.strategies):
+            table[i, _ROW_OFFSETS[node]:_ROW_OFFSETS[node] + strategy.shape[1]] = strategy.T
+    return table
+
+
+class PreflopTreeTable:
+    """解いた戦略表への O(1) 参照"""
+
+    def __init__(self, probabilities: np.ndarray, min_bb: int = DEFAULT_MIN_BB,
+                 open_size: float = DEFAULT_OPEN_SIZE, small_blind_ratio: float = HEADS_UP_SMALL_BLIND):
+        self.probabilities = probabilities   # uint8 (深さ, NUM_ROWS, 169)、255 が確率1
+        self.min_bb = min_bb
+        self.open_size = open_size
+        self.small_blind_ratio = small_blind_ratio
+
+    @property
+    def max_bb(self) -> int:
+        return self.min_bb + self.probabilities.shape[0] - 1
+
+    def covers(self, stack_bb: float) -> bool:
+        return self.min_bb - 0.5 <= stack_bb < self.max_bb + 0.5
+
+    def _depth(self, stack_bb: float) -> int:
+        return min(max(int(stack_bb + 0.5), self.min_bb), self.max_bb) - self.min_bb
+
+    def strategy(self, node: int, stack_bb: float, hand_class: int) -> np.ndarray:
+        """情報集合 node での行動ごとの確率 (NODE_ACTIONS[node] の順)"""
+        start = _ROW_OFFSETS[node]
+        return self.probabilities[self._depth(stack_bb), start:start + len(NODE_ACTIONS[node]), hand_class] / 255
+
+    def action(self, node: int, stack_bb: float, hand_class: int) -> str:
+        """情報集合 node で最も確率の高い行動（同じならフォールド寄りの先の行動）"""
+        return NODE_ACTIONS[node][int(np.argmax(self.strategy(node, stack_bb, hand_class)))]
+
+
+def save_table(path: Path, table: np.ndarray, min_bb: int = DEFAULT_MIN_BB, open_size: float = DEFAULT_OPEN_SIZE,
+               small_blind: float = HEADS_UP_SMALL_BLIND) -> None:
+    """戦略表を確率を 0〜255 に量子化して書き出す"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    max_bb = min_bb + table.shape[0] - 1
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, NUM_CLASSES, NUM_ROWS, min_bb, max_bb, small_blind, open_size))
+        f.write(np.rint(np.clip(table, 0, 1) * 255).astype(np.uint8).tobytes())
+    tmp_path.replace(path)
+
+
+def load_table(path: Path) -> PreflopTreeTable:
+    """戦略表を読み取り専用で memmap する"""
+    with open(path, "rb") as f:
+        magic, num_classes, num_rows, min_bb, max_bb, small_blind, open_size = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != _MAGIC or num_classes != NUM_CLASSES or num_rows != NUM_ROWS or not 0 < min_bb <= max_bb:
+        raise ValueError(f"Invalid preflop tree table: {path}")
+    depths = max_bb - min_bb + 1
+    data = np.memmap(path, dtype=np.uint8, mode="r", offset=_HEADER.size)
+    if data.size != depths * NUM_ROWS * NUM_CLASSES:
+        raise ValueError(f"Truncated preflop tree table: {path}")
+    return PreflopTreeTable(data.reshape(depths, NUM_ROWS, NUM_CLASSES), min_bb, open_size, small_blind)
+
+
+_table: Optional[PreflopTreeTable] = None
+_table_loaded = False
+_lock = threading.Lock()
+
+
+def get_preflop_tree_table() -> Optional[PreflopTreeTable]:
+    """プロセス全体で共有する戦略表を返す（未生成なら None）"""
+    global _table, _table_loaded
+    if not _table_loaded:
+        with _lock:
+            if not _table_loaded:
+                try:
+                    _table = load_table(TABLE_FILE)
+                except (OSError, ValueError):
+                    _table = None
+                _table_loaded = True
+    return _table
+
+
+def main():
+    from app.services.preflop_equity import get_preflop_tables
+
+    parser = argparse.ArgumentParser(description="Solve a heads-up open/3-bet preflop tree with CFR+.")
+    parser.add_argument("--out", type=Path, default=TABLE_FILE)
+    parser.add_argument("--min-bb", type=int, default=DEFAULT_MIN_BB)
+    parser.add_argument("--max-bb", type=int, default=DEFAULT_MAX_BB)
+    parser.add_argument("--open-size", type=float, default=DEFAULT_OPEN_SIZE, help="Open raise size in big blinds")
+    parser.add_argument("--small-blind", type=float, default=HEADS_UP_SMALL_BLIND, help="Small blind in big blinds")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    args = parser.parse_args()
+    if args.min_bb <= args.open_size or args.max_bb < args.min_bb:
+        parser.error("--min-bb must be deeper than --open-size and not above --max-bb")
+
+    tables = get_preflop_tables()
+    if tables is None:
+        parser.error("Preflop equity table not found; run `python -m app.services.preflop_equity --samples 2000` first")
+
+    start = time.perf_counter()
+    table = build_table(np.asarray(tables.heads_up), args.min_bb, args.max_bb, args.open_size,
+                        args.small_blind, args.iterations)
+    save_table(args.out, table, args.min_bb, args.open_size, args.small_blind)
+    print(f"Wrote {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
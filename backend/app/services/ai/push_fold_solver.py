@@ -0,0 +1,240 @@
+# app/services/ai/push_fold_solver.py
+"""
+ヘッズアップのプッシュ/フォールドを CFR+ で解き、戦略表を作る（オフライン処理）。
+
+ゲーム木: 先に動く側 (SB) がオールイン (push) かフォールド、push に対して BB がコールかフォールド。
+このエンジンのヘッズアップは BTN と BB だけで SB を払わないので、既定では SB を 0 として解く
+（表の SB は BTN のこと）。
+ハンドは169のハンドクラスで抽象化し、リグレットと戦略の更新はクラスの次元で NumPy で一括に行う。
+ショウダウンのエクイティは preflop_equity の heads_up 表を使う。
+
+有効スタック 1〜MAX BB ごとに解いた結果を、(スタック, 手番, ハンドクラス) の uint8 の確率として保存し、
+実行時は memmap で読み込んで O(1) で引く。
+
+    python -m app.services.preflop_equity --samples 2000   # エクイティ表がなければ先に生成
+    python -m app.services.ai.push_fold_solver [--out PATH] [--max-bb N] [--iterations N]
+"""
+import argparse
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from app.config import DATA_DIR
+from app.services.ai.ai_strategy import HAND_CLASS_COMBOS
+
+TABLE_FILE = DATA_DIR / "push_fold_v1.bin"
+NUM_CLASSES = 169
+DEFAULT_MAX_BB = 25
+DEFAULT_ITERATIONS = 1000
+# ヘッズアップで払われる SB (BB単位)。position_service が BTN / BB しか割り当てないので 0
+HEADS_UP_SMALL_BLIND = 0.0
+
+# 手番（表の2番目の次元）
+SB, BB = 0, 1
+
+_MAGIC = b"PFS1"
+_HEADER = struct.Struct("<4sHHff")  # magic, クラス数, 最大BB, SB/BB の比, 予備
+
+
+def matchup_weights() -> np.ndarray:
+    """
+    ハンドクラス a と b が同時に配られる組み合わせの数（カードの重複を除く）を正規化したもの。
+    """
+    combos = [(c1, c2, cls) for cls, pairs in enumerate(HAND_CLASS_COMBOS) for c1, c2 in pairs]
+    masks = np.zeros((len(combos), 52), dtype=np.float32)
+    classes = np.zeros((len(combos), NUM_CLASSES), dtype=np.float32)
+    for i, (c1, c2, cls) in enumerate(combos):
+        masks[i, [c1, c2]] = 1
+        classes[i, cls] = 1
+    disjoint = (masks @ masks.T) == 0
+    weights = classes.T @ disjoint.astype(np.float32) @ classes
+    return weights / weights.sum()
+
+
+class PushFoldSolution(NamedTuple):
+    push: np.ndarray            # SB がハンドクラスごとに push する確率
+    call: np.ndarray            # BB がハンドクラスごとにコールする確率
+    exploitability: float       # 両者の最適反応での利得の合計の半分 (BB単位)
+
+
+def _sb_values(weights, sb_showdown, call, small_blind, big_blind):
+    """SB のハンドクラスごとの (フォールド, push) の反実仮想値"""
+    push = (weights * (sb_showdown * call + big_blind * (1 - call))).sum(axis=1)
+    fold = -small_blind * weights.sum(axis=1)
+    return fold, push
+
+
+def _bb_values(weights, sb_showdown, push, big_blind):
+    """BB のハンドクラスごとの (フォールド, コール) の反実仮想値"""
+    reach = weights * push[:, None]
+    call = -(reach * sb_showdown).sum(axis=0)
+    fold = -big_blind * reach.sum(axis=0)
+    return fold, call
+
+
+def exploitability(push, call, weights, sb_showdown, small_blind, big_blind) -> float:
+    """それぞれが相手の戦略に最適反応したときに得られる利得の平均（ナッシュ均衡なら0）"""
+    sb_fold, sb_push = _sb_values(weights, sb_showdown, call, small_blind, big_blind)
+    bb_fold, bb_call = _bb_values(weights, sb_showdown, push, big_blind)
+    # ゼロサムなので、戦略どうしの利得は打ち消し合い、最適反応の値の和だけが残る
+    # （BB は push されなかったハンドでは SB のブラインドを得る）
+    sb_best = np.maximum(sb_push, sb_fold).sum()
+    bb_best = np.maximum(bb_call, bb_fold).sum() + small_blind * (weights.sum(axis=1) * (1 - push)).sum()
+    return float((sb_best + bb_best) / 2)
+
+
+def solve_push_fold(
+    heads_up: np.ndarray,
+    stack_bb: float,
+    small_blind: float = HEADS_UP_SMALL_BLIND,
+    big_blind: float = 1.0,
+    iterations: int = DEFAULT_ITERATIONS,
+    weights: Optional[np.ndarray] = None,
+) -> PushFoldSolution:
+    """
+    有効スタック stack_bb (BB単位、ブラインドを含む) のプッシュ/フォールドを CFR+ で解く。
+    heads_up[a, b] はハンドクラス a が b に対してオールインしたときのエクイティ。
+    """
+    if stack_bb < big_blind:
+        raise ValueError("stack_bb must be at least one big blind")
+    if weights is None:
+        weights = matchup_weights()
+    heads_up = np.asarray(heads_up, dtype=np.float64)
+    # コールされたときの SB の利得（2人とも stack_bb を出す）
+    sb_showdown = heads_up * 2 * stack_bb - stack_bb
+
+    sb_regret = np.zeros((NUM_CLASSES, 2))    # [フォールド, push]
+    bb_regret = np.zeros((NUM_CLASSES, 2))    # [フォールド, コール]
+    sb_average = np.zeros(NUM_CLASSES)
+    bb_average = np.zeros(NUM_CLASSES)
+    push = np.full(NUM_CLASSES, 0.5)
+    call = np.full(NUM_CLASSES, 0.5)
+
+    def regret_matching(regret: np.ndarray) -> np.ndarray:
+        total = regret.sum(axis=1)
+        return np.where(total > 0, regret[:, 1] / np.where(total > 0, total, 1), 0.5)
+
+    for t in range(1, iterations + 1):
+        # 交互に更新する（SB の更新結果を使って BB を更新）
+        fold_value, push_value = _sb_values(weights, sb_showdown, call, small_blind, big_blind)
+        value = push * push_value + (1 - push) * fold_value
+        sb_regret = np.maximum(sb_regret + np.stack([fold_value - value, push_value - value], axis=1), 0)
+        push = regret_matching(sb_regret)
+        sb_average += t * push
+
+        fold_value, call_value = _bb_values(weights, sb_showdown, push, big_blind)
+        value = call * call_value + (1 - call) * fold_value
+        bb_regret = np.maximum(bb_regret + np.stack([fold_value - value, call_value - value], axis=1), 0)
+        call = regret_matching(bb_regret)
+        bb_average += t * call
+
+    # CFR+ の平均戦略は反復回数で重み付けする
+    norm = iterations * (iterations + 1) / 2
+    push, call = sb_average / norm, bb_average / norm
+    return PushFoldSolution(push, call, exploitability(push, call, weights, sb_showdown, small_blind, big_blind))
+
+
+def build_table(heads_up: np.ndarray, max_bb: int = DEFAULT_MAX_BB, small_blind: float = HEADS_UP_SMALL_BLIND,
+                iterations: int = DEFAULT_ITERATIONS) -> np.ndarray:
+    """有効スタック 1〜max_bb BB の戦略を (max_bb, 2, 169) の確率の配列にまとめる"""
+    weights = matchup_weights()
+    table = np.zeros((max_bb, 2, NUM_CLASSES))
+    for depth in range(1, max_bb + 1):
+        solution = solve_push_fold(heads_up, depth, small_blind, 1.0, iterations, weights)
+        table[depth - 1, SB] = solution.push
+        table[depth - 1, BB] = solution.call
+    return table
+
+
+class PushFoldTable:
+    """解いた戦略表への O(1) 参照"""
+
+    def __init__(self, probabilities: np.ndarray, small_blind_ratio: float = HEADS_UP_SMALL_BLIND):
+        self.probabilities = probabilities   # uint8 (max_bb, 2, 169)、255 が確率1
+        self.small_blind_ratio = small_blind_ratio
+
+    @property
+    def max_bb(self) -> int:
+        return self.probabilities.shape[0]
+
+    def covers(self, stack_bb: float) -> bool:
+        return stack_bb < self.max_bb + 0.5
+
+    def _depth(self, stack_bb: float) -> int:
+        return min(max(int(stack_bb + 0.5), 1), self.max_bb) - 1
+
+    def push_probability(self, stack_bb: float, hand_class: int) -> float:
+        return self.probabilities[self._depth(stack_bb), SB, hand_class] / 255
+
+    def call_probability(self, stack_bb: float, hand_class: int) -> float:
+        return self.probabilities[self._depth(stack_bb), BB, hand_class] / 255
+
+
+def save_table(path: Path, table: np.ndarray, small_blind: float = HEADS_UP_SMALL_BLIND) -> None:
+    """戦略表を確率を 0〜255 に量子化して書き出す"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, NUM_CLASSES, table.shape[0], small_blind, 0.0))
+        f.write(np.rint(np.clip(table, 0, 1) * 255).astype(np.uint8).tobytes())
+    tmp_path.replace(path)
+
+
+def load_table(path: Path) -> PushFoldTable:
+    """戦略表を読み取り専用で memmap する"""
+    with open(path, "rb") as f:
+        magic, num_classes, max_bb, small_blind, _ = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != _MAGIC or num_classes != NUM_CLASSES or max_bb == 0:
+        raise ValueError(f"Invalid push/fold table: {path}")
+    data = np.memmap(path, dtype=np.uint8, mode="r", offset=_HEADER.size)
+    if data.size != max_bb * 2 * NUM_CLASSES:
+        raise ValueError(f"Truncated push/fold table: {path}")
+    return PushFoldTable(data.reshape(max_bb, 2, NUM_CLASSES), small_blind)
+
+
+_table: Optional[PushFoldTable] = None
+_table_loaded = False
+_lock = threading.Lock()
+
+
+def get_push_fold_table() -> Optional[PushFoldTable]:
+    """プロセス全体で共有する戦略表を返す（未生成なら None）"""
+    global _table, _table_loaded
+    if not _table_loaded:
+        with _lock:
+            if not _table_loaded:
+                try:
+                    _table = load_table(TABLE_FILE)
+                except (OSError, ValueError):
+                    _table = None
+                _table_loaded = True
+    return _table
+
+
+def main():
+    from app.services.preflop_equity import get_preflop_tables
+
+    parser = argparse.ArgumentParser(description="Solve heads-up push/fold with CFR+.")
+    parser.add_argument("--out", type=Path, default=TABLE_FILE)
+    parser.add_argument("--max-bb", type=int, default=DEFAULT_MAX_BB)
+    parser.add_argument("--small-blind", type=float, default=HEADS_UP_SMALL_BLIND, help="Small blind in big blinds")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    args = parser.parse_args()
+
+    tables = get_preflop_tables()
+    if tables is None:
+        parser.error("Preflop equity table not found; run `python -m app.services.preflop_equity --samples 2000` first")
+
+    start = time.perf_counter()
+    table = build_table(np.asarray(tables.heads_up), args.max_bb, args.small_blind, args.iterations)
+    save_table(args.out, table, args.small_blind)
+    print(f"Wrote {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# app/services/equity_service.py
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.deck import Card
+from app.services.evaluation_service import evaluate_hands_batch
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+@dataclass(frozen=True)
+class EquityResult:
+    """各ハンドの勝率・引き分け率・エクイティ（引き分けは人数割り）"""
+    win: List[float]
+    tie: List[float]
+    equity: List[float]
+    samples: int
+
+
+def estimate_equity(
+    hole_cards: Sequence[Sequence[Card]],
+    board: Sequence[Card] = (),
+    dead_cards: Sequence[Card] = (),
+    samples: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    seed: Optional[int] = None,
+    workers: Optional[int] = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> EquityResult:
+    """
+    モンテカルロ法で各ハンドのエクイティを推定する。
+    - samples: 試行回数。time_budget (秒) とどちらか一方を指定する
+    - seed: 同じ seed・samples なら workers 数に関係なく同じ結果になる
+    - workers: 2以上ならプロセスプールでバッチを並列実行する
+    """
+    if (samples is None) == (time_budget is None):
+        raise ValueError("Specify exactly one of samples or time_budget")
+    if samples is not None and samples <= 0:
+        raise ValueError("samples must be positive")
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+
+    hole_ids, board_ids, live_ids = _prepare_cards(hole_cards, board, dead_cards)
+    seed_seq = np.random.SeedSequence(seed)
+    job = (hole_ids, board_ids, live_ids)
+
+    # ボードが確定していれば1回の評価で厳密に求まる
+    if len(board_ids) == 5:
+        wins, ties, shares = _run_batch(job, 1, seed_seq.entropy, 0)
+        return _to_result(wins, ties, shares, 1)
+
+    if samples is not None:
+        sizes = [batch_size] * (samples // batch_size)
+        if samples % batch_size:
+            sizes.append(samples % batch_size)
+        deadline = None
+    else:
+        sizes = None
+        deadline = time.perf_counter() + time_budget
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or (sizes is not None and len(sizes) == 1):
+        totals = _run_in_process(job, sizes, batch_size, deadline, seed_seq.entropy)
+    else:
+        totals = _run_in_pool(job, sizes, batch_size, deadline, seed_seq.entropy, workers)
+    return _to_result(*totals)
+
+
+def _prepare_cards(hole_cards, board, dead_cards) -> Tuple[tuple, tuple, tuple]:
+    if not hole_cards:
+        raise ValueError("At least one hand is required")
+    if len(board) > 5:
+        raise ValueError("Board cannot have more than 5 cards")
+    for hand in hole_cards:
+        if len(hand) != 2:
+            raise ValueError("Each hand must have exactly two hole cards")
+
+    hole_ids = tuple((hand[0].id, hand[1].id) for hand in hole_cards)
+    board_ids = tuple(c.id for c in board)
+    known = [i for hand in hole_ids for i in hand] + list(board_ids) + [c.id for c in dead_cards]
+    if len(set(known)) != len(known):
+        raise ValueError("Duplicate cards in hands, board or dead cards")
+
+    known_set = set(known)
+    live_ids = tuple(i for i in range(52) if i not in known_set)
+    if len(live_ids) < 5 - len(board_ids):
+        raise ValueError("Not enough live cards to complete the board")
+    return hole_ids, board_ids, live_ids
+
+
+def _run_batch(job, size: int, entropy: int, batch_index: int):
+    """1バッチ分のロールアウトを行い、(勝ち数, 引き分け数, 勝ち+分配シェア) を返す"""
+    hole_ids, board_ids, live_ids = job
+    num_hands = len(hole_ids)
+    needed = 5 - len(board_ids)
+
+    # バッチ番号ごとに独立した乱数列を使うので、実行順やワーカー数に依存しない
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(batch_index,)))
+    boards = np.empty((size, 5), dtype=np.int64)
+    boards[:, :len(board_ids)] = board_ids
+    if needed:
+        live = np.asarray(live_ids, dtype=np.int64)
+        picks = rng.random((size, len(live))).argpartition(needed - 1, axis=1)[:, :needed]
+        boards[:, len(board_ids):] = live[picks]
+
+    holes = np.repeat(np.asarray(hole_ids, dtype=np.int64), size, axis=0)
+    ranks = evaluate_hands_batch(holes, np.tile(boards, (num_hands, 1))).reshape(num_hands, size)
+
+    is_best = ranks == ranks.min(axis=0)
+    num_best = is_best.sum(axis=0)
+    wins = (is_best & (num_best == 1)).sum(axis=1)
+    ties = (is_best & (num_best > 1)).sum(axis=1)
+    shares = (is_best / num_best).sum(axis=1)
+    return wins, ties, shares
+
+
+def _run_in_process(job, sizes, batch_size, deadline, entropy):
+    num_hands = len(job[0])
+    wins = np.zeros(num_hands, dtype=np.int64)
+    ties = np.zeros(num_hands, dtype=np.int64)
+    shares = np.zeros(num_hands)
+    total = 0
+    batch_index = 0
+    while True:
+        if sizes is not None:
+            if batch_index == len(sizes):
+                break
+            size = sizes[batch_index]
+        else:
+            # 最低1バッチは実行してから締め切りを判定する
+            if batch_index > 0 and time.perf_counter() >= deadline:
+                break
+            size = batch_size
+        w, t, s = _run_batch(job, size, entropy, batch_index)
+        wins += w
+        ties += t
+        shares += s
+        total += size
+        batch_index += 1
+    return wins, ties, shares, total
+
+
+def _run_in_pool(job, sizes, batch_size, deadline, entropy, workers):
+    executor = get_executor(workers)
+    num_hands = len(job[0])
+    wins = np.zeros(num_hands, dtype=np.int64)
+    ties = np.zeros(num_hands, dtype=np.int64)
+    shares = np.zeros(num_hands)
+    total = 0
+
+    pending: dict[int, Tuple[int, Future]] = {}
+    next_index = 0
+    next_to_merge = 0
+    max_in_flight = workers * 2
+
+    def can_submit() -> bool:
+        if sizes is not None:
+            return next_index < len(sizes)
+        return next_index == 0 or time.perf_counter() < deadline
+
+    while True:
+        while len(pending) < max_in_flight and can_submit():
+            size = sizes[next_index] if sizes is not None else batch_size
+            pending[next_index] = (size, executor.submit(_run_batch, job, size, entropy, next_index))
+            next_index += 1
+        if next_to_merge not in pending:
+            break
+
+        # バッチ番号順に集計し、時間切れの場合も先頭から連続した分だけを採用する
+        size, future = pending.pop(next_to_merge)
+        if deadline is not None and next_to_merge > 0:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 and not future.done():
+                break
+            try:
+                w, t, s = future.result(timeout=max(remaining, 0))
+            except FutureTimeoutError:  # 3.10 では組み込みの TimeoutError とは別のクラス
+                break
+        else:
+            w, t, s = future.result()
+        wins += w
+        ties += t
+        shares += s
+        total += size
+        next_to_merge += 1
+
+    for _, future in pending.values():
+        future.cancel()
+    return wins, ties, shares, total
+
+
+def _to_result(wins, ties, shares, total) -> EquityResult:
+    return EquityResult(
+        win=[float(w) / total for w in wins],
+        tie=[float(t) / total for t in ties],
+        equity=[float(s) / total for s in shares],
+        samples=total,
+    )
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def get_executor(workers: int) -> ProcessPoolExecutor:
+    """ロールアウト用のプロセスプールを返す（起動コストを避けるため使い回す）"""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = ProcessPoolExecutor(max_workers=workers)
+            _executor_workers = workers
+        return _executor
+
+
+def shutdown_executor() -> None:
+    """プロセスプールを終了する"""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+            _executor_workers = 0
@@ -1,22 +1,61 @@
 # holdem_app/app/services/evaluation_service.py
 from typing import List, Tuple
 from collections import defaultdict
-from treys import Evaluator
+import numpy as np
 from app.models.game_state import GameState
 from app.models.seat import Seat
 from app.models.deck import Card
-from app.models.enum import SeatStatus
+from app.models.enum import SeatStatus, GameEvent
+from app.services.hand_evaluator import get_hand_evaluator
+
+_SUIT_SHIFTS = np.arange(4, dtype=np.int64) * 4
 
 def evaluate_hand(hole_cards: List[Card], community_cards: List[Card]) -> int:
     """
     ホールカードとコミュニティカードから役の強さを評価する。
     """
-    evaluator = Evaluator()
-    
-    treys_hole = [c.to_treys_int() for c in hole_cards]
-    treys_community = [c.to_treys_int() for c in community_cards]
-    
-    return evaluator.evaluate(treys_community, treys_hole)
+    card_ids = [c.id for c in hole_cards]
+    card_ids.extend(c.id for c in community_cards)
+    return get_hand_evaluator().evaluate_ids(card_ids)
+
+def evaluate_hands_batch(hole_cards, boards) -> np.ndarray:
+    """
+    N×2 のホールカードと N×k (k=3〜5) のボードをカードID (0-51) の整数配列で受け取り、
+    N件の役の強さを一括で評価する。結果は evaluate_hand と完全に一致する。
+    各行のカードは重複してはならない（重複があれば ValueError）。
+    """
+    hole = np.asarray(hole_cards, dtype=np.int64)
+    board = np.asarray(boards, dtype=np.int64)
+    if hole.ndim != 2 or hole.shape[1] != 2:
+        raise ValueError(f"hole_cards must have shape (N, 2), got {hole.shape}")
+    if board.ndim != 2 or board.shape[0] != hole.shape[0] or not 3 <= board.shape[1] <= 5:
+        raise ValueError(f"boards must have shape (N, 3..5), got {board.shape}")
+
+    cards = np.concatenate([hole, board], axis=1)
+    if cards.size and (cards.min() < 0 or cards.max() > 51):
+        raise ValueError("Card ids must be in range 0-51")
+    # カードが重複していなければ、各カードのビットの和と論理和が一致する
+    bits = np.left_shift(1, cards)
+    if (bits.sum(axis=1) != np.bitwise_or.reduce(bits, axis=1)).any():
+        raise ValueError("Cards in a row must be distinct")
+    tables = get_hand_evaluator().arrays
+
+    # フラッシュ以外: ランク枚数キーをソート済みテーブルから引く
+    keys = tables.card_rank_keys[cards].sum(axis=1)
+    ranks = tables.rank_values[np.searchsorted(tables.rank_keys, keys)]
+
+    # フラッシュ: 5枚以上あるスートのカードだけでランクマスクを作る
+    suit_counts = (tables.card_suit_counters[cards].sum(axis=1)[:, None] >> _SUIT_SHIFTS) & 0xF
+    is_flush_suit = suit_counts >= 5
+    has_flush = is_flush_suit.any(axis=1)
+    if has_flush.any():
+        flush_cards = cards[has_flush]
+        flush_suit = is_flush_suit[has_flush].argmax(axis=1)
+        in_suit = (flush_cards & 3) == flush_suit[:, None]
+        rank_masks = (tables.card_rank_bits[flush_cards] * in_suit).sum(axis=1)
+        ranks[has_flush] = tables.flush_table[rank_masks]
+
+    return ranks
 
 def find_winners(game_state: GameState) -> List[Tuple[Seat, int]]:
     """
@@ -30,67 +69,67 @@ def find_winners(game_state: GameState) -> List[Tuple[Seat, int]]:
     ]
     # --- 修正ここまで ---
 
+    # 未回収の current_bet も含めた、このハンドの総額
+    total = game_state.table.pot + sum(s.current_bet for s in game_state.table.seats)
+
     # 生き残ったプレイヤーが1人なら、その人がポットを総取り
     if len(showdown_seats) <= 1:
         if showdown_seats:
             winner = showdown_seats[0]
-            print(f"Winner is {winner.player.name} (everyone else folded)")
-            return [(winner, game_state.table.pot)]
+            game_state.event_sink.emit(GameEvent.POT_AWARDED, pot_name="Pot", amount=total, winners=[winner], uncontested=True)
+            return [(winner, total)]
         return []
 
     # 各プレイヤーの役を評価
-    print("--- Showdown ---")
+    scores = {}
     for seat in showdown_seats:
-        seat.hand_score = evaluate_hand(seat.hole_cards, game_state.table.community_cards)
-        evaluator = Evaluator()
-        hand_class = evaluator.get_rank_class(seat.hand_score)
-        print(f"Seat {seat.index} ({seat.player.name}) has cards {[str(c) for c in seat.hole_cards]} with hand: {evaluator.class_to_string(hand_class)}")
-
+        scores[seat.index] = evaluate_hand(seat.hole_cards, game_state.table.community_cards)
+    game_state.event_sink.emit(GameEvent.SHOWDOWN, seats=showdown_seats, scores=scores)
 
-    all_in_amounts = sorted(list(set(s.bet_total for s in showdown_seats if s.bet_total > 0)))
-    
+    # メインポット、サイドポットはベットのたびに台帳で組み立て済み
+    ledger = game_state.table.pot_ledger
+    ledger.sync(game_state.table.seats)
     pots = []
-    last_amount = 0
-    
-    # メインポット、サイドポットを計算
-    for amount in all_in_amounts:
-        pot_size = 0
-        for seat in game_state.table.seats:
-            if seat.bet_total > last_amount:
-                contribution = min(seat.bet_total, amount) - last_amount
-                pot_size += contribution
-        
-        if pot_size > 0:
-            eligible_players = [s for s in showdown_seats if s.bet_total >= amount]
-            pots.append({"size": pot_size, "eligible": eligible_players})
-        last_amount = amount
-
-    # まだポットに分配されていないベットがあれば、それもポットに加える
-    total_in_pots = sum(p['size'] for p in pots)
-    remaining_pot = game_state.table.pot - total_in_pots
-    if remaining_pot > 0:
-        # これは通常、誰もオールインしていないときのメインポット
-        eligible_players = [s for s in showdown_seats]
-        pots.append({"size": remaining_pot, "eligible": eligible_players})
+    for pot in ledger.active_pots():
+        eligible = [s for s in showdown_seats if s.index in pot.eligible]
+        if eligible:
+            pots.append([pot.amount, eligible])
+        elif pots:
+            # 獲得資格者がいないポットは1つ下のポットに含める
+            pots[-1][0] += pot.amount
+        else:
+            pots.append([pot.amount, []])
+    if pots and not pots[0][1]:
+        amount = pots.pop(0)[0]
+        if pots:
+            pots[0][0] += amount
+        else:
+            pots.append([amount, list(showdown_seats)])
 
+    # 台帳の外で積まれたチップ（ポットを直接設定した場合など）はメインポットに含める
+    extra = total - ledger.total
+    if extra > 0:
+        if pots:
+            pots[0][0] += extra
+        else:
+            pots.append([extra, list(showdown_seats)])
+
+    # 端数チップはディーラーの左隣から順に1枚ずつ配る
+    seat_count = len(game_state.table.seats)
+    dealer_idx = game_state.dealer_seat_index or 0
+    def distance_from_dealer(seat: Seat) -> int:
+        return (seat.index - dealer_idx - 1) % seat_count
 
     winnings = defaultdict(int)
-    for i, pot in enumerate(pots):
-        best_score = min(s.hand_score for s in pot["eligible"])
-        winners = [s for s in pot["eligible"] if s.hand_score == best_score]
-        
-        win_amount_per_winner = pot["size"] // len(winners)
-        pot_name = f"Main Pot" if i == 0 else f"Side Pot {i}"
-        print(f"{pot_name} ({pot['size']}) winners: {[w.player.name for w in winners]}")
+    for i, (pot_size, eligible) in enumerate(pots):
+        best_score = min(scores[s.index] for s in eligible)
+        winners = sorted((s for s in eligible if scores[s.index] == best_score), key=distance_from_dealer)
 
-        for winner in winners:
-            winnings[winner.index] += win_amount_per_winner
+        share, odd_chips = divmod(pot_size, len(winners))
+        pot_name = f"Main Pot" if i == 0 else f"Side Pot {i}"
+        game_state.event_sink.emit(GameEvent.POT_AWARDED, pot_name=pot_name, amount=pot_size, winners=winners, uncontested=False)
 
-    # 端数を最初の勝者に渡す
-    total_distributed = sum(winnings.values())
-    remainder = game_state.table.pot - total_distributed
-    if remainder > 0 and winnings:
-         first_winner_idx = list(winnings.keys())[0]
-         winnings[first_winner_idx] += remainder
+        for k, winner in enumerate(winners):
+            winnings[winner.index] += share + (1 if k < odd_chips else 0)
 
     return [(game_state.table.seats[idx], amount) for idx, amount in winnings.items()]
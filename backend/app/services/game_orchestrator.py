@@ -1,49 +1,132 @@
 # holdem_app/app/services/game_orchestrator.py
+from typing import Optional
 from app.models.game_state import GameState
 from app.models.action import Action
-from app.models.enum import Round, GameStatus, SeatStatus, ActionType
+from app.models.events import EventSink
+from app.models.enum import Round, GameStatus, SeatStatus, ActionType, GameEvent
 from app.services import (
     hand_manager,
     round_manager,
     position_service,
     action_service,
 )
+from app.services.hand_evaluator import get_hand_evaluator
 from app.services.ai import ai_agent_service
 
+
+class ConsoleEventSink(EventSink):
+    """イベントをコンソールに表示する（対話プレイ用）"""
+
+    def __init__(self):
+        self.hand_count = 0
+
+    def emit(self, event: GameEvent, **data) -> None:
+        if event == GameEvent.HAND_STARTED:
+            self.hand_count += 1
+            print(f"\n--- Starting Hand #{self.hand_count} ---")
+        elif event == GameEvent.DEALER_BUTTON:
+            print(f"Dealer button is at seat {data['seat_index']}")
+        elif event == GameEvent.POSITION_ASSIGNED:
+            seat = data["seat"]
+            print(f"Seat {seat.index} ({seat.player.name}) is {data['position'].name}")
+        elif event == GameEvent.ROUND_STARTED:
+            print(f"\n--- Dealing {data['round'].name} ---")
+        elif event == GameEvent.TURN_STARTED:
+            self.display_table(data["game_state"])
+        elif event == GameEvent.ACTION:
+            action = data["action"]
+            if action.action_type not in [ActionType.POST_SB, ActionType.POST_BB]:
+                print(f">>> {data['seat'].player.name} chooses {action.action_type.name} {action.amount or ''}")
+        elif event == GameEvent.SHOWDOWN:
+            evaluator = get_hand_evaluator()
+            print("\n--- Showdown ---")
+            for seat in data["seats"]:
+                hand_name = evaluator.describe(data["scores"][seat.index])
+                print(f"Seat {seat.index} ({seat.player.name}) has cards {[str(c) for c in seat.hole_cards]} with hand: {hand_name}")
+        elif event == GameEvent.POT_AWARDED:
+            names = [w.player.name for w in data["winners"]]
+            if data["uncontested"]:
+                print(f"Winner is {names[0]} (everyone else folded)")
+            else:
+                print(f"{data['pot_name']} ({data['amount']}) winners: {names}")
+        elif event == GameEvent.HAND_COMPLETE:
+            # 最終的な結果と、勝者ごとの獲得額を表示
+            self.display_table(data["game_state"], show_all_hands=True)
+            for seat, amount in data["winners"]:
+                print(f"{seat.player.name} wins {amount}")
+        elif event == GameEvent.PLAYER_ELIMINATED:
+            print(f"{data['seat'].player.name} has been eliminated.")
+        elif event == GameEvent.GAME_OVER:
+            print("Not enough players to continue. Game over.")
+
+    def display_table(self, game_state: GameState, show_all_hands: bool = False):
+        """
+        現在のテーブル状況をコンソールに表示する
+        """
+        print("\n" + "="*60)
+        community = [str(c) for c in game_state.table.community_cards]
+        print(f"Community: {' '.join(community):<25} Pot: {game_state.table.pot}")
+        print("-"*60)
+
+        for seat in game_state.table.seats:
+            if seat.is_occupied:
+                if show_all_hands or not seat.player.is_ai:
+                    hand = ' '.join([str(c) for c in seat.hole_cards])
+                else:
+                    hand = "? ?"
+                
+                status = f"({seat.status.name})" if seat.status != SeatStatus.ACTIVE else ""
+                dealer = "D" if game_state.dealer_seat_index == seat.index else " "
+                turn = "*" if game_state.current_seat_index == seat.index and game_state.status == GameStatus.IN_PROGRESS else " "
+                
+                print(f"{turn} Seat {seat.index} [{dealer}] {seat.player.name:<8} | Stack: {seat.stack:<6} | Bet: {seat.current_bet:<5} | Hand: {hand:<6} {status}")
+        print("="*60)
+
+
 class GameOrchestrator:
-    def __init__(self, game_state: GameState):
+    def __init__(self, game_state: GameState, event_sink: Optional[EventSink] = None, headless: bool = False):
+        """
+        headless=True の場合はコンソールに何も表示しない（AI同士のシミュレーション用）。
+        event_sink を渡すと、その受け取り先にイベントを通知する。
+        """
         self.game_state = game_state
+        self.headless = headless
+        if event_sink is not None:
+            game_state.event_sink = event_sink
+        elif not headless:
+            game_state.event_sink = ConsoleEventSink()
 
     def run_game(self, num_hands: int = 1):
         """
-        指定されたハンド数だけゲームを実行する
+        指定されたハンド数だけゲームを実行し、実際に行ったハンド数を返す
         """
+        events = self.game_state.event_sink
         hand_count = 0
         while hand_count < num_hands:
             # アクティブプレイヤーが2人未満になったらゲームを終了
             if len(position_service.get_occupied_seats(self.game_state)) < 2:
-                print("Not enough players to continue. Game over.")
+                events.emit(GameEvent.GAME_OVER)
                 break
             
-            print(f"\n--- Starting Hand #{hand_count + 1} ---")
             self.play_hand()
             hand_count += 1
             
             # スタックが0になったプレイヤーを退席させる
             for seat in self.game_state.table.seats:
                 if seat.is_occupied and seat.stack == 0:
-                    print(f"{seat.player.name} has been eliminated.")
+                    events.emit(GameEvent.PLAYER_ELIMINATED, seat=seat)
                     self.game_state.table.stand_player(seat.index)
+        return hand_count
 
 
     def play_hand(self):
         """
-        1ハンドを実行する
+        1ハンドを実行し、勝者と獲得額のリストを返す
         """
         hand_manager.start_new_hand(self.game_state)
         
         if self.game_state.status != GameStatus.IN_PROGRESS:
-            return
+            return []
 
         # プレフロップからリバーまでの各ラウンドをループ
         for round_enum in [Round.PREFLOP, Round.FLOP, Round.TURN, Round.RIVER]:
@@ -51,7 +134,6 @@ class GameOrchestrator:
             
             # フロップ以降はコミュニティカードをめくる
             if round_enum != Round.PREFLOP:
-                print(f"\n--- Dealing {round_enum.name} ---")
                 hand_manager.proceed_to_next_round(self.game_state)
 
             # 誰か一人が残るなど、ハンドが終了していないかチェック
@@ -65,15 +147,8 @@ class GameOrchestrator:
             if hand_manager._is_hand_over(self.game_state):
                 break
         
-        # ハンドの決着
-        print("\n--- Showdown ---")
-        hand_manager._conclude_hand(self.game_state)
-        # 最終的な結果を表示
-        self._display_table(self.game_state, show_all_hands=True)
-        # 勝者と獲得額を表示
-        winners = hand_manager.evaluation_service.find_winners(self.game_state)
-        for seat, amount in winners:
-            print(f"{seat.player.name} wins {amount}")
+        # ハンドの決着（結果は HAND_COMPLETE イベントで通知される）
+        return hand_manager._conclude_hand(self.game_state)
 
 
     def _get_action_for_player(self, game_state: GameState) -> Action:
@@ -82,16 +157,15 @@ class GameOrchestrator:
         """
         current_seat = game_state.table.seats[game_state.current_seat_index]
         
-        # アクションの前に必ずテーブル状況を表示
-        self._display_table(game_state)
+        # アクションの前にテーブル状況を通知（コンソールでは表示される）
+        game_state.event_sink.emit(GameEvent.TURN_STARTED, game_state=game_state, seat=current_seat)
 
         if current_seat.player.is_ai:
-            action = ai_agent_service.decide_action(game_state)
-            print(f">>> {current_seat.player.name} chooses {action.action_type.name} {action.amount or ''}")
-            return action
-        else:
-            # 人間プレイヤーからの入力を受け付ける
-            return self._get_human_action(game_state)
+            return ai_agent_service.decide_action(game_state)
+        if self.headless:
+            raise RuntimeError("Headless mode supports AI players only")
+        # 人間プレイヤーからの入力を受け付ける
+        return self._get_human_action(game_state)
 
     def _get_human_action(self, game_state: GameState) -> Action:
         """
@@ -135,27 +209,3 @@ class GameOrchestrator:
 
             except (ValueError, IndexError) as e:
                 print(f"Invalid input: {e}. Please try again.")
-
-    def _display_table(self, game_state: GameState, show_all_hands: bool = False):
-        """
-        現在のテーブル状況をコンソールに表示する
-        """
-        print("\n" + "="*60)
-        community = [str(c) for c in game_state.table.community_cards]
-        print(f"Community: {' '.join(community):<25} Pot: {game_state.table.pot}")
-        print("-"*60)
-
-        for seat in game_state.table.seats:
-            if seat.is_occupied:
-                if show_all_hands or not seat.player.is_ai:
-                    hand = ' '.join([str(c) for c in seat.hole_cards])
-                else:
-                    hand = "? ?"
-                
-                status = f"({seat.status.name})" if seat.status != SeatStatus.ACTIVE else ""
-                dealer = "D" if game_state.dealer_seat_index == seat.index else " "
-                turn = "*" if game_state.current_seat_index == seat.index and game_state.status == GameStatus.IN_PROGRESS else " "
-                
-                print(f"{turn} Seat {seat.index} [{dealer}] {seat.player.name:<8} | Stack: {seat.stack:<6} | Bet: {seat.current_bet:<5} | Hand: {hand:<6} {status}")
-        print("="*60)
-
@@ -0,0 +1,226 @@
+# app/services/hand_evaluator.py
+"""
+5〜7枚のカードを1回のテーブル参照で評価するハンド評価エンジン。
+返すランクは treys と同じ (1 = ロイヤルフラッシュ, 7462 = 最弱のハイカード)。
+
+- フラッシュ: 13ビットのランクマスク -> ランク (8192要素の配列)
+- それ以外: ランクごとの枚数を5進数で表したキー -> ランク (辞書)
+
+テーブルは初回利用時に構築し、DATA_DIR にキャッシュする。
+"""
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from treys import Card as TreysCard
+from treys.lookup import LookupTable
+
+from app.config import DATA_DIR
+from app.models.deck import FULL_DECK
+
+CACHE_FILE = DATA_DIR / "hand_evaluator_v1.bin"
+_MAGIC = b"HEV1"
+
+# カードIDごとの事前計算値
+RANK_KEYS = [5 ** c.rank_index for c in FULL_DECK]       # ランク枚数の5進数キーへの寄与
+SUIT_COUNTERS = [1 << (4 * c.suit_index) for c in FULL_DECK]  # スートごとの枚数 (4ビットずつ)
+RANK_BITS = [1 << c.rank_index for c in FULL_DECK]
+
+# 各スートの枚数に3を足すと、5枚以上のスートだけ4ビット目が立つ
+_FLUSH_BIAS = 0x3333
+_FLUSH_TEST = 0x8888
+
+# treys のランククラス境界 (昇順)
+_CLASS_BOUNDARIES = [
+    LookupTable.MAX_ROYAL_FLUSH,
+    LookupTable.MAX_STRAIGHT_FLUSH,
+    LookupTable.MAX_FOUR_OF_A_KIND,
+    LookupTable.MAX_FULL_HOUSE,
+    LookupTable.MAX_FLUSH,
+    LookupTable.MAX_STRAIGHT,
+    LookupTable.MAX_THREE_OF_A_KIND,
+    LookupTable.MAX_TWO_PAIR,
+    LookupTable.MAX_PAIR,
+    LookupTable.MAX_HIGH_CARD,
+]
+
+
+class HandEvaluator:
+    """事前計算テーブルを使うハンド評価エンジン"""
+
+    def __init__(self, flush_table: Sequence[int], rank_table: Dict[int, int]):
+        self.flush_table = flush_table
+        self.rank_table = rank_table
+        self._arrays: Optional[BatchTables] = None
+
+    @property
+    def arrays(self) -> "BatchTables":
+        """NumPy によるバッチ評価用に同じテーブルを配列化したもの"""
+        if self._arrays is None:
+            self._arrays = BatchTables(self.flush_table, self.rank_table)
+        return self._arrays
+
+    def evaluate_ids(self, card_ids: Sequence[int]) -> int:
+        """カードID (0-51) 5〜7枚の役の強さを返す（小さいほど強い）"""
+        suits = 0
+        for i in card_ids:
+            suits += SUIT_COUNTERS[i]
+        flush = (suits + _FLUSH_BIAS) & _FLUSH_TEST
+        if flush:
+            # 5枚以上あるスートのカードだけでランクマスクを作る
+            suit_index = (flush.bit_length() - 4) // 4
+            rank_mask = 0
+            for i in card_ids:
+                if i & 3 == suit_index:
+                    rank_mask |= RANK_BITS[i]
+            return self.flush_table[rank_mask]
+
+        key = 0
+        for i in card_ids:
+            key += RANK_KEYS[i]
+        return self.rank_table[key]
+
+    def evaluate(self, cards) -> int:
+        """Card 5〜7枚の役の強さを返す"""
+        return self.evaluate_ids([c.id for c in cards])
+
+    @staticmethod
+    def get_rank_class(hand_rank: int) -> int:
+        """役の強さから treys と同じ役クラス (0 = Royal Flush ... 9 = High Card) を返す"""
+        if not 1 <= hand_rank <= LookupTable.MAX_HIGH_CARD:
+            raise ValueError(f"Invalid hand rank: {hand_rank}")
+        return bisect_left(_CLASS_BOUNDARIES, hand_rank)
+
+    @staticmethod
+    def class_to_string(rank_class: int) -> str:
+        return LookupTable.RANK_CLASS_TO_STRING[rank_class]
+
+    def describe(self, hand_rank: int) -> str:
+        """役の強さを役名に変換する"""
+        return self.class_to_string(self.get_rank_class(hand_rank))
+
+
+class BatchTables:
+    """バッチ評価用の NumPy 配列（キーはソート済みで searchsorted で引く）"""
+
+    def __init__(self, flush_table: Sequence[int], rank_table: Dict[int, int]):
+        keys = np.fromiter(rank_table.keys(), dtype=np.int64, count=len(rank_table))
+        values = np.fromiter(rank_table.values(), dtype=np.int32, count=len(rank_table))
+        order = np.argsort(keys)
+        self.rank_keys = keys[order]
+        self.rank_values = values[order]
+        self.flush_table = np.asarray(flush_table, dtype=np.int32)
+        self.card_rank_keys = np.array(RANK_KEYS, dtype=np.int64)
+        self.card_suit_counters = np.array(SUIT_COUNTERS, dtype=np.int64)
+        self.card_rank_bits = np.array(RANK_BITS, dtype=np.int64)
+
+
+def build_tables():
+    """treys の5枚テーブルから5〜7枚用のテーブルを構築する"""
+    lookup = LookupTable()
+    primes = TreysCard.PRIMES
+
+    # フラッシュ: 5ビット以上立っているマスクについて、最良の5枚を選ぶ
+    flush_table = array("H", [0]) * 8192
+    for mask in range(8192):
+        bits = [r for r in range(13) if mask >> r & 1]
+        if len(bits) < 5:
+            continue
+        best = LookupTable.MAX_HIGH_CARD
+        for five in combinations(bits, 5):
+            product = 1
+            for r in five:
+                product *= primes[r]
+            best = min(best, lookup.flush_lookup[product])
+        flush_table[mask] = best
+
+    # それ以外: 各ランク0〜4枚、合計5〜7枚の組み合わせをすべて列挙する
+    rank_table: Dict[int, int] = {}
+
+    def visit(rank: int, remaining: int, ranks: list):
+        if rank == 13:
+            if len(ranks) >= 5:
+                key = sum(5 ** r for r in ranks)
+                best = LookupTable.MAX_HIGH_CARD
+                for five in set(combinations(ranks, 5)):
+                    product = 1
+                    for r in five:
+                        product *= primes[r]
+                    best = min(best, lookup.unsuited_lookup[product])
+                rank_table[key] = best
+            return
+        for count in range(min(4, remaining) + 1):
+            visit(rank + 1, remaining - count, ranks + [rank] * count)
+
+    visit(0, 7, [])
+    return flush_table, rank_table
+
+
+def _save_tables(path: Path, flush_table, rank_table: Dict[int, int]) -> None:
+    keys = array("q", rank_table.keys())
+    values = array("H", rank_table.values())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(struct.pack("<II", len(flush_table), len(keys)))
+        f.write(array("H", flush_table).tobytes())
+        f.write(keys.tobytes())
+        f.write(values.tobytes())
+    tmp_path.replace(path)
+
+
+def _load_tables(path: Path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != _MAGIC:
+        raise ValueError(f"Invalid evaluator cache: {path}")
+    flush_len, rank_len = struct.unpack_from("<II", data, 4)
+    offset = 12
+    flush_table = array("H")
+    flush_table.frombytes(data[offset:offset + flush_len * 2])
+    offset += flush_len * 2
+    keys = array("q")
+    keys.frombytes(data[offset:offset + rank_len * 8])
+    offset += rank_len * 8
+    values = array("H")
+    values.frombytes(data[offset:offset + rank_len * 2])
+    if len(flush_table) != 8192 or len(values) != rank_len:
+        raise ValueError(f"Truncated evaluator cache: {path}")
+    return flush_table, dict(zip(keys, values))
+
+
+def load_or_build_tables(path: Optional[Path] = None):
+    """キャッシュがあれば読み込み、なければ構築してキャッシュに書き出す"""
+    path = Path(path) if path is not None else CACHE_FILE
+    try:
+        return _load_tables(path)
+    except (OSError, ValueError):
+        pass
+
+    flush_table, rank_table = build_tables()
+    try:
+        _save_tables(path, flush_table, rank_table)
+    except OSError:
+        # キャッシュに書けない環境でも評価自体は行える
+        pass
+    return flush_table, rank_table
+
+
+_evaluator: Optional[HandEvaluator] = None
+_lock = threading.Lock()
+
+
+def get_hand_evaluator() -> HandEvaluator:
+    """プロセス全体で共有する評価エンジンを返す"""
+    global _evaluator
+    if _evaluator is None:
+        with _lock:
+            if _evaluator is None:
+                _evaluator = HandEvaluator(*load_or_build_tables())
+    return _evaluator
@@ -0,0 +1,270 @@
+# app/services/hand_history.py
+"""
+ハンド履歴をバイナリの固定長レコードとして追記保存する。
+
+1ハンド = 1レコード (RECORD_DTYPE)。ファイル先頭の16バイトのヘッダのあとにレコードが並ぶだけなので、
+読み込み側は memmap して必要なハンドだけを参照できる（NumPy で列ごとの集計もできる）。
+
+    with HandHistoryWriter(path) as writer:
+        game_state.event_sink = HandHistoryRecorder(writer)
+        ...
+    for hand in HandHistoryReader(path):
+        print(hand.hand_seed, hand.board, hand.payouts)
+"""
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.deck import Card, FULL_DECK
+from app.models.enum import ActionType, GameEvent
+from app.models.events import EventSink
+from app.models.game_state import GameState
+
+MAX_SEATS = 10
+MAX_ACTIONS = 64
+NO_CARD = -1
+NO_AMOUNT = 0xFFFFFFFF
+
+# アクションが MAX_ACTIONS を超えて切り詰められたハンド
+FLAG_TRUNCATED = 1
+
+ACTION_TYPES = tuple(ActionType)
+_ACTION_CODE = {action_type: i for i, action_type in enumerate(ACTION_TYPES)}
+
+ACTION_DTYPE = np.dtype([
+    ("seat", "i1"),
+    ("type", "u1"),
+    ("amount", "<u4"),      # 金額の指定がないアクションは NO_AMOUNT
+])
+
+RECORD_DTYPE = np.dtype([
+    ("hand_seed", "<u8"),
+    ("pool_seed", "<i8"),   # batch_shuffle のテーブルならプールの seed、それ以外は -1
+    ("big_blind", "<u4"),
+    ("small_blind", "<u4"),
+    ("seated", "<u2"),      # 着席している座席のビットマスク
+    ("seat_count", "u1"),
+    ("dealer", "i1"),
+    ("num_actions", "u1"),
+    ("flags", "u1"),
+    ("stacks", "<u4", (MAX_SEATS,)),            # ハンド開始時（ブラインド前）のスタック
+    ("hole_cards", "i1", (MAX_SEATS, 2)),
+    ("board", "i1", (5,)),
+    ("payouts", "<u4", (MAX_SEATS,)),
+    ("actions", ACTION_DTYPE, (MAX_ACTIONS,)),
+])
+
+_MAGIC = b"HHR1"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHHHI")
+
+
+def _header_bytes() -> bytes:
+    return _HEADER.pack(_MAGIC, _VERSION, RECORD_DTYPE.itemsize, MAX_SEATS, MAX_ACTIONS, 0)
+
+
+def encode_hand(game_state: GameState, starting_stacks: Sequence[int], payouts: Dict[int, int]) -> np.ndarray:
+    """終了したハンドを1レコードに変換する"""
+    table = game_state.table
+    if len(table.seats) > MAX_SEATS:
+        raise ValueError(f"Hand history supports up to {MAX_SEATS} seats")
+
+    record = np.zeros((), dtype=RECORD_DTYPE)
+    record["hand_seed"] = table.hand_seed or 0
+    record["pool_seed"] = (table.seed or 0) if table.batch_shuffle else -1
+    record["big_blind"] = game_state.big_blind
+    record["small_blind"] = game_state.small_blind
+    record["seat_count"] = len(table.seats)
+    record["dealer"] = -1 if game_state.dealer_seat_index is None else game_state.dealer_seat_index
+    record["hole_cards"] = NO_CARD
+    record["board"] = NO_CARD
+
+    seat_by_player = {}
+    seated = 0
+    for seat in table.seats:
+        if not seat.is_occupied:
+            continue
+        seated |= 1 << seat.index
+        seat_by_player[seat.player.player_id] = seat.index
+        record["stacks"][seat.index] = starting_stacks[seat.index]
+        record["payouts"][seat.index] = payouts.get(seat.index, 0)
+        if seat.hole_cards:
+            record["hole_cards"][seat.index] = [c.id for c in seat.hole_cards]
+    record["seated"] = seated
+    board = [c.id for c in table.community_cards]
+    record["board"][:len(board)] = board
+
+    history = game_state.history
+    if len(history) > MAX_ACTIONS:
+        record["flags"] |= FLAG_TRUNCATED
+        history = history[:MAX_ACTIONS]
+    record["num_actions"] = len(history)
+    actions = record["actions"]
+    for i, action in enumerate(history):
+        actions[i] = (
+            seat_by_player.get(action.player_id, -1),
+            _ACTION_CODE[action.action_type],
+            NO_AMOUNT if action.amount is None else action.amount,
+        )
+    return record
+
+
+class HandHistoryWriter:
+    """レコードをバッファにためて、まとめてファイル末尾に追記する"""
+
+    def __init__(self, path: Path, buffer_size: int = 1024):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(_header_bytes())
+        else:
+            with open(self.path, "rb") as f:
+                if f.read(_HEADER.size) != _header_bytes():
+                    self._file.close()
+                    raise ValueError(f"Incompatible hand history file: {self.path}")
+            # 書き込み途中で終了したレコードがあれば切り捨てる
+            body = self._file.tell() - _HEADER.size
+            self._file.truncate(_HEADER.size + body - body % RECORD_DTYPE.itemsize)
+            self._file.seek(0, 2)
+        self._buffer = np.zeros(buffer_size, dtype=RECORD_DTYPE)
+        self._count = 0
+        self.hands_written = 0
+
+    def append(self, record: np.ndarray) -> None:
+        self._buffer[self._count] = record
+        self._count += 1
+        self.hands_written += 1
+        if self._count == len(self._buffer):
+            self.flush()
+
+    def flush(self) -> None:
+        if self._count:
+            self._file.write(self._buffer[:self._count].tobytes())
+            self._count = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self) -> "HandHistoryWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class HandHistoryRecorder(EventSink):
+    """ハンドの開始・終了イベントを受け取り、終了したハンドを書き込む"""
+
+    def __init__(self, writer: HandHistoryWriter):
+        self.writer = writer
+        self._starting_stacks: List[int] = []
+
+    def emit(self, event: GameEvent, **data) -> None:
+        if event == GameEvent.HAND_STARTED:
+            self._starting_stacks = [seat.stack for seat in data["game_state"].table.seats]
+        elif event == GameEvent.HAND_COMPLETE:
+            payouts = {seat.index: amount for seat, amount in data["winners"]}
+            self.writer.append(encode_hand(data["game_state"], self._starting_stacks, payouts))
+
+
+class HandRecord:
+    """1ハンド分のレコードを読みやすい形で参照する"""
+
+    __slots__ = ("raw",)
+
+    def __init__(self, raw: np.void):
+        self.raw = raw
+
+    @property
+    def hand_seed(self) -> int:
+        return int(self.raw["hand_seed"])
+
+    @property
+    def pool_seed(self) -> Optional[int]:
+        seed = int(self.raw["pool_seed"])
+        return None if seed < 0 else seed
+
+    @property
+    def big_blind(self) -> int:
+        return int(self.raw["big_blind"])
+
+    @property
+    def small_blind(self) -> int:
+        return int(self.raw["small_blind"])
+
+    @property
+    def seat_count(self) -> int:
+        return int(self.raw["seat_count"])
+
+    @property
+    def dealer(self) -> Optional[int]:
+        dealer = int(self.raw["dealer"])
+        return None if dealer < 0 else dealer
+
+    @property
+    def seated(self) -> List[int]:
+        """着席していた座席のインデックス"""
+        mask = int(self.raw["seated"])
+        return [i for i in range(self.seat_count) if mask >> i & 1]
+
+    @property
+    def starting_stacks(self) -> List[int]:
+        return self.raw["stacks"][:self.seat_count].tolist()
+
+    @property
+    def payouts(self) -> List[int]:
+        return self.raw["payouts"][:self.seat_count].tolist()
+
+    @property
+    def truncated(self) -> bool:
+        return bool(self.raw["flags"] & FLAG_TRUNCATED)
+
+    def hole_cards(self, seat_index: int) -> List[Card]:
+        return [FULL_DECK[c] for c in self.raw["hole_cards"][seat_index].tolist() if c != NO_CARD]
+
+    @property
+    def board(self) -> List[Card]:
+        return [FULL_DECK[c] for c in self.raw["board"].tolist() if c != NO_CARD]
+
+    @property
+    def actions(self) -> List[Tuple[int, ActionType, Optional[int]]]:
+        """(座席, アクション, 金額) のリスト。ブラインドの支払いも含む"""
+        result = []
+        for seat, code, amount in self.raw["actions"][:self.raw["num_actions"]].tolist():
+            result.append((seat, ACTION_TYPES[code], None if amount == NO_AMOUNT else amount))
+        return result
+
+
+class HandHistoryReader:
+    """ハンド履歴ファイルを memmap し、ハンドを必要になった時点で読み出す"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            header = f.read(_HEADER.size)
+            f.seek(0, 2)
+            size = f.tell()
+        if header != _header_bytes():
+            raise ValueError(f"Invalid hand history file: {self.path}")
+        # 末尾の書きかけのレコードは無視する
+        count = (size - _HEADER.size) // RECORD_DTYPE.itemsize
+        if count:
+            self.records = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", offset=_HEADER.size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index: int) -> HandRecord:
+        return HandRecord(self.records[index])
+
+    def __iter__(self) -> Iterator[HandRecord]:
+        for i in range(len(self.records)):
+            yield HandRecord(self.records[i])
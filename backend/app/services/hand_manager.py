@@ -1,13 +1,17 @@
 # holdem_app/app/services/hand_manager.py
 from app.models.game_state import GameState
-from app.models.enum import Round, SeatStatus, ActionType, GameStatus
+from app.models.enum import Round, SeatStatus, ActionType, GameStatus, GameEvent
 from app.models.action import Action
 from app.services import position_service, action_service, evaluation_service, round_manager
-from typing import Callable, Any
+from typing import Callable, Any, List, Optional, Tuple
+from app.models.seat import Seat
 
-def start_new_hand(game_state: GameState):
-    """新しいハンドを開始する準備を行う"""
-    game_state.clear_for_new_hand()
+def start_new_hand(game_state: GameState, hand_seed: Optional[int] = None, dealer_seat_index: Optional[int] = None):
+    """
+    新しいハンドを開始する準備を行う。hand_seed を指定すると配札を再現できる。
+    dealer_seat_index を指定するとボタンを回さずにその座席をディーラーにする（リプレイ用）。
+    """
+    game_state.clear_for_new_hand(hand_seed)
     
     active_players = position_service.get_occupied_seats(game_state)
     if len(active_players) < 2:
@@ -15,9 +19,13 @@ def start_new_hand(game_state: GameState):
         return
 
     game_state.status = GameStatus.IN_PROGRESS
+    game_state.event_sink.emit(GameEvent.HAND_STARTED, game_state=game_state, hand_seed=game_state.table.hand_seed)
     
     # 1. ディーラーボタンを回す
-    position_service.rotate_dealer_button(game_state)
+    if dealer_seat_index is None:
+        position_service.rotate_dealer_button(game_state)
+    else:
+        game_state.dealer_seat_index = dealer_seat_index
     
     # 2. ポジションを割り当てる
     position_service.assign_positions(game_state)
@@ -65,19 +73,30 @@ def proceed_to_next_round(game_state: GameState):
         game_state.table.community_cards.extend(game_state.table.deck.draw(1))
     elif game_state.current_round == Round.RIVER:
         game_state.table.community_cards.extend(game_state.table.deck.draw(1))
+    game_state.event_sink.emit(GameEvent.ROUND_STARTED, round=game_state.current_round, community_cards=game_state.table.community_cards)
 
 def _is_hand_over(game_state: GameState) -> bool:
-    """ハンドが終了したかどうかを判定する"""
-    active_players = [s for s in game_state.table.seats if s.status not in [SeatStatus.FOLDED, SeatStatus.OUT, SeatStatus.ALL_IN]]
-    
-    if len(active_players) <= 1:
-        return True
-        
-    return False
+    """ハンドが終了したかどうかを判定する（アクションできるプレイヤーが1人以下）"""
+    active = game_state.table.mask.active
+    over = active & (active - 1) == 0
+    if round_manager.DEBUG_CHECKS:
+        active_players = [s for s in game_state.table.seats if s.status not in [SeatStatus.FOLDED, SeatStatus.OUT, SeatStatus.ALL_IN]]
+        assert over == (len(active_players) <= 1), f"hand counters out of sync (active={active:b})"
+    return over
 
-def _conclude_hand(game_state: GameState):
-    """ハンドを終了し、勝者にポットを分配する"""
+def _conclude_hand(game_state: GameState) -> List[Tuple[Seat, int]]:
+    """ハンドを終了し、勝者にポットを分配する。分配結果を返す"""
+    _run_out_board(game_state)
     winners_with_amounts = evaluation_service.find_winners(game_state)
     for seat, amount in winners_with_amounts:
         seat.stack += amount
     game_state.status = GameStatus.HAND_COMPLETE
+    game_state.event_sink.emit(GameEvent.HAND_COMPLETE, game_state=game_state, winners=winners_with_amounts)
+    return winners_with_amounts
+
+def _run_out_board(game_state: GameState):
+    """オールインで決着する場合、残りのコミュニティカードを配る"""
+    contenders = [s for s in game_state.table.seats if s.status in [SeatStatus.ACTIVE, SeatStatus.ALL_IN]]
+    missing = 5 - len(game_state.table.community_cards)
+    if len(contenders) > 1 and missing > 0:
+        game_state.table.community_cards.extend(game_state.table.deck.draw(missing))
@@ -0,0 +1,255 @@
+# app/services/preflop_equity.py
+"""
+プリフロップのエクイティ表。
+
+- heads_up[a, b]: ハンドクラス a が b に対してオールインしたときのエクイティ (厳密計算)
+- vs_random[a, n - 1]: ハンドクラス a がランダムな n 人 (1〜8) を相手にしたときのエクイティ
+
+表はオフラインで生成してバイナリファイルに保存し、実行時は memmap で読み込む。
+
+    python -m app.services.preflop_equity [--out PATH] [--samples N] [--random-samples N] [--workers N]
+"""
+import argparse
+import os
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, permutations
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from app.config import DATA_DIR
+from app.models.deck import Card
+from app.services.evaluation_service import evaluate_hands_batch
+from app.services.ai.ai_strategy import HAND_CLASS_COMBOS, HAND_CLASS_INDEX, hand_class_index
+
+TABLE_FILE = DATA_DIR / "preflop_equity_v1.bin"
+NUM_CLASSES = 169
+MAX_OPPONENTS = 8
+
+_MAGIC = b"PFE1"
+_HEADER = struct.Struct("<4sIII")
+
+HandClass = Union[int, str, Sequence[Card]]
+
+
+class PreflopEquityTables:
+    """memmap したエクイティ表への O(1) 参照"""
+
+    def __init__(self, heads_up: np.ndarray, vs_random: np.ndarray):
+        self.heads_up = heads_up
+        self.vs_random = vs_random
+
+    def heads_up_equity(self, hand: HandClass, villain: HandClass) -> float:
+        """hand が villain に対してオールインしたときのエクイティ"""
+        return float(self.heads_up[_to_class_index(hand), _to_class_index(villain)])
+
+    def equity_vs_random(self, hand: HandClass, num_opponents: int = 1) -> float:
+        """hand がランダムな num_opponents 人を相手にしたときのエクイティ"""
+        if not 1 <= num_opponents <= MAX_OPPONENTS:
+            raise ValueError(f"num_opponents must be between 1 and {MAX_OPPONENTS}")
+        return float(self.vs_random[_to_class_index(hand), num_opponents - 1])
+
+
+def _to_class_index(hand: HandClass) -> int:
+    if isinstance(hand, int):
+        return hand
+    if isinstance(hand, str):
+        return HAND_CLASS_INDEX[hand]
+    return hand_class_index(hand)
+
+
+def save_tables(path: Path, heads_up: np.ndarray, vs_random: np.ndarray) -> None:
+    """エクイティ表をバイナリファイルに書き出す"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, NUM_CLASSES, MAX_OPPONENTS, 0))
+        f.write(np.ascontiguousarray(heads_up, dtype="<f4").tobytes())
+        f.write(np.ascontiguousarray(vs_random, dtype="<f4").tobytes())
+    tmp_path.replace(path)
+
+
+def load_tables(path: Path) -> PreflopEquityTables:
+    """エクイティ表を読み取り専用で memmap する"""
+    with open(path, "rb") as f:
+        magic, num_classes, max_opponents, _ = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != _MAGIC or num_classes != NUM_CLASSES or max_opponents != MAX_OPPONENTS:
+        raise ValueError(f"Invalid preflop equity table: {path}")
+    data = np.memmap(path, dtype="<f4", mode="r", offset=_HEADER.size)
+    split = NUM_CLASSES * NUM_CLASSES
+    if data.size != split + NUM_CLASSES * MAX_OPPONENTS:
+        raise ValueError(f"Truncated preflop equity table: {path}")
+    heads_up = data[:split].reshape(NUM_CLASSES, NUM_CLASSES)
+    vs_random = data[split:].reshape(NUM_CLASSES, MAX_OPPONENTS)
+    return PreflopEquityTables(heads_up, vs_random)
+
+
+_tables: Optional[PreflopEquityTables] = None
+_tables_loaded = False
+_lock = threading.Lock()
+
+
+def get_preflop_tables() -> Optional[PreflopEquityTables]:
+    """プロセス全体で共有するエクイティ表を返す（未生成なら None）"""
+    global _tables, _tables_loaded
+    if not _tables_loaded:
+        with _lock:
+            if not _tables_loaded:
+                try:
+                    _tables = load_tables(TABLE_FILE)
+                except (OSError, ValueError):
+                    _tables = None
+                _tables_loaded = True
+    return _tables
+
+
+# --- 生成処理 (オフライン) ---
+
+_SUIT_PERMUTATIONS = [np.array(p) for p in permutations(range(4))]
+_board_combos: Optional[np.ndarray] = None
+
+
+def _all_boards_of_48() -> np.ndarray:
+    """残り48枚から5枚を選ぶ全組み合わせ (インデックス)"""
+    global _board_combos
+    if _board_combos is None:
+        _board_combos = np.array(list(combinations(range(48), 5)), dtype=np.int8)
+    return _board_combos
+
+
+def _canonical_matchup(hero: tuple, villain: tuple) -> tuple:
+    """スートの入れ替えで同一視できる対戦を代表形にする"""
+    cards = np.array(hero + villain)
+    best = None
+    for perm in _SUIT_PERMUTATIONS:
+        mapped = (cards & ~3) | perm[cards & 3]
+        key = (tuple(sorted(mapped[:2])), tuple(sorted(mapped[2:])))
+        if best is None or key < best:
+            best = key
+    return best
+
+
+def exact_matchup_equity(hero: tuple, villain: tuple, chunk_size: int = 250_000) -> float:
+    """2つの具体的なホールカード同士の全ボード列挙によるエクイティ"""
+    known = set(hero) | set(villain)
+    live = np.array([i for i in range(52) if i not in known], dtype=np.int64)
+    boards = _all_boards_of_48()
+    share = 0.0
+    for start in range(0, len(boards), chunk_size):
+        chunk = live[boards[start:start + chunk_size]]
+        n = len(chunk)
+        hero_ranks = evaluate_hands_batch(np.broadcast_to(hero, (n, 2)), chunk)
+        villain_ranks = evaluate_hands_batch(np.broadcast_to(villain, (n, 2)), chunk)
+        share += np.count_nonzero(hero_ranks < villain_ranks) + 0.5 * np.count_nonzero(hero_ranks == villain_ranks)
+    return share / len(boards)
+
+
+def _compatible_matchups(a: int, b: int) -> list:
+    return [
+        (hero, villain)
+        for hero in HAND_CLASS_COMBOS[a]
+        for villain in HAND_CLASS_COMBOS[b]
+        if not set(hero) & set(villain)
+    ]
+
+
+def _heads_up_entry(args) -> tuple:
+    """クラス a と b の対戦エクイティ (samples 指定時はモンテカルロ)"""
+    a, b, samples, seed = args
+    matchups = _compatible_matchups(a, b)
+    if samples is None:
+        counts: dict = {}
+        for hero, villain in matchups:
+            key = _canonical_matchup(hero, villain)
+            counts[key] = counts.get(key, 0) + 1
+        total = sum(exact_matchup_equity(*key) * n for key, n in counts.items())
+        return a, b, total / len(matchups)
+
+    rng = np.random.default_rng([seed, a, b])
+    pairs = np.array([hero + villain for hero, villain in matchups], dtype=np.int64)
+    chosen = pairs[rng.integers(len(pairs), size=samples)]
+    keys = rng.random((samples, 52))
+    np.put_along_axis(keys, chosen, 2.0, axis=1)
+    boards = keys.argpartition(4, axis=1)[:, :5]
+    hero_ranks = evaluate_hands_batch(chosen[:, :2], boards)
+    villain_ranks = evaluate_hands_batch(chosen[:, 2:], boards)
+    share = np.count_nonzero(hero_ranks < villain_ranks) + 0.5 * np.count_nonzero(hero_ranks == villain_ranks)
+    return a, b, share / samples
+
+
+def _vs_random_entry(args) -> tuple:
+    """クラス a がランダムな n 人を相手にしたときのエクイティ (モンテカルロ)"""
+    a, num_opponents, samples, seed = args
+    rng = np.random.default_rng([seed, a, num_opponents, 1])
+    combos = np.array(HAND_CLASS_COMBOS[a], dtype=np.int64)
+    hero = combos[rng.integers(len(combos), size=samples)]
+    keys = rng.random((samples, 52))
+    np.put_along_axis(keys, hero, 2.0, axis=1)
+    drawn = keys.argpartition(2 * num_opponents + 4, axis=1)[:, :2 * num_opponents + 5]
+    board = drawn[:, :5]
+
+    hero_ranks = evaluate_hands_batch(hero, board)
+    best = hero_ranks.copy()
+    ties = np.ones(samples)
+    for i in range(num_opponents):
+        ranks = evaluate_hands_batch(drawn[:, 5 + 2 * i:7 + 2 * i], board)
+        ties = np.where(ranks < best, 1, np.where(ranks == best, ties + 1, ties))
+        best = np.minimum(best, ranks)
+    share = np.where(hero_ranks == best, 1.0 / ties, 0.0)
+    return a, num_opponents, float(share.mean())
+
+
+def _fill_heads_up(executor, samples: Optional[int], seed: int) -> np.ndarray:
+    heads_up = np.zeros((NUM_CLASSES, NUM_CLASSES), dtype=np.float64)
+    # 同じクラス同士は対称なので 0.5
+    np.fill_diagonal(heads_up, 0.5)
+    pair_jobs = [(a, b, samples, seed) for a in range(NUM_CLASSES) for b in range(a + 1, NUM_CLASSES)]
+    for a, b, equity in executor.map(_heads_up_entry, pair_jobs, chunksize=8):
+        heads_up[a, b] = equity
+        heads_up[b, a] = 1.0 - equity
+    return heads_up
+
+
+def build_heads_up(samples: Optional[int] = None, seed: int = 0, workers: Optional[int] = None) -> np.ndarray:
+    """heads_up の表だけを生成する（ソルバーの検証用など）"""
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        return _fill_heads_up(executor, samples, seed)
+
+
+def build_tables(samples: Optional[int] = None, random_samples: int = 200_000, seed: int = 0, workers: Optional[int] = None):
+    """
+    エクイティ表を生成する。
+    samples=None なら heads_up は全ボード列挙による厳密値（マルチコアでも数時間かかる）。
+    """
+    vs_random = np.zeros((NUM_CLASSES, MAX_OPPONENTS), dtype=np.float64)
+    random_jobs = [(a, n, random_samples, seed) for a in range(NUM_CLASSES) for n in range(1, MAX_OPPONENTS + 1)]
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        heads_up = _fill_heads_up(executor, samples, seed)
+        for a, n, equity in executor.map(_vs_random_entry, random_jobs, chunksize=8):
+            vs_random[a, n - 1] = equity
+    return heads_up, vs_random
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the preflop equity tables.")
+    parser.add_argument("--out", type=Path, default=TABLE_FILE)
+    parser.add_argument("--samples", type=int, default=None, help="Monte Carlo samples per class pair (default: exact)")
+    parser.add_argument("--random-samples", type=int, default=200_000, help="Monte Carlo samples per vs-random entry")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    heads_up, vs_random = build_tables(args.samples, args.random_samples, args.seed, args.workers)
+    save_tables(args.out, heads_up, vs_random)
+    print(f"Wrote {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
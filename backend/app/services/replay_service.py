@@ -0,0 +1,121 @@
+# app/services/replay_service.py
+"""
+記録されたハンド（seed・着席とスタック・アクション列）を再生して GameState を復元する。
+
+GameOrchestrator.play_hand と同じ順序で hand_manager / round_manager / action_service を呼ぶが、
+アクションは AI ではなく記録から取り出す。イベントは通知しない（GameState の既定の受け取り先のまま）。
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from app.models.action import Action
+from app.models.enum import ActionType, GameStatus, Round, SeatStatus
+from app.models.game_state import GameState
+from app.models.player import Player
+from app.services import action_service, hand_manager, round_manager
+from app.services.hand_history import HandRecord
+
+_BLINDS = (ActionType.POST_SB, ActionType.POST_BB)
+
+
+@dataclass(frozen=True)
+class HandLog:
+    """1ハンドを再生するのに必要な記録"""
+    hand_seed: int
+    dealer_seat_index: int
+    players: Dict[int, Player]      # 座席 -> プレイヤー
+    stacks: Dict[int, int]          # 座席 -> ハンド開始時のスタック
+    actions: List[Action]           # ブラインドの支払いを含むアクション列
+    big_blind: int = 100
+    small_blind: int = 50
+    seat_count: int = 6
+    pool_seed: Optional[int] = None  # batch_shuffle のテーブルで記録されたハンドならプールの seed
+
+    @classmethod
+    def from_record(cls, record: HandRecord, players: Optional[Dict[int, Player]] = None) -> "HandLog":
+        """ハンド履歴のレコードから作る。players を省略すると座席ごとに仮のプレイヤーを作る"""
+        if players is None:
+            players = {i: Player(f"Seat {i}") for i in record.seated}
+        stacks = record.starting_stacks
+        actions = [
+            Action(players[seat].player_id, action_type, amount)
+            for seat, action_type, amount in record.actions
+        ]
+        return cls(
+            hand_seed=record.hand_seed,
+            dealer_seat_index=record.dealer,
+            players=players,
+            stacks={i: stacks[i] for i in players},
+            actions=actions,
+            big_blind=record.big_blind,
+            small_blind=record.small_blind,
+            seat_count=record.seat_count,
+            pool_seed=record.pool_seed,
+        )
+
+
+def replay(log: HandLog, upto: Optional[int] = None) -> GameState:
+    """
+    新しい GameState で記録を再生する。
+    upto を指定すると log.actions[upto] を処理する直前（その座席の手番）の状態を返す。
+    ブラインドは start_new_hand でまとめて支払われるので、それより前の位置は指定できない。
+    """
+    game_state = GameState(
+        big_blind=log.big_blind,
+        small_blind=log.small_blind,
+        seat_count=log.seat_count,
+        seed=log.pool_seed,
+        batch_shuffle=log.pool_seed is not None,
+    )
+    for seat_index, player in log.players.items():
+        game_state.table.sit_player(player, seat_index, log.stacks[seat_index])
+    return replay_into(game_state, log, upto)
+
+
+def replay_into(game_state: GameState, log: HandLog, upto: Optional[int] = None) -> GameState:
+    """プレイヤーが着席済みの game_state で記録を再生する（スタックは記録の値に戻す）"""
+    for seat_index, stack in log.stacks.items():
+        game_state.table.seats[seat_index].stack = stack
+
+    hand_manager.start_new_hand(game_state, log.hand_seed, dealer_seat_index=log.dealer_seat_index)
+    num_blinds = len(game_state.history)
+    if any(a.action_type not in _BLINDS for a in log.actions[:num_blinds]):
+        raise ValueError("Action log does not start with the posted blinds")
+    if upto is not None and upto < num_blinds:
+        raise ValueError(f"Cannot stop before the blinds (first replayable index is {num_blinds})")
+    if game_state.status != GameStatus.IN_PROGRESS:
+        return game_state
+
+    actions = log.actions
+    index = num_blinds
+    stop = len(actions) if upto is None else upto
+    for round_enum in [Round.PREFLOP, Round.FLOP, Round.TURN, Round.RIVER]:
+        game_state.current_round = round_enum
+        if round_enum != Round.PREFLOP:
+            hand_manager.proceed_to_next_round(game_state)
+        if hand_manager._is_hand_over(game_state):
+            break
+
+        if round_manager.start_betting_round(game_state):
+            while True:
+                seat = game_state.table.seats[game_state.current_seat_index]
+                if seat.status == SeatStatus.ACTIVE:
+                    if index == stop:
+                        if upto is None:
+                            raise ValueError("Action log ended before the hand was complete")
+                        return game_state
+                    action = actions[index]
+                    if seat.player.player_id != action.player_id:
+                        raise ValueError(f"Action {index} is not by the player in seat {seat.index}")
+                    action_service.process_action(game_state, action)
+                    index += 1
+                if round_manager.advance_turn(game_state):
+                    break
+
+        if hand_manager._is_hand_over(game_state):
+            break
+
+    if upto is not None and upto > index:
+        raise ValueError(f"Hand ended after {index} actions")
+    hand_manager._conclude_hand(game_state)
+    return game_state
@@ -2,8 +2,16 @@
 from app.models.game_state import GameState
 from app.models.enum import SeatStatus, Round
 from app.services import position_service, action_service
+from app.config import CHECK_COUNTERS
 from typing import Callable, Any
 
+# True にすると、差分で更新しているビットマスクでの終了判定を座席の走査と突き合わせる（デバッグ用）
+DEBUG_CHECKS = CHECK_COUNTERS
+
+def _at_most_one(mask: int) -> bool:
+    """ビットが1つ以下しか立っていないか"""
+    return mask & (mask - 1) == 0
+
 def prepare_for_new_round(game_state: GameState):
     """
     新しいベッティングラウンド（フロップ、ターン、リバー）の準備をします。
@@ -14,6 +22,8 @@ def prepare_for_new_round(game_state: GameState):
     for seat in game_state.table.seats:
         if seat.status not in [SeatStatus.OUT, SeatStatus.FOLDED]:
             seat.acted = False
+    game_state.table.mask.settled = 0
+    game_state.version += 1
     
     game_state.amount_to_call = 0
     game_state.last_raiser_seat_index = None
@@ -25,14 +35,19 @@ def prepare_for_new_round(game_state: GameState):
         game_state.current_seat_index = first_to_act_index
 
 
-def run_betting_round(game_state: GameState, get_player_action: Callable[[GameState], Any]):
-    active_players = [s for s in game_state.table.seats if s.status == SeatStatus.ACTIVE]
-    if len(active_players) <= 1 and game_state.current_round != Round.PREFLOP:
-        return
+def start_betting_round(game_state: GameState) -> bool:
+    """
+    ベッティングラウンドの準備をし、最初にアクションする座席を current_seat_index に設定する。
+    アクションが不要なラウンドなら False を返す。
+    """
+    if _at_most_one(game_state.table.mask.active) and game_state.current_round != Round.PREFLOP:
+        return False
 
     for seat in position_service.get_occupied_seats(game_state):
         if seat.status != SeatStatus.OUT:
             seat.acted = False
+    game_state.table.mask.settled = 0
+    game_state.version += 1
     
     if game_state.current_round == Round.PREFLOP:
         bb_seat = position_service.get_seat_by_position(game_state, "BB")
@@ -45,8 +60,30 @@ def run_betting_round(game_state: GameState, get_player_action: Callable[[GameSt
 
 
     first_to_act_index = position_service.get_first_to_act_index(game_state)
-    if first_to_act_index is None: return
+    if first_to_act_index is None: return False
     game_state.current_seat_index = first_to_act_index
+    return True
+
+
+def advance_turn(game_state: GameState) -> bool:
+    """
+    現在の座席の手番が終わった後に呼ぶ。
+    ラウンドが終了していればベットを回収して True、そうでなければ次の座席に手番を移して False を返す。
+    """
+    if is_betting_round_over(game_state):
+        game_state.table.collect_bets()
+        game_state.version += 1
+        return True
+
+    game_state.current_seat_index = position_service.get_next_active_player_index(
+        game_state, game_state.current_seat_index
+    )
+    return False
+
+
+def run_betting_round(game_state: GameState, get_player_action: Callable[[GameState], Any]):
+    if not start_betting_round(game_state):
+        return
     
     while True:
         current_player_seat = game_state.table.seats[game_state.current_seat_index]
@@ -55,17 +92,25 @@ def run_betting_round(game_state: GameState, get_player_action: Callable[[GameSt
             action = get_player_action(game_state)
             action_service.process_action(game_state, action)
 
-        if is_betting_round_over(game_state):
+        if advance_turn(game_state):
             break
 
-        game_state.current_seat_index = position_service.get_next_active_player_index(
-            game_state, game_state.current_seat_index
+def is_betting_round_over(game_state: GameState) -> bool:
+    """ベッティングラウンドが終了したかどうかを判定する（座席のビットマスクで O(1)）"""
+    mask = game_state.table.mask
+    active = mask.active
+    # アクション可能なプレイヤーが1人以下か、全員がアクション済みでコール額に揃っていれば終了
+    over = _at_most_one(active) or mask.settled & active == active
+    if DEBUG_CHECKS:
+        expected = _scan_betting_round_over(game_state)
+        assert over == expected, (
+            f"betting round counters out of sync: mask says {over}, seats say {expected} "
+            f"(active={active:b}, settled={mask.settled:b})"
         )
-    
-    game_state.table.collect_bets()
+    return over
 
-def is_betting_round_over(game_state: GameState) -> bool:
-    """ベッティングラウンドが終了したかどうかを判定する"""
+def _scan_betting_round_over(game_state: GameState) -> bool:
+    """座席を走査して判定する（DEBUG_CHECKS での突き合わせ用）"""
     active_seats = [s for s in game_state.table.seats if s.status == SeatStatus.ACTIVE]
     
     # 最優先事項: アクション可能なプレイヤーが1人以下なら、即座にラウンド終了
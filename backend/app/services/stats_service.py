@@ -0,0 +1,239 @@
+# app/services/stats_service.py
+"""
+プレイヤーごとの統計（VPIP / PFR / 3ベット / cベットへのフォールド / AF / WTSD）を集計する。
+
+ゲームのイベント（EventSink）を受け取り、アクションのたびにカウンタを O(1) で加算する。
+ハンド履歴から数え直すことはしないので、ハンド数が増えても参照のコストは変わらない。
+
+    tracker = PlayerStatsTracker()
+    game_state.event_sink = tracker.game_sink()   # ゲームごとに受け取り先を作る
+    ...
+    profile = tracker.profile(player_id)
+    print(profile.vpip, profile.aggression_factor)
+"""
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from app.models.enum import ActionType, GameEvent, Round, SeatStatus
+from app.models.events import EventSink
+from app.models.game_state import GameState
+
+# カウンタの列
+HANDS = 0               # 配られたハンド数
+VPIP = 1                # プリフロップで自発的にポットに入れたハンド数
+PFR = 2                 # プリフロップでレイズしたハンド数
+THREE_BET_CHANCES = 3   # 1回のレイズに対してアクションできたハンド数
+THREE_BETS = 4          # そこでリレイズしたハンド数
+CBET_FACED = 5          # フロップでプリフロップのレイザーのベットを受けた回数
+FOLD_TO_CBET = 6        # そこでフォールドした回数
+BETS_RAISES = 7         # フロップ以降のベット・レイズの回数
+CALLS = 8               # フロップ以降のコールの回数
+SAW_FLOP = 9            # フロップを見たハンド数
+SHOWDOWNS = 10          # ショウダウンまで残ったハンド数
+NUM_COUNTERS = 11
+
+_AGGRESSIVE = (ActionType.BET, ActionType.RAISE, ActionType.ALL_IN)
+_IN_HAND = (SeatStatus.ACTIVE, SeatStatus.ALL_IN)
+
+
+def _ratio(numerator: int, denominator: int) -> float:
+    return numerator / denominator if denominator else 0.0
+
+
+class PlayerProfile(NamedTuple):
+    """1人分の統計（割合は 0〜1、AF はコール1回あたりのベット・レイズの回数）"""
+    hands: int
+    vpip: float
+    pfr: float
+    three_bet: float
+    fold_to_cbet: float
+    aggression_factor: float
+    went_to_showdown: float
+
+    @classmethod
+    def from_counters(cls, c: np.ndarray) -> "PlayerProfile":
+        c = [int(v) for v in c]
+        # コールがなければ AF はベット・レイズの回数そのもの
+        aggression = c[BETS_RAISES] / c[CALLS] if c[CALLS] else float(c[BETS_RAISES])
+        return cls(
+            hands=c[HANDS],
+            vpip=_ratio(c[VPIP], c[HANDS]),
+            pfr=_ratio(c[PFR], c[HANDS]),
+            three_bet=_ratio(c[THREE_BETS], c[THREE_BET_CHANCES]),
+            fold_to_cbet=_ratio(c[FOLD_TO_CBET], c[CBET_FACED]),
+            aggression_factor=aggression,
+            went_to_showdown=_ratio(c[SHOWDOWNS], c[SAW_FLOP]),
+        )
+
+
+class PlayerStatsTracker(EventSink):
+    """
+    プレイヤーごとのカウンタを uint32 の2次元配列（プレイヤー x カウンタ）で持つ。
+    行はプレイヤーIDごとに割り当て、足りなくなったら倍に広げる。
+
+    進行中のハンドの状態はゲームごとの受け取り先 (game_sink) が持ち、カウンタだけを共有する。
+    複数のゲーム（別スレッド）から同時に更新されるので、カウンタはロックして更新する。
+    tracker 自身を受け取り先にした場合は1つのゲーム専用の受け取り先として振る舞う。
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.counters = np.zeros((max(capacity, 1), NUM_COUNTERS), dtype=np.uint32)
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._default_sink = GameStatsSink(self)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def game_sink(self) -> "GameStatsSink":
+        """1つのゲーム用の受け取り先（ゲームごとに作る）"""
+        return GameStatsSink(self)
+
+    def _row(self, player_id: str) -> int:
+        """ロックを取った状態で呼ぶこと"""
+        row = self._rows.get(player_id)
+        if row is None:
+            row = len(self._rows)
+            if row == len(self.counters):
+                self.counters = np.concatenate([self.counters, np.zeros_like(self.counters)])
+            self._rows[player_id] = row
+        return row
+
+    def counts(self, player_id: str) -> Optional[np.ndarray]:
+        """カウンタの行（読み取り用のコピー）"""
+        with self._lock:
+            row = self._rows.get(player_id)
+            return None if row is None else self.counters[row].copy()
+
+    def profile(self, player_id: str) -> Optional[PlayerProfile]:
+        counts = self.counts(player_id)
+        return None if counts is None else PlayerProfile.from_counters(counts)
+
+    def profiles(self) -> Dict[str, PlayerProfile]:
+        with self._lock:
+            return {player_id: PlayerProfile.from_counters(self.counters[row]) for player_id, row in self._rows.items()}
+
+    def emit(self, event: GameEvent, **data) -> None:
+        self._default_sink.emit(event, **data)
+
+
+class GameStatsSink(EventSink):
+    """1つのゲームの進行中のハンドの状態を持ち、共有のカウンタを更新する"""
+
+    def __init__(self, tracker: PlayerStatsTracker):
+        self.tracker = tracker
+        self._game_state: Optional[GameState] = None
+        self._seat_rows: List[Optional[int]] = []
+        self._vpip: List[bool] = []
+        self._pfr: List[bool] = []
+        self._three_bet_chance: List[bool] = []
+        self._saw_flop: List[bool] = []
+        self._preflop_raises = 0
+        self._preflop_raiser: Optional[int] = None
+        self._flop_bet_seen = False
+        self._cbet_pending = False
+
+    def emit(self, event: GameEvent, **data) -> None:
+        if event == GameEvent.HAND_COMPLETE:
+            self._game_state = None
+            return
+        if event not in (GameEvent.ACTION, GameEvent.HAND_STARTED, GameEvent.ROUND_STARTED, GameEvent.SHOWDOWN):
+            return
+        with self.tracker._lock:
+            # 配列は広げると置き換わるので、ロックの中で参照する
+            counters = self.tracker.counters
+            if event == GameEvent.ACTION:
+                self._on_action(counters, data["seat"], data["action"].action_type)
+            elif event == GameEvent.HAND_STARTED:
+                self._on_hand_started(data["game_state"])
+            elif event == GameEvent.ROUND_STARTED:
+                if data["round"] == Round.FLOP:
+                    self._on_flop(counters)
+            else:
+                self._on_showdown(counters, data["seats"])
+
+    def _on_hand_started(self, game_state: GameState) -> None:
+        self._game_state = game_state
+        seats = game_state.table.seats
+        tracker = self.tracker
+        self._seat_rows = [tracker._row(s.player.player_id) if s.is_occupied else None for s in seats]
+        for row in self._seat_rows:
+            if row is not None:
+                tracker.counters[row, HANDS] += 1
+        self._vpip = [False] * len(seats)
+        self._pfr = [False] * len(seats)
+        self._three_bet_chance = [False] * len(seats)
+        self._saw_flop = [False] * len(seats)
+        self._preflop_raises = 0
+        self._preflop_raiser = None
+        self._flop_bet_seen = False
+        self._cbet_pending = False
+
+    def _on_action(self, counters: np.ndarray, seat, action_type: ActionType) -> None:
+        if self._game_state is None or action_type in (ActionType.POST_SB, ActionType.POST_BB):
+            return
+        i = seat.index
+        row = self._seat_rows[i]
+        if row is None:
+            return
+        aggressive = action_type in _AGGRESSIVE
+
+        if self._game_state.current_round == Round.PREFLOP:
+            # 3ベットの機会: 他人のレイズがちょうど1回入った状態でアクションする
+            if self._preflop_raises == 1 and self._preflop_raiser != i and not self._three_bet_chance[i]:
+                self._three_bet_chance[i] = True
+                counters[row, THREE_BET_CHANCES] += 1
+                if aggressive:
+                    counters[row, THREE_BETS] += 1
+            if (aggressive or action_type == ActionType.CALL) and not self._vpip[i]:
+                self._vpip[i] = True
+                counters[row, VPIP] += 1
+            if aggressive:
+                if not self._pfr[i]:
+                    self._pfr[i] = True
+                    counters[row, PFR] += 1
+                self._preflop_raises += 1
+                self._preflop_raiser = i
+            return
+
+        if self._game_state.current_round == Round.FLOP:
+            if self._cbet_pending:
+                counters[row, CBET_FACED] += 1
+                if action_type == ActionType.FOLD:
+                    counters[row, FOLD_TO_CBET] += 1
+                elif aggressive:
+                    self._cbet_pending = False   # レイズが入ったら以降は cベットへの対応ではない
+            elif aggressive and not self._flop_bet_seen:
+                self._cbet_pending = i == self._preflop_raiser
+            if aggressive:
+                self._flop_bet_seen = True
+
+        if aggressive:
+            counters[row, BETS_RAISES] += 1
+        elif action_type == ActionType.CALL:
+            counters[row, CALLS] += 1
+
+    def _mark_saw_flop(self, counters: np.ndarray, seat_index: int) -> None:
+        if not self._saw_flop[seat_index]:
+            self._saw_flop[seat_index] = True
+            counters[self._seat_rows[seat_index], SAW_FLOP] += 1
+
+    def _on_flop(self, counters: np.ndarray) -> None:
+        if self._game_state is None:
+            return
+        for seat in self._game_state.table.seats:
+            if self._seat_rows[seat.index] is not None and seat.status in _IN_HAND:
+                self._mark_saw_flop(counters, seat.index)
+
+    def _on_showdown(self, counters: np.ndarray, seats) -> None:
+        if self._game_state is None:
+            return
+        for seat in seats:
+            row = self._seat_rows[seat.index]
+            if row is None:
+                continue
+            # プリフロップのオールインでボードが配り切られた場合もフロップを見たことにする
+            self._mark_saw_flop(counters, seat.index)
+            counters[row, SHOWDOWNS] += 1
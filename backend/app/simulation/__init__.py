@@ -0,0 +1,15 @@
+# app/simulation/__init__.py
+from .headless import build_game, run_headless, SimulationResult
+from .farm import run_farm, FarmSummary, HandResult
+from .vector_engine import VectorTables, ai_policy
+
+__all__ = [
+    "build_game",
+    "run_headless",
+    "SimulationResult",
+    "run_farm",
+    "FarmSummary",
+    "HandResult",
+    "VectorTables",
+    "ai_policy",
+]
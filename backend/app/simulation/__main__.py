@@ -0,0 +1,52 @@
+# app/simulation/__main__.py
+"""
+AI同士のシミュレーションを実行する。
+
+    python -m app.simulation --hands 10000 --players 6
+    python -m app.simulation --tables 1000 --hands 1000 --workers 16
+"""
+import argparse
+
+from app.simulation.farm import run_farm
+from app.simulation.headless import build_game, run_headless
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play AI-only hands without console output.")
+    parser.add_argument("--hands", type=int, default=1000, help="Hands per table")
+    parser.add_argument("--tables", type=int, default=1)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--stack", type=int, default=10000)
+    parser.add_argument("--big-blind", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --tables (default: CPU count)")
+    parser.add_argument("--no-rebuy", action="store_true", help="Eliminate busted players instead of topping up stacks (single table only)")
+    args = parser.parse_args(argv)
+
+    if args.tables == 1 and args.workers is None:
+        game_state = build_game(args.players, args.stack, args.big_blind, args.seed)
+        rebuy_stack = None if args.no_rebuy else args.stack
+        result = run_headless(game_state, args.hands, rebuy_stack=rebuy_stack)
+        print(f"Played {result.hands} hands in {result.elapsed:.2f}s ({result.hands_per_second:,.0f} hands/s)")
+        return
+
+    if args.no_rebuy:
+        parser.error("--no-rebuy is only supported for a single table")
+    summary = run_farm(
+        args.tables, args.hands, args.players, args.stack, args.big_blind,
+        seed=args.seed or 0, workers=args.workers,
+    )
+    print(f"Played {summary.hands} hands on {args.tables} tables in {summary.elapsed:.2f}s "
+          f"({summary.hands_per_second:,.0f} hands/s)")
+    print(f"Showdown frequency: {summary.showdown_frequency:.1%}")
+    print("Chip delta by seat:")
+    for seat_index in sorted(summary.seat_deltas):
+        print(f"  Seat {seat_index}: {summary.seat_deltas[seat_index]:+d}")
+    print("Chip delta by position (bb/100):")
+    for position in sorted(summary.position_deltas):
+        bb_100 = summary.bb_per_100(position, args.big_blind)
+        print(f"  {position:<3}: {summary.position_deltas[position]:+d} ({bb_100:+.1f})")
+
+
+if __name__ == "__main__":
+    main()
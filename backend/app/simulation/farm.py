@@ -0,0 +1,187 @@
+# app/simulation/farm.py
+"""
+多数のAI同士のテーブルをプロセスプールに分散して実行し、結果を集計する。
+
+各テーブルのハンドは chunk_size ごとのジョブに分けてワーカーに渡す。
+ジョブの seed は (seed, テーブル番号, チャンク番号) だけで決まるので、
+ワーカー数や完了順が変わっても集計結果は同じになる。
+"""
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.models.enum import GameEvent
+from app.models.events import EventSink
+from app.simulation.headless import build_game
+from app.services.game_orchestrator import GameOrchestrator
+
+DEFAULT_CHUNK_SIZE = 250
+
+
+@dataclass(frozen=True)
+class FarmJob:
+    """1ワーカーが続けて実行するハンドの単位"""
+    table_index: int
+    chunk_index: int
+    first_hand: int
+    hands: int
+    seed: int
+    num_players: int
+    stack: int
+    big_blind: int
+
+
+class HandResult(NamedTuple):
+    """1ハンドの結果（座席ごとのチップ増減とポジション）"""
+    table_index: int
+    hand_index: int
+    deltas: Tuple[Tuple[int, str, int], ...]  # (座席, ポジション, 増減)
+    showdown: bool
+
+
+@dataclass
+class FarmSummary:
+    """全テーブルの集計結果"""
+    hands: int = 0
+    showdowns: int = 0
+    elapsed: float = 0.0
+    seat_deltas: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    position_deltas: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    position_hands: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def add(self, result: HandResult) -> None:
+        self.hands += 1
+        self.showdowns += result.showdown
+        for seat_index, position, delta in result.deltas:
+            self.seat_deltas[seat_index] += delta
+            self.position_deltas[position] += delta
+            self.position_hands[position] += 1
+
+    @property
+    def showdown_frequency(self) -> float:
+        return self.showdowns / self.hands if self.hands else 0.0
+
+    @property
+    def hands_per_second(self) -> float:
+        return self.hands / self.elapsed if self.elapsed > 0 else 0.0
+
+    def bb_per_100(self, position: str, big_blind: int) -> float:
+        """ポジションごとの 100 ハンドあたりの獲得 BB"""
+        hands = self.position_hands.get(position, 0)
+        if not hands:
+            return 0.0
+        return self.position_deltas[position] / big_blind / hands * 100
+
+
+class _ShowdownSink(EventSink):
+    """ショウダウンが行われたかだけを記録する"""
+
+    def __init__(self):
+        self.showdown = False
+
+    def emit(self, event: GameEvent, **data) -> None:
+        if event == GameEvent.SHOWDOWN:
+            self.showdown = True
+
+
+def job_seed(seed: int, table_index: int, chunk_index: int) -> int:
+    """ジョブごとの seed（テーブル・チャンクごとに独立した乱数列になる）"""
+    state = np.random.SeedSequence([seed, table_index, chunk_index]).generate_state(2, dtype=np.uint32)
+    return int(state[0]) << 32 | int(state[1])
+
+
+def play_job(job: FarmJob) -> List[HandResult]:
+    """ジョブのハンドを実行し、ハンドごとの結果を返す（ワーカープロセスで実行される）"""
+    game_state = build_game(job.num_players, job.stack, job.big_blind, seed=job.seed)
+    sink = _ShowdownSink()
+    orchestrator = GameOrchestrator(game_state, event_sink=sink, headless=True)
+    seats = [s for s in game_state.table.seats if s.is_occupied]
+
+    results = []
+    for i in range(job.hands):
+        # 毎ハンド同じスタックから始める（脱落者を出さない）
+        for seat in seats:
+            seat.stack = job.stack
+        sink.showdown = False
+        orchestrator.play_hand()
+        deltas = tuple((seat.index, seat.position.name, seat.stack - job.stack) for seat in seats)
+        results.append(HandResult(job.table_index, job.first_hand + i, deltas, sink.showdown))
+    return results
+
+
+def make_jobs(tables: int, hands_per_table: int, num_players: int = 6, stack: int = 10000,
+              big_blind: int = 100, seed: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[FarmJob]:
+    """テーブルごとのハンドを chunk_size ずつのジョブに分ける"""
+    for table_index in range(tables):
+        for chunk_index, start in enumerate(range(0, hands_per_table, chunk_size)):
+            yield FarmJob(
+                table_index=table_index,
+                chunk_index=chunk_index,
+                first_hand=start,
+                hands=min(chunk_size, hands_per_table - start),
+                seed=job_seed(seed, table_index, chunk_index),
+                num_players=num_players,
+                stack=stack,
+                big_blind=big_blind,
+            )
+
+
+def run_farm(
+    tables: int,
+    hands_per_table: int,
+    num_players: int = 6,
+    stack: int = 10000,
+    big_blind: int = 100,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_hand: Optional[Callable[[HandResult], None]] = None,
+) -> FarmSummary:
+    """
+    tables 卓 × hands_per_table ハンドを並列に実行して集計する。
+    - workers: プロセス数 (None ならCPUコア数、1 なら現在のプロセスで実行)
+    - on_hand: ハンドの結果が届くたびに呼ばれる（到着順はジョブの完了順）
+    """
+    if tables <= 0 or hands_per_table <= 0:
+        raise ValueError("tables and hands_per_table must be positive")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    jobs = make_jobs(tables, hands_per_table, num_players, stack, big_blind, seed, chunk_size)
+    summary = FarmSummary()
+
+    def merge(results: List[HandResult]) -> None:
+        for result in results:
+            summary.add(result)
+            if on_hand is not None:
+                on_hand(result)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    start = time.perf_counter()
+    if workers <= 1:
+        for job in jobs:
+            merge(play_job(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # 投入するジョブ数を抑えて、結果を完了したものから取り込む
+            pending = set()
+            max_in_flight = workers * 2
+            for job in jobs:
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        merge(future.result())
+                pending.add(executor.submit(play_job, job))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge(future.result())
+    summary.elapsed = time.perf_counter() - start
+    return summary
@@ -0,0 +1,58 @@
+# app/simulation/headless.py
+"""
+AI同士で大量のハンドをコンソール出力なしで実行する。
+
+    python -m app.simulation --hands 10000 --players 6
+"""
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from app.models.events import EventSink
+from app.models.game_state import GameState
+from app.models.player import Player
+from app.services.game_orchestrator import GameOrchestrator
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """シミュレーションの結果"""
+    hands: int
+    elapsed: float
+
+    @property
+    def hands_per_second(self) -> float:
+        return self.hands / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def build_game(num_players: int = 6, stack: int = 10000, big_blind: int = 100,
+               seed: Optional[int] = None, seat_count: int = 6) -> GameState:
+    """AIプレイヤーだけが着席したゲームを作る"""
+    if not 2 <= num_players <= seat_count:
+        raise ValueError(f"num_players must be between 2 and {seat_count}")
+    game_state = GameState(big_blind=big_blind, small_blind=big_blind // 2, seat_count=seat_count, seed=seed)
+    for i in range(num_players):
+        game_state.table.sit_player(Player(f"AI_{i}"), i, stack)
+    return game_state
+
+
+def run_headless(game_state: GameState, num_hands: int, rebuy_stack: Optional[int] = None,
+                 event_sink: Optional[EventSink] = None) -> SimulationResult:
+    """
+    num_hands ハンドを表示なしで実行する。
+    rebuy_stack を指定すると、毎ハンドの前に全員のスタックをその額に戻す（脱落者を出さない）。
+    """
+    orchestrator = GameOrchestrator(game_state, event_sink=event_sink, headless=True)
+    seats = [s for s in game_state.table.seats if s.is_occupied]
+
+    start = time.perf_counter()
+    played = 0
+    if rebuy_stack is None:
+        played = orchestrator.run_game(num_hands)
+    else:
+        for _ in range(num_hands):
+            for seat in seats:
+                seat.stack = rebuy_stack
+            orchestrator.play_hand()
+            played += 1
+    return SimulationResult(hands=played, elapsed=time.perf_counter() - start)
@@ -0,0 +1,559 @@
+# app/simulation/vector_engine.py
+"""
+K 卓分のゲーム状態を NumPy 配列 (struct-of-arrays) で持つシミュレーション用エンジン。
+
+ルールは hand_manager / round_manager / action_service と同じで、
+全テーブルを「1人ずつのアクション」単位でまとめて進める。
+アクションはテーブルの配列をまとめて受け取るベクトル化されたポリシーが決める。
+
+    engine = VectorTables.create(num_tables=10000, num_players=6, stack=10000, seed=0)
+    engine.run(ai_policy, hands_per_table=100, rebuy_stack=10000)
+
+GameState との相互変換には from_game_states / to_game_states を使う。
+スタックが0の座席はハンド開始時に空席として扱う（run_game で退席させるのと同じ）。
+"""
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.deck import FULL_DECK
+from app.models.enum import ActionType, GameStatus, Position, Round, SeatStatus
+from app.models.game_state import GameState
+from app.services.evaluation_service import evaluate_hands_batch
+from app.services.ai.ai_strategy import OPENING_TABLES, HAND_CLASS_TABLE
+
+# 配列で使うコード（タプルのインデックスが各 Enum に対応する）
+ACTION_TYPES = (ActionType.FOLD, ActionType.CHECK, ActionType.CALL, ActionType.BET, ActionType.RAISE)
+FOLD, CHECK, CALL, BET, RAISE = range(5)
+
+SEAT_STATUSES = (SeatStatus.ACTIVE, SeatStatus.FOLDED, SeatStatus.ALL_IN, SeatStatus.OUT)
+ACTIVE, FOLDED, ALL_IN, OUT = range(4)
+
+ROUNDS = (Round.PREFLOP, Round.FLOP, Round.TURN, Round.RIVER)
+PREFLOP, FLOP, TURN, RIVER = range(4)
+
+GAME_STATUSES = (GameStatus.WAITING, GameStatus.IN_PROGRESS, GameStatus.HAND_COMPLETE)
+WAITING, IN_PROGRESS, HAND_COMPLETE = range(3)
+
+POSITIONS = tuple(Position)
+_POSITION_CODE = {p: i for i, p in enumerate(POSITIONS)}
+
+# 人数 n とディーラーからの距離 d -> ポジション (position_service.assign_positions と同じ割り当て)
+_SIX_MAX = [Position.LJ, Position.HJ, Position.CO, Position.BTN, Position.SB, Position.BB]
+POSITION_BY_DISTANCE = np.full((7, 6), -1, dtype=np.int8)
+POSITION_BY_DISTANCE[2, :2] = [_POSITION_CODE[Position.BTN], _POSITION_CODE[Position.BB]]
+for _n in range(3, 7):
+    _order = _SIX_MAX[-_n:]
+    for _d in range(_n):
+        POSITION_BY_DISTANCE[_n, _d] = _POSITION_CODE[_order[(_order.index(Position.BTN) + _d) % _n]]
+
+SB_CODE = _POSITION_CODE[Position.SB]
+BB_CODE = _POSITION_CODE[Position.BB]
+
+# 未使用のカード・座席
+NONE = -1
+
+Policy = Callable[["VectorTables", np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]
+
+
+class VectorTables:
+    """K 卓分のゲーム状態。各配列の1次元目がテーブル、2次元目が座席"""
+
+    def __init__(self, num_tables: int, seat_count: int = 6, big_blind: int = 100,
+                 small_blind: Optional[int] = None, seed: Optional[int] = None):
+        k, s = num_tables, seat_count
+        self.num_tables = k
+        self.seat_count = s
+        self.rng = np.random.default_rng(seed)
+
+        self.big_blind = np.full(k, big_blind, dtype=np.int64)
+        self.small_blind = np.full(k, big_blind // 2 if small_blind is None else small_blind, dtype=np.int64)
+
+        # 座席
+        self.occupied = np.zeros((k, s), dtype=bool)
+        self.stack = np.zeros((k, s), dtype=np.int64)
+        self.current_bet = np.zeros((k, s), dtype=np.int64)
+        self.bet_total = np.zeros((k, s), dtype=np.int64)
+        self.status = np.full((k, s), OUT, dtype=np.int8)
+        self.acted = np.zeros((k, s), dtype=bool)
+        self.position = np.full((k, s), NONE, dtype=np.int8)
+        self.hole_cards = np.full((k, s, 2), NONE, dtype=np.int8)
+
+        # テーブル
+        self.deck = np.tile(np.arange(52, dtype=np.int8), (k, 1))
+        self.deck_position = np.zeros(k, dtype=np.int64)
+        self.community_cards = np.full((k, 5), NONE, dtype=np.int8)
+        self.community_count = np.zeros(k, dtype=np.int64)
+        self.pot = np.zeros(k, dtype=np.int64)
+
+        # 進行状態
+        self.game_status = np.full(k, WAITING, dtype=np.int8)
+        self.current_round = np.zeros(k, dtype=np.int8)
+        self.dealer = np.full(k, NONE, dtype=np.int64)
+        self.current_seat = np.full(k, NONE, dtype=np.int64)
+        self.amount_to_call = np.zeros(k, dtype=np.int64)
+        self.min_raise_amount = np.zeros(k, dtype=np.int64)
+        self.last_raiser = np.full(k, NONE, dtype=np.int64)
+
+        # 直近のハンドで各座席が受け取った額
+        self.payouts = np.zeros((k, s), dtype=np.int64)
+
+        self._rows = np.arange(k)
+        self._seat_index = np.arange(s)
+
+    @classmethod
+    def create(cls, num_tables: int, num_players: int = 6, stack: int = 10000, big_blind: int = 100,
+               small_blind: Optional[int] = None, seat_count: int = 6, seed: Optional[int] = None) -> "VectorTables":
+        """全テーブルの先頭 num_players 席にプレイヤーを座らせた状態を作る"""
+        if not 2 <= num_players <= seat_count:
+            raise ValueError(f"num_players must be between 2 and {seat_count}")
+        engine = cls(num_tables, seat_count, big_blind, small_blind, seed)
+        engine.occupied[:, :num_players] = True
+        engine.stack[:, :num_players] = stack
+        return engine
+
+    # --- 座席の探索 ---
+
+    def _next_seat(self, tables: np.ndarray, start: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """start の次から時計回りに candidates (len(tables), S) が真の座席を探す。なければ start"""
+        s = self.seat_count
+        order = (start[:, None] + np.arange(1, s + 1)) % s
+        hit = np.take_along_axis(candidates, order, axis=1)
+        found = hit.any(axis=1)
+        first = order[np.arange(len(tables)), hit.argmax(axis=1)]
+        return np.where(found, first, start)
+
+    def _next_active(self, tables: np.ndarray, start: np.ndarray) -> np.ndarray:
+        return self._next_seat(tables, start, self.status[tables] == ACTIVE)
+
+    # --- ハンドの開始 ---
+
+    def start_hands(self, tables: Optional[np.ndarray] = None, shuffle: bool = True) -> None:
+        """
+        hand_manager.start_new_hand とプリフロップのラウンド準備を行う。
+        shuffle=False の場合は現在のデッキの並びをそのまま使う。
+        """
+        t = self._rows if tables is None else np.asarray(tables)
+        if len(t) == 0:
+            return
+        if shuffle:
+            self.deck[t] = self.rng.random((len(t), 52)).argsort(axis=1)
+        self.deck_position[t] = 0
+        self.community_cards[t] = NONE
+        self.community_count[t] = 0
+        self.pot[t] = 0
+        self.current_bet[t] = 0
+        self.bet_total[t] = 0
+        self.acted[t] = False
+        self.hole_cards[t] = NONE
+        self.position[t] = NONE
+        self.payouts[t] = 0
+
+        seated = self.occupied[t] & (self.stack[t] > 0)
+        self.status[t] = np.where(seated, ACTIVE, OUT)
+        self.current_round[t] = PREFLOP
+        self.current_seat[t] = NONE
+        self.amount_to_call[t] = 0
+        self.min_raise_amount[t] = 0
+        self.last_raiser[t] = NONE
+
+        num_seated = seated.sum(axis=1)
+        playable = num_seated >= 2
+        self.game_status[t] = np.where(playable, IN_PROGRESS, WAITING)
+        t, seated, num_seated = t[playable], seated[playable], num_seated[playable]
+        if len(t) == 0:
+            return
+
+        # 1. ディーラーボタン（未設定なら最初に着席している座席）
+        dealer = self.dealer[t]
+        first_seated = seated.argmax(axis=1)
+        dealer = np.where(dealer < 0, first_seated, self._next_seat(t, np.maximum(dealer, 0), seated))
+        self.dealer[t] = dealer
+
+        # 2. ポジション（着席順でディーラーからの距離を求める）
+        seat_rank = np.cumsum(seated, axis=1) - 1
+        dealer_rank = seat_rank[np.arange(len(t)), dealer]
+        distance = (seat_rank - dealer_rank[:, None]) % num_seated[:, None]
+        positions = POSITION_BY_DISTANCE[num_seated[:, None], distance]
+        self.position[t] = np.where(seated, positions, NONE)
+
+        # 3. ブラインド（POST_SB, POST_BB の順に process_action と同じ処理）
+        for code, blinds in ((SB_CODE, self.small_blind[t]), (BB_CODE, self.big_blind[t])):
+            has_blind = (self.position[t] == code).any(axis=1)
+            rows = t[has_blind]
+            seats = (self.position[rows] == code).argmax(axis=1)
+            amounts = np.minimum(blinds[has_blind], self.stack[rows, seats])
+            self._post(rows, seats, amounts)
+
+        # 4. ホールカード（着席順に2枚ずつ）
+        deal_index = self.deck_position[t][:, None] + 2 * np.maximum(seat_rank, 0)
+        first = np.take_along_axis(self.deck[t], deal_index, axis=1)
+        second = np.take_along_axis(self.deck[t], deal_index + 1, axis=1)
+        self.hole_cards[t, :, 0] = np.where(seated, first, NONE)
+        self.hole_cards[t, :, 1] = np.where(seated, second, NONE)
+        self.deck_position[t] += 2 * num_seated
+
+        # ブラインドだけで決着している場合（アクションできる人が1人以下）
+        over = (self.status[t] == ACTIVE).sum(axis=1) <= 1
+        self._conclude(t[over])
+        t, num_seated = t[~over], num_seated[~over]
+
+        # プリフロップのラウンド準備 (round_manager.run_betting_round)
+        self.acted[t] = False
+        bb_present = (self.position[t] == BB_CODE).any(axis=1)
+        bb_seat = (self.position[t] == BB_CODE).argmax(axis=1)
+        self.last_raiser[t] = np.where(bb_present, bb_seat, self.last_raiser[t])
+        self.amount_to_call[t] = self.big_blind[t]
+        after_bb = self._next_active(t, np.where(bb_present, bb_seat, self.dealer[t]))
+        self.current_seat[t] = np.where(num_seated == 2, self.dealer[t], after_bb)
+
+    def _post(self, tables: np.ndarray, seats: np.ndarray, amounts: np.ndarray) -> None:
+        """ブラインドの支払い (POST_SB / POST_BB)"""
+        self.acted[tables, seats] = True
+        self._bet(tables, seats, amounts)
+        self.amount_to_call[tables] = self.current_bet[tables, seats]
+        self.min_raise_amount[tables] = self.current_bet[tables, seats] * 2
+        self.last_raiser[tables] = seats
+        self._mark_all_in(tables, seats)
+
+    def _bet(self, tables: np.ndarray, seats: np.ndarray, amounts: np.ndarray) -> None:
+        if np.any(self.stack[tables, seats] < amounts):
+            raise ValueError("Not enough chips to bet")
+        self.stack[tables, seats] -= amounts
+        self.current_bet[tables, seats] += amounts
+        self.bet_total[tables, seats] += amounts
+
+    def _mark_all_in(self, tables: np.ndarray, seats: np.ndarray) -> None:
+        broke = self.stack[tables, seats] <= 0
+        t, s = tables[broke], seats[broke]
+        self.stack[t, s] = 0
+        self.status[t, s] = ALL_IN
+
+    # --- アクション ---
+
+    def pending_tables(self) -> np.ndarray:
+        """アクション待ちのテーブル（current_seat の座席が次に行動する）"""
+        return np.flatnonzero(self.game_status == IN_PROGRESS)
+
+    def apply_actions(self, tables: np.ndarray, action_types: np.ndarray, amounts: np.ndarray) -> None:
+        """
+        各テーブルの current_seat のアクションを処理し、次の手番へ進める。
+        amounts は BET / RAISE のみ使う (RAISE はレイズ後の合計額)。
+        """
+        tables = np.asarray(tables)
+        action_types = np.asarray(action_types)
+        amounts = np.asarray(amounts, dtype=np.int64)
+        seats = self.current_seat[tables]
+        self.acted[tables, seats] = True
+
+        fold = action_types == FOLD
+        self.status[tables[fold], seats[fold]] = FOLDED
+
+        call = action_types == CALL
+        t, s = tables[call], seats[call]
+        self._bet(t, s, np.minimum(self.amount_to_call[t] - self.current_bet[t, s], self.stack[t, s]))
+
+        bet = action_types == BET
+        t, s = tables[bet], seats[bet]
+        self._bet(t, s, amounts[bet])
+        self.amount_to_call[t] = self.current_bet[t, s]
+        self.min_raise_amount[t] = self.current_bet[t, s] * 2
+        self.last_raiser[t] = s
+
+        raise_ = action_types == RAISE
+        t, s, total = tables[raise_], seats[raise_], amounts[raise_]
+        previous = self.amount_to_call[t]
+        self._bet(t, s, total - self.current_bet[t, s])
+        self.amount_to_call[t] = total
+        self.min_raise_amount[t] = total + (total - previous)
+        self.last_raiser[t] = s
+
+        # ベット・レイズがあれば他のアクティブな座席は再びアクションできる
+        reopen = bet | raise_
+        t, s = tables[reopen], seats[reopen]
+        others = self._seat_index[None, :] != s[:, None]
+        self.acted[t] &= ~(others & (self.status[t] == ACTIVE))
+
+        self._mark_all_in(tables, seats)
+
+        # ラウンド終了判定 (round_manager.is_betting_round_over)
+        active = self.status[tables] == ACTIVE
+        bets = self.current_bet[tables]
+        all_acted = (self.acted[tables] | ~active).all(axis=1)
+        high = np.where(active, bets, np.iinfo(np.int64).min).max(axis=1)
+        low = np.where(active, bets, np.iinfo(np.int64).max).min(axis=1)
+        over = (active.sum(axis=1) <= 1) | (all_acted & (high == low))
+
+        t = tables[~over]
+        self.current_seat[t] = self._next_active(t, self.current_seat[t])
+        self._end_round(tables[over])
+
+    def step(self, policy: Policy) -> int:
+        """アクション待ちの全テーブルを1手ずつ進め、進めたテーブル数を返す"""
+        tables = self.pending_tables()
+        if len(tables):
+            action_types, amounts = policy(self, tables, self.current_seat[tables])
+            self.apply_actions(tables, action_types, amounts)
+        return len(tables)
+
+    # --- ラウンド・ハンドの終了 ---
+
+    def _end_round(self, tables: np.ndarray) -> None:
+        """ベットを回収し、次のラウンドへ進むかハンドを終える"""
+        if len(tables) == 0:
+            return
+        self.pot[tables] += self.current_bet[tables].sum(axis=1)
+        self.current_bet[tables] = 0
+
+        hand_over = (self.status[tables] == ACTIVE).sum(axis=1) <= 1
+        finished = hand_over | (self.current_round[tables] == RIVER)
+        self._conclude(tables[finished])
+
+        t = tables[~finished]
+        self.current_round[t] += 1
+        self._deal_community(t, np.where(self.current_round[t] == FLOP, 3, 1))
+        self.acted[t] = False
+        self.amount_to_call[t] = 0
+        self.last_raiser[t] = NONE
+        self.min_raise_amount[t] = self.big_blind[t]
+        self.current_seat[t] = self._next_active(t, self.dealer[t])
+
+    def _deal_community(self, tables: np.ndarray, counts: np.ndarray) -> None:
+        """tables ごとに counts 枚のコミュニティカードをデッキから配る"""
+        for i in range(int(counts.max(initial=0))):
+            t = tables[counts > i]
+            self.community_cards[t, self.community_count[t]] = self.deck[t, self.deck_position[t]]
+            self.community_count[t] += 1
+            self.deck_position[t] += 1
+
+    def _conclude(self, tables: np.ndarray) -> None:
+        """ショウダウン（必要なら残りのボードを配る）とポットの分配"""
+        if len(tables) == 0:
+            return
+        contenders = (self.status[tables] == ACTIVE) | (self.status[tables] == ALL_IN)
+        num_contenders = contenders.sum(axis=1)
+        run_out = num_contenders > 1
+        self._deal_community(tables[run_out], 5 - self.community_count[tables[run_out]])
+
+        payouts = np.zeros((len(tables), self.seat_count), dtype=np.int64)
+        total = self.bet_total[tables].sum(axis=1)
+        # 1人だけ残っていれば総取り
+        single = num_contenders == 1
+        payouts[single] = np.where(contenders[single], total[single, None], 0)
+
+        showdown = np.flatnonzero(run_out)
+        if len(showdown):
+            payouts[showdown] = self._showdown_payouts(tables[showdown], contenders[showdown])
+
+        self.payouts[tables] = payouts
+        self.stack[tables] += payouts
+        self.game_status[tables] = HAND_COMPLETE
+
+    def _showdown_payouts(self, tables: np.ndarray, contenders: np.ndarray) -> np.ndarray:
+        """オールイン額ごとのポット (PotLedger と同じ分け方) を役の強さで分配する"""
+        n, s = len(tables), self.seat_count
+        rows = np.arange(n)
+
+        # 役の強さ（ショウダウンに参加しない座席は最弱より大きい値）
+        ranks = np.full((n, s), np.iinfo(np.int32).max, dtype=np.int64)
+        t_idx, s_idx = np.nonzero(contenders)
+        holes = self.hole_cards[tables[t_idx], s_idx].astype(np.int64)
+        boards = self.community_cards[tables[t_idx]].astype(np.int64)
+        ranks[t_idx, s_idx] = evaluate_hands_batch(holes, boards)
+
+        # ポットの境界: オールインした額と最大の拠出額
+        bet_total = self.bet_total[tables]
+        all_in = self.status[tables] == ALL_IN
+        levels = np.sort(np.where(all_in, bet_total, 0), axis=1)
+        levels = np.concatenate([np.zeros((n, 1), dtype=np.int64), levels, bet_total.max(axis=1, keepdims=True)], axis=1)
+        levels = np.maximum.accumulate(levels, axis=1)
+        num_layers = levels.shape[1] - 1
+
+        amounts = np.zeros((n, num_layers), dtype=np.int64)
+        eligible = np.zeros((n, num_layers, s), dtype=bool)
+        for j in range(num_layers):
+            low, high = levels[:, j, None], levels[:, j + 1, None]
+            amounts[:, j] = (np.clip(bet_total, low, high) - low).sum(axis=1)
+            eligible[:, j] = contenders & (bet_total > low)
+
+        # 獲得資格者のいないポットは1つ下のポットへ（最初のポットなら次のポットへ）まとめる
+        has_eligible = eligible.any(axis=2) & (amounts > 0)
+        carry = np.zeros(n, dtype=np.int64)
+        previous = np.full(n, NONE)
+        for j in range(num_layers):
+            orphan = (amounts[:, j] > 0) & ~has_eligible[:, j]
+            to_previous = orphan & (previous >= 0)
+            amounts[rows[to_previous], previous[to_previous]] += amounts[to_previous, j]
+            carry += np.where(orphan & (previous < 0), amounts[:, j], 0)
+            amounts[orphan, j] = 0
+            live = has_eligible[:, j]
+            amounts[live, j] += carry[live]
+            carry[live] = 0
+            previous = np.where(live, j, previous)
+
+        # 端数チップはディーラーの左隣から順に配る
+        distance = (self._seat_index[None, :] - self.dealer[tables, None] - 1) % s
+        payouts = np.zeros((n, s), dtype=np.int64)
+        for j in range(num_layers):
+            pot = amounts[:, j]
+            live = pot > 0
+            if not live.any():
+                continue
+            layer_ranks = np.where(eligible[:, j], ranks, np.iinfo(np.int64).max)
+            winners = eligible[:, j] & (layer_ranks == layer_ranks.min(axis=1, keepdims=True))
+            count = np.maximum(winners.sum(axis=1), 1)
+            share, odd = np.divmod(pot, count)
+            order = np.argsort(np.where(winners, distance, s), axis=1)
+            winner_rank = np.empty_like(order)
+            np.put_along_axis(winner_rank, order, np.arange(s)[None, :].repeat(n, axis=0), axis=1)
+            gain = share[:, None] + (winner_rank < odd[:, None])
+            payouts += np.where(winners & live[:, None], gain, 0)
+        return payouts
+
+    # --- まとめて実行 ---
+
+    def run(self, policy: Policy, hands_per_table: int, rebuy_stack: Optional[int] = None) -> int:
+        """
+        各テーブルで hands_per_table ハンドを実行し、実行したハンド数の合計を返す。
+        終わったテーブルはすぐ次のハンドを始めるので、全テーブルが同時に進む。
+        """
+        hands = np.zeros(self.num_tables, dtype=np.int64)
+
+        def start(tables: np.ndarray) -> None:
+            if rebuy_stack is not None:
+                self.stack[tables] = np.where(self.occupied[tables], rebuy_stack, 0)
+            self.start_hands(tables)
+
+        start(self._rows)
+        while True:
+            done = np.flatnonzero(self.game_status != IN_PROGRESS)
+            if len(done):
+                hands[done] += self.game_status[done] == HAND_COMPLETE
+                restart = done[(hands[done] < hands_per_table) & (self.game_status[done] == HAND_COMPLETE)]
+                # 以降のハンドを数えないよう、終了したテーブルは WAITING にしておく
+                self.game_status[done] = WAITING
+                start(restart)
+            if not self.step(policy) and not (self.game_status == HAND_COMPLETE).any():
+                break
+        return int(hands.sum())
+
+    # --- GameState との変換 ---
+
+    @classmethod
+    def from_game_states(cls, game_states: Sequence[GameState], seed: Optional[int] = None) -> "VectorTables":
+        """
+        GameState の一覧を配列に写す（座席数は同じであること）。
+        IN_PROGRESS の状態は current_seat_index の座席がアクション待ちとして扱う。
+        """
+        seat_count = len(game_states[0].table.seats)
+        engine = cls(len(game_states), seat_count, seed=seed)
+        for k, gs in enumerate(game_states):
+            table = gs.table
+            if len(table.seats) != seat_count:
+                raise ValueError("All game states must have the same seat count")
+            engine.big_blind[k] = gs.big_blind
+            engine.small_blind[k] = gs.small_blind
+            for seat in table.seats:
+                i = seat.index
+                engine.occupied[k, i] = seat.is_occupied
+                engine.stack[k, i] = seat.stack
+                engine.current_bet[k, i] = seat.current_bet
+                engine.bet_total[k, i] = seat.bet_total
+                engine.status[k, i] = SEAT_STATUSES.index(seat.status)
+                engine.acted[k, i] = seat.acted
+                engine.position[k, i] = NONE if seat.position is None else _POSITION_CODE[seat.position]
+                if seat.hole_cards:
+                    engine.hole_cards[k, i] = [c.id for c in seat.hole_cards]
+            engine.deck[k] = [c.id for c in table.deck.cards]
+            engine.deck_position[k] = table.deck.position
+            community = [c.id for c in table.community_cards]
+            engine.community_cards[k, :len(community)] = community
+            engine.community_count[k] = len(community)
+            engine.pot[k] = table.pot
+
+            engine.game_status[k] = GAME_STATUSES.index(gs.status)
+            engine.current_round[k] = ROUNDS.index(gs.current_round)
+            engine.dealer[k] = NONE if gs.dealer_seat_index is None else gs.dealer_seat_index
+            engine.current_seat[k] = NONE if gs.current_seat_index is None else gs.current_seat_index
+            engine.amount_to_call[k] = gs.amount_to_call
+            engine.min_raise_amount[k] = gs.min_raise_amount
+            engine.last_raiser[k] = NONE if gs.last_raiser_seat_index is None else gs.last_raiser_seat_index
+        return engine
+
+    def to_game_states(self, game_states: Sequence[GameState]) -> None:
+        """配列の状態を GameState に書き戻す（プレイヤーの着席は変更しない）"""
+        if len(game_states) != self.num_tables:
+            raise ValueError("Number of game states must match the number of tables")
+
+        def optional(value) -> Optional[int]:
+            return None if value < 0 else int(value)
+
+        for k, gs in enumerate(game_states):
+            table = gs.table
+            for seat in table.seats:
+                i = seat.index
+                seat.stack = int(self.stack[k, i])
+                seat.current_bet = int(self.current_bet[k, i])
+                seat.bet_total = int(self.bet_total[k, i])
+                seat.status = SEAT_STATUSES[self.status[k, i]]
+                seat.acted = bool(self.acted[k, i])
+                code = self.position[k, i]
+                seat.position = None if code < 0 else POSITIONS[code]
+                seat.hole_cards = [FULL_DECK[c] for c in self.hole_cards[k, i] if c >= 0]
+            table.deck.cards = [FULL_DECK[c] for c in self.deck[k]]
+            table.deck.position = int(self.deck_position[k])
+            table.community_cards = [FULL_DECK[c] for c in self.community_cards[k, :self.community_count[k]]]
+            table.pot = int(self.pot[k])
+            table.pot_ledger.reset()
+            table.pot_ledger.sync(table.seats)
+
+            gs.status = GAME_STATUSES[self.game_status[k]]
+            gs.current_round = ROUNDS[self.current_round[k]]
+            gs.dealer_seat_index = optional(self.dealer[k])
+            gs.current_seat_index = optional(self.current_seat[k])
+            gs.amount_to_call = int(self.amount_to_call[k])
+            gs.min_raise_amount = int(self.min_raise_amount[k])
+            gs.last_raiser_seat_index = optional(self.last_raiser[k])
+            gs.recount_settled()
+            gs.version += 1
+
+
+# --- ポリシー ---
+
+def _build_opening_matrix() -> np.ndarray:
+    """ポジションごとのコンパイル済みレンジ表をハンドクラスの真偽値の行列にまとめる"""
+    matrix = np.zeros((len(POSITIONS), 169), dtype=bool)
+    hand_classes = np.array(HAND_CLASS_TABLE, dtype=np.int16)
+    for position, table in OPENING_TABLES.items():
+        matrix[_POSITION_CODE[position], hand_classes[np.frombuffer(table, dtype=np.uint8) == 1]] = True
+    return matrix
+
+_OPENING_MATRIX = _build_opening_matrix()
+_HAND_CLASS_ARRAY = np.array(HAND_CLASS_TABLE, dtype=np.int16)
+
+
+def ai_policy(engine: VectorTables, tables: np.ndarray, seats: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    ai_agent_service.decide_action と同じ判断をまとめて行う。
+    プリフロップのオープン機会でレンジ内ならレイズ、それ以外はチェック -> コール -> フォールド。
+    """
+    stack = engine.stack[tables, seats]
+    current_bet = engine.current_bet[tables, seats]
+    to_call = engine.amount_to_call[tables]
+    min_raise = engine.min_raise_amount[tables]
+    big_blind = engine.big_blind[tables]
+
+    can_check = current_bet == to_call
+    call_amount = to_call - current_bet
+    can_call = ~can_check & (call_amount > 0) & (stack > 0)
+    can_raise = ~can_check & (stack > call_amount) & (stack + current_bet >= min_raise)
+
+    holes = engine.hole_cards[tables, seats].astype(np.int64)
+    hand_class = _HAND_CLASS_ARRAY[holes[:, 0] * 52 + holes[:, 1]]
+    position = engine.position[tables, seats]
+    in_range = (position >= 0) & _OPENING_MATRIX[np.maximum(position, 0), hand_class]
+    open_raise = (engine.current_round[tables] == PREFLOP) & (to_call == big_blind) & in_range & can_raise
+
+    action_types = np.where(open_raise, RAISE, np.where(can_check, CHECK, np.where(can_call, CALL, FOLD)))
+    amounts = np.where(open_raise, np.clip(big_blind * 5 // 2, min_raise, stack + current_bet), 0)
+    return action_types.astype(np.int8), amounts
@@ -0,0 +1,70 @@
+# benchmarks/bench_hand_evaluator.py
+"""
+7枚評価のスループット比較。
+
+    python -m benchmarks.bench_hand_evaluator [--hands N]
+
+- treys (per call): 旧 evaluate_hand と同じく毎回 Evaluator() を生成
+- treys (shared):   Evaluator を1つだけ生成して使い回す
+- engine:           app.services.hand_evaluator の事前計算テーブル
+- engine (batch):   evaluate_hands_batch による NumPy 一括評価
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+from treys import Evaluator
+
+from app.models.deck import FULL_DECK
+from app.services import evaluation_service
+from app.services.hand_evaluator import get_hand_evaluator
+
+
+def _bench(label: str, func, hands) -> float:
+    start = time.perf_counter()
+    for hole, board in hands:
+        func(hole, board)
+    elapsed = time.perf_counter() - start
+    rate = len(hands) / elapsed
+    print(f"{label:<20} {rate:>12,.0f} evals/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hands", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    hands = []
+    for _ in range(args.hands):
+        cards = rng.sample(FULL_DECK, 7)
+        hands.append((cards[:2], cards[2:]))
+
+    get_hand_evaluator()  # テーブルの読み込みは計測に含めない
+
+    def treys_per_call(hole, board):
+        return Evaluator().evaluate([c.treys_int for c in hole], [c.treys_int for c in board])
+
+    shared = Evaluator()
+
+    def treys_shared(hole, board):
+        return shared.evaluate([c.treys_int for c in hole], [c.treys_int for c in board])
+
+    # 毎回テーブルを作り直すため件数を絞る
+    before = _bench("treys (per call)", treys_per_call, hands[: max(1, args.hands // 1000)])
+    _bench("treys (shared)", treys_shared, hands)
+    after = _bench("engine", evaluation_service.evaluate_hand, hands)
+    hole_ids = np.array([[c.id for c in hole] for hole, _ in hands])
+    board_ids = np.array([[c.id for c in board] for _, board in hands])
+    start = time.perf_counter()
+    evaluation_service.evaluate_hands_batch(hole_ids, board_ids)
+    batch = len(hands) / (time.perf_counter() - start)
+    print(f"{'engine (batch)':<20} {batch:>12,.0f} evals/s")
+    print(f"speedup vs per-call treys: {after / before:,.0f}x (batch: {batch / before:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# benchmarks/bench_simulation.py
+"""
+AI同士のシミュレーションのスループット比較。
+
+    python -m benchmarks.bench_simulation [--hands N] [--tables K]
+
+- objects: GameOrchestrator (ヘッドレス) で1卓ずつ実行
+- vector:  VectorTables で K 卓をまとめて実行
+"""
+import argparse
+import time
+
+from app.simulation.headless import build_game, run_headless
+from app.simulation.vector_engine import VectorTables, ai_policy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hands", type=int, default=2000, help="Hands for the object engine")
+    parser.add_argument("--tables", type=int, default=10000, help="Tables for the vector engine")
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    game_state = build_game(args.players, seed=args.seed)
+    result = run_headless(game_state, args.hands, rebuy_stack=10000)
+    print(f"{'objects':<10} {result.hands_per_second:>12,.0f} hands/s")
+
+    engine = VectorTables.create(args.tables, args.players, seed=args.seed)
+    start = time.perf_counter()
+    hands = engine.run(ai_policy, hands_per_table=20, rebuy_stack=10000)
+    rate = hands / (time.perf_counter() - start)
+    print(f"{'vector':<10} {rate:>12,.0f} hands/s ({rate / result.hands_per_second:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
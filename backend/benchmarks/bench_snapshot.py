@@ -0,0 +1,41 @@
+# benchmarks/bench_snapshot.py
+"""
+探索用の GameState のコピー方法の比較（プリフロップ、6人）。
+
+    python -m benchmarks.bench_snapshot [--iterations N]
+
+- deepcopy:          copy.deepcopy(game_state)
+- clone:             game_state.clone()
+- snapshot/restore:  game_state.snapshot() と restore() の1往復
+"""
+import argparse
+import copy
+import time
+
+from app.services import hand_manager
+from app.simulation.headless import build_game
+
+
+def _bench(label: str, func, iterations: int) -> None:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    rate = iterations / (time.perf_counter() - start)
+    print(f"{label:<18} {rate:>12,.0f} copies/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    game_state = build_game(6, seed=0)
+    hand_manager.start_new_hand(game_state)
+
+    _bench("deepcopy", lambda: copy.deepcopy(game_state), args.iterations // 10)
+    _bench("clone", game_state.clone, args.iterations)
+    _bench("snapshot/restore", lambda: game_state.restore(game_state.snapshot()), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# tests/api/test_feed.py
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.api.endpoints.feed import GameFeed, apply_delta, diff_states
+from app.main import app
+from app.services import hand_manager
+from app.simulation.headless import build_game
+
+def test_diff_contains_only_changed_fields_and_seats():
+    old = {"pot": 100, "current_round": "PREFLOP", "seats": [{"index": 0, "stack": 900}, {"index": 1, "stack": 800}]}
+    new = {"pot": 300, "current_round": "PREFLOP", "seats": [{"index": 0, "stack": 900}, {"index": 1, "stack": 600}]}
+    delta = diff_states(old, new)
+    assert delta == {"changes": {"pot": 300}, "seats": [{"index": 1, "stack": 600}]}
+    assert apply_delta(old, delta) == new
+    assert diff_states(new, new) is None
+
+def test_resume_from_version_replays_missed_deltas():
+    game_state = build_game(3, seed=5)
+    feed = GameFeed("g", game_state)
+    game_state.event_sink = feed
+    loop = asyncio.new_event_loop()
+    try:
+        queue = asyncio.Queue()
+        [snapshot] = feed.subscribe(queue, loop)
+        assert snapshot["type"] == "snapshot"
+        hand_manager.start_new_hand(game_state)
+        feed.publish("started")  # エンドポイントは処理の最後にも配信する
+        loop.run_until_complete(asyncio.sleep(0))
+        updates = [queue.get_nowait() for _ in range(queue.qsize())]
+        assert [u["version"] for u in updates] == list(range(snapshot["version"] + 1, feed.version + 1))
+
+        # 残っている差分から再開でき、適用するとスナップショットと同じ状態になる
+        state = snapshot["state"]
+        resumed = feed.subscribe(asyncio.Queue(), loop, since=snapshot["version"])
+        for update in resumed:
+            state = apply_delta(state, update)
+        assert resumed == updates and state == feed._render()
+        assert feed.subscribe(asyncio.Queue(), loop, since=feed.version) == []
+        # 古すぎるバージョンや未来のバージョンにはスナップショットを送る
+        for since in (-1, feed.version + 1):
+            assert [u["type"] for u in feed.subscribe(asyncio.Queue(), loop, since=since)] == ["snapshot"]
+    finally:
+        loop.close()
+
+def test_actions_do_not_render_and_snapshot_waits_for_the_game():
+    game_state = build_game(3, seed=5)
+    feed = GameFeed("g", game_state)
+    game_state.event_sink = feed
+    loop = asyncio.new_event_loop()
+    try:
+        feed.subscribe(asyncio.Queue(), loop)
+        version = feed.version
+        hand_manager.start_new_hand(game_state)  # ブラインドのアクションだけでは配信しない
+        assert feed.version == version
+
+        # エンドポイントがゲームを進めている間はスナップショットを作らない
+        feed.unsubscribe(next(iter(feed._subscribers)))
+        feed.publish()
+        results = []
+        with feed.game_lock:
+            worker = threading.Thread(target=lambda: results.append(feed.subscribe(asyncio.Queue(), loop)))
+            worker.start()
+            worker.join(0.1)
+            assert worker.is_alive() and not results
+        worker.join(1)
+        assert results[0][0]["type"] == "snapshot"
+    finally:
+        loop.close()
+
+def test_websocket_streams_state_until_it_matches_the_response():
+    with TestClient(app) as client:
+        game = client.post("/games", json={"players": [{"name": "me"}, {"name": "ai", "is_ai": True}]}).json()
+        with client.websocket_connect(f"/games/{game['game_id']}/ws") as ws:
+            snapshot = ws.receive_json()
+            state = snapshot["state"]
+            assert snapshot["type"] == "snapshot" and state == game | {"last_message": state["last_message"]}
+            me = next(s for s in state["seats"] if s["player"] and not s["player"]["is_ai"])
+            response = client.post(f"/games/{game['game_id']}/action",
+                                   json={"player_id": me["player"]["player_id"], "action_type": "FOLD"}).json()
+            while state != response:
+                update = ws.receive_json()
+                assert update["type"] == "delta"
+                state = apply_delta(state, update)
@@ -1,6 +1,8 @@
+import numpy as np
 import pytest
 from app.models.game_state import GameState
 from app.models.player import Player
+from app.services import preflop_equity
 
 @pytest.fixture
 def players():
@@ -21,4 +23,24 @@ def game_state(players): # playersフィクスチャを利用するように変
     gs.table.sit_player(players[1], 1, 10000)
     gs.table.sit_player(players[2], 2, 10000)
     
-    return gs
\ No newline at end of file
+    return gs
+
+def pytest_addoption(parser):
+    parser.addoption("--run-slow", action="store_true", default=False, help="run tests marked slow")
+
+def pytest_collection_modifyitems(config, items):
+    """slow のテストは --run-slow を付けたときだけ実行する"""
+    if config.getoption("--run-slow"):
+        return
+    skip = pytest.mark.skip(reason="needs --run-slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
+
+@pytest.fixture(scope="session")
+def real_heads_up():
+    """生成済みのヘッズアップのエクイティ表（なければモンテカルロで heads_up だけ作る）。slow のテスト用"""
+    tables = preflop_equity.get_preflop_tables()
+    if tables is not None:
+        return np.asarray(tables.heads_up)
+    return preflop_equity.build_heads_up(samples=1000)
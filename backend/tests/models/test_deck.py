@@ -0,0 +1,68 @@
+# tests/models/test_deck.py
+import pickle
+import random
+import pytest
+from treys import Card as TreysCard
+from app.models.deck import Card, Deck, FULL_DECK, PermutationPool
+from app.models.table import Table
+
+def test_cards_are_interned():
+    assert Card('A', 's') is Card('A', 's')
+    assert len(set(FULL_DECK)) == 52
+    assert pickle.loads(pickle.dumps(Card('T', 'h'))) is Card('T', 'h')
+
+def test_precomputed_fields():
+    for card in FULL_DECK:
+        assert Card.from_id(card.id) is card
+        assert card.treys_int == TreysCard.new(card.rank + card.suit)
+        assert card.mask == 1 << card.id
+
+def test_invalid_card_raises():
+    with pytest.raises(ValueError):
+        Card('1', 's')
+    with pytest.raises(ValueError):
+        Card('A', 'x')
+
+def test_deck_reuses_card_instances():
+    deck = Deck()
+    drawn = deck.draw(52)
+    assert set(drawn) == set(FULL_DECK)
+
+def test_seeded_shuffle_is_reproducible():
+    deck = Deck()
+    deck.shuffle(1234)
+    first = deck.draw(9)
+    deck.draw(5)
+    deck.shuffle(1234)
+    assert deck.draw(9) == first
+    assert len(deck) == 43
+
+def test_draw_past_end_raises():
+    deck = Deck(seed=1)
+    deck.draw(50)
+    with pytest.raises(ValueError):
+        deck.draw(3)
+
+def test_pooled_permutations_are_reproducible():
+    pool = PermutationPool(seed=7)
+    deck = Deck(permutations=pool)
+    deck.shuffle(PermutationPool.BATCH_SIZE + 3)
+    cards = deck.draw(52)
+    assert set(cards) == set(FULL_DECK)
+
+    other = Deck(permutations=PermutationPool(seed=7))
+    other.shuffle(PermutationPool.BATCH_SIZE + 3)
+    assert other.draw(52) == cards
+
+def test_tables_with_same_seed_deal_the_same_hands():
+    tables = [Table(seed=99), Table(seed=99)]
+    deals = []
+    for table in tables:
+        random.seed(len(deals))  # グローバルな random には依存しない
+        table.reset()
+        deals.append((table.hand_seed, table.deck.draw(9)))
+    assert deals[0] == deals[1]
+
+    replay = Table()
+    replay.reset(deals[0][0])
+    assert replay.deck.draw(9) == deals[0][1]
@@ -0,0 +1,56 @@
+# tests/models/test_game_state.py
+from app.models.action import Action
+from app.models.enum import ActionType, Round
+from app.services import action_service, hand_manager
+from app.simulation.headless import build_game
+
+def _state(game_state):
+    table = game_state.table
+    return (
+        [(s.stack, s.current_bet, s.bet_total, s.status, s.acted, s.hole_cards, s.position) for s in table.seats],
+        list(table.community_cards), table.pot, table.deck.position, list(table.deck.cards),
+        list(table.pot_ledger.contributions), [(p.amount, p.cap, set(p.eligible)) for p in table.pot_ledger.pots],
+        game_state.current_seat_index, game_state.amount_to_call, game_state.min_raise_amount,
+        game_state.current_round, len(game_state.history),
+    )
+
+def _play_some(game_state):
+    seat = game_state.table.seats[game_state.current_seat_index]
+    action_service.process_action(game_state, Action(seat.player.player_id, ActionType.RAISE, 300))
+    game_state.current_round = Round.FLOP
+    hand_manager.proceed_to_next_round(game_state)
+
+def test_restore_returns_to_snapshot(game_state):
+    hand_manager.start_new_hand(game_state)
+    before = _state(game_state)
+    snapshot = game_state.snapshot()
+
+    _play_some(game_state)
+    assert _state(game_state) != before
+    game_state.restore(snapshot)
+    assert _state(game_state) == before
+
+    # 同じスナップショットから何度でも戻せる
+    _play_some(game_state)
+    game_state.restore(snapshot)
+    assert _state(game_state) == before
+
+def test_clone_is_independent_but_shares_players(game_state):
+    hand_manager.start_new_hand(game_state)
+    before = _state(game_state)
+    clone = game_state.clone()
+
+    _play_some(clone)
+    assert _state(game_state) == before
+    assert clone.table.seats[0].player is game_state.table.seats[0].player
+    assert clone.table is not game_state.table
+
+def test_dealing_on_clone_keeps_original_seed_stream():
+    game_state, reference = build_game(3, seed=7), build_game(3, seed=7)
+    hand_manager.start_new_hand(game_state)
+    hand_manager.start_new_hand(reference)
+
+    hand_manager.start_new_hand(game_state.clone())
+    hand_manager.start_new_hand(game_state)
+    hand_manager.start_new_hand(reference)
+    assert game_state.table.hand_seed == reference.table.hand_seed
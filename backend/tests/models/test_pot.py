@@ -0,0 +1,32 @@
+# tests/models/test_pot.py
+from app.models.pot import PotLedger
+
+def test_single_pot_without_all_in():
+    ledger = PotLedger(3)
+    for seat_index in range(3):
+        ledger.add(seat_index, 100)
+    pots = ledger.active_pots()
+    assert [p.amount for p in pots] == [300]
+    assert pots[0].eligible == {0, 1, 2}
+
+def test_all_in_splits_side_pot():
+    ledger = PotLedger(3)
+    ledger.add(0, 1000)
+    ledger.add(1, 300)
+    ledger.all_in(1)
+    ledger.add(2, 1000)
+
+    pots = ledger.active_pots()
+    assert [(p.amount, p.eligible) for p in pots] == [(900, {0, 1, 2}), (1400, {0, 2})]
+    assert ledger.total == 2300
+
+def test_fold_removes_eligibility_but_keeps_chips():
+    ledger = PotLedger(3)
+    ledger.add(0, 200)
+    ledger.add(1, 100)
+    ledger.all_in(1)
+    ledger.add(2, 200)
+    ledger.fold(2)
+
+    pots = ledger.active_pots()
+    assert [(p.amount, p.eligible) for p in pots] == [(300, {0, 1}), (200, {0})]
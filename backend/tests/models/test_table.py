@@ -0,0 +1,45 @@
+# tests/models/test_table.py
+from app.models.enum import SeatStatus
+from app.models.player import Player
+from app.models.table import Table
+
+def test_seat_mask_follows_seat_changes():
+    table = Table(seat_count=6)
+    table.sit_player(Player("a"), 1, 1000)
+    table.sit_player(Player("b"), 4, 1000)
+    table.sit_player(Player("c"), 5, 0)
+    assert table.occupied_indices() == (1, 4, 5) and table.num_occupied == 3
+
+    table.reset()  # スタック0の座席は OUT になる
+    assert table.mask.active == 0b010010 and table.mask.occupied == 0b110010
+    table.seats[4].status = SeatStatus.ALL_IN
+    assert table.mask.active == 0b000010 and table.mask.in_hand == 0b010010
+    table.stand_player(5)
+    assert table.occupied_indices() == (1, 4)
+
+def test_next_seat_lookup_matches_linear_scan():
+    table = Table(seat_count=6)
+    for i in (0, 2, 3):
+        table.sit_player(Player(f"p{i}"), i, 1000)
+    table.seats[2].status = SeatStatus.FOLDED
+    assert [table.next_active_index(i) for i in range(6)] == [3, 3, 3, 0, 0, 0]
+    assert [table.next_occupied_index(i) for i in range(6)] == [2, 2, 3, 0, 0, 0]
+    # 自分しか残っていなければ自分自身
+    table.seats[3].status = SeatStatus.FOLDED
+    assert table.next_active_index(0) == 0
+
+def test_cloned_game_state_has_its_own_mask(game_state):
+    clone = game_state.clone()
+    clone.table.seats[1].status = SeatStatus.FOLDED
+    assert game_state.table.mask.active == 0b111
+    assert clone.table.mask.active == 0b101
+
+def test_player_seat_map_follows_sit_and_stand():
+    table = Table(seat_count=6)
+    alice, bob = Player("alice"), Player("bob")
+    table.sit_player(alice, 2, 1000)
+    table.sit_player(bob, 5, 1000)
+    assert table.player_seats == {alice.player_id: 2, bob.player_id: 5}
+    assert table.seat_of(bob.player_id) is table.seats[5]
+    table.stand_player(2)
+    assert table.seat_of(alice.player_id) is None and alice.player_id not in table.player_seats
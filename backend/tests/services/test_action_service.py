@@ -1,8 +1,11 @@
 # tests/services/test_action_service.py
+import random
 import pytest
 from app.models.action import Action
 from app.models.enum import ActionType, SeatStatus
-from app.services import action_service
+from app.models.game_state import GameState
+from app.models.player import Player
+from app.services import action_service, hand_manager, position_service, round_manager
 
 class TestGetValidActions:
     def test_facing_no_bet(self, game_state):
@@ -58,3 +61,125 @@ class TestProcessAction:
         # プレイヤー0のactedフラグがリセットされていることを確認
         assert game_state.table.seats[0].acted is False
         assert game_state.table.seats[1].acted is True
+
+def _random_walk(seed):
+    """ランダムな人数・スタックで有効なアクションを選び、(game_state, action) を順に返す"""
+    rng = random.Random(seed)
+    game_state = GameState(big_blind=100, small_blind=50, seat_count=6)
+    for i in range(rng.randint(2, 6)):
+        game_state.table.sit_player(Player(f"P{i}"), i, rng.randint(50, 3000))
+    hand_manager.start_new_hand(game_state)
+    for _ in range(rng.randint(1, 15)):
+        seat = game_state.table.seats[game_state.current_seat_index]
+        if seat.status != SeatStatus.ACTIVE:
+            break
+        choice = rng.choice(action_service.get_valid_actions(game_state, seat.index))
+        amount = choice.get("amount")
+        if "min" in choice:
+            amount = rng.randint(choice["min"], choice["max"])
+        action = Action(seat.player.player_id, choice["type"], amount)
+        yield game_state, action
+        game_state.current_seat_index = position_service.get_next_active_player_index(game_state, seat.index)
+
+def test_apply_then_undo_restores_state_exactly():
+    for seed in range(300):
+        for game_state, action in _random_walk(seed):
+            before = game_state.snapshot()
+            record = action_service.apply_action(game_state, action)
+            action_service.undo_action(game_state, record)
+            assert game_state.snapshot() == before, (seed, action)
+            action_service.apply_action(game_state, action)
+
+def test_undo_in_reverse_order_restores_root():
+    for seed in range(100):
+        walk = _random_walk(seed)
+        game_state, action = next(walk)
+        root = game_state.snapshot()
+        first_seat = game_state.current_seat_index
+        records = [action_service.apply_action(game_state, action)]
+        for game_state, action in walk:
+            records.append(action_service.apply_action(game_state, action))
+        for record in reversed(records):
+            action_service.undo_action(game_state, record)
+        # 手番の移動はテスト側で行っているので戻しておく
+        game_state.current_seat_index = first_seat
+        assert game_state.snapshot() == root, seed
+
+def test_apply_matches_process_action():
+    for seed in range(100):
+        walk = _random_walk(seed)
+        for game_state, action in walk:
+            twin = game_state.clone()
+            action_service.apply_action(game_state, action)
+            action_service.process_action(twin, action)
+            assert game_state.snapshot() == twin.snapshot(), seed
+
+def test_settled_mask_matches_seat_scan_through_apply_and_undo():
+    """差分で更新したビットマスクでの終了判定が、座席の走査と一致する"""
+    for seed in range(200):
+        for game_state, action in _random_walk(seed):
+            settled = game_state.table.mask.settled
+            record = action_service.apply_action(game_state, action)
+            assert round_manager.is_betting_round_over(game_state) == round_manager._scan_betting_round_over(game_state), seed
+            action_service.undo_action(game_state, record)
+            assert game_state.table.mask.settled == settled
+            action_service.apply_action(game_state, action)
+            if round_manager.is_betting_round_over(game_state):
+                break
+
+def test_validate_action_agrees_with_valid_actions():
+    for seed in range(100):
+        for game_state, action in _random_walk(seed):
+            assert action_service.validate_action(game_state, action).player.player_id == action.player_id
+            seat = game_state.table.seats[game_state.current_seat_index]
+            valid = {a["type"]: a for a in action_service.get_valid_actions(game_state, seat.index)}
+            for action_type in (ActionType.CHECK, ActionType.FOLD, ActionType.CALL):
+                candidate = Action(seat.player.player_id, action_type)
+                if action_type in valid:
+                    action_service.validate_action(game_state, candidate)
+                else:
+                    with pytest.raises(action_service.InvalidActionError):
+                        action_service.validate_action(game_state, candidate)
+            for action_type in (ActionType.BET, ActionType.RAISE):
+                if action_type in valid:
+                    too_big = Action(seat.player.player_id, action_type, valid[action_type]["max"] + 1)
+                    with pytest.raises(action_service.InvalidActionError):
+                        action_service.validate_action(game_state, too_big)
+            action_service.process_action(game_state, action, validate=True)
+
+def test_invalid_action_leaves_state_untouched(game_state):
+    hand_manager.start_new_hand(game_state)
+    seat = game_state.table.seats[game_state.current_seat_index]
+    other = next(s for s in game_state.table.seats if s.is_occupied and s is not seat)
+    before = game_state.snapshot()
+    for action in (
+        Action(seat.player.player_id, ActionType.CHECK),
+        Action(seat.player.player_id, ActionType.RAISE, 10 ** 9),
+        Action(seat.player.player_id, ActionType.RAISE, None),
+        Action(seat.player.player_id, ActionType.POST_BB, 100),
+        Action(other.player.player_id, ActionType.CALL),
+        Action("nobody", ActionType.FOLD),
+    ):
+        with pytest.raises(action_service.InvalidActionError):
+            action_service.process_action(game_state, action, validate=True)
+    assert game_state.snapshot() == before
+
+def test_legal_actions_cache_is_invalidated_by_state_changes():
+    for seed in range(100):
+        for game_state, action in _random_walk(seed):
+            index = game_state.current_seat_index
+            legal = action_service.get_legal_actions(game_state, index)
+            assert action_service.get_legal_actions(game_state, index) is legal
+            assert legal == action_service._compute_legal_actions(game_state, game_state.table.seats[index])
+            assert legal.to_list() == action_service.get_valid_actions(game_state, index)
+
+            snapshot = game_state.snapshot()
+            record = action_service.apply_action(game_state, action)
+            assert action_service.get_legal_actions(game_state, index) == \
+                action_service._compute_legal_actions(game_state, game_state.table.seats[index])
+            action_service.undo_action(game_state, record)
+            assert action_service.get_legal_actions(game_state, index) == legal
+            action_service.process_action(game_state, action)
+            game_state.restore(snapshot)
+            assert action_service.get_legal_actions(game_state, index) == legal
+            action_service.process_action(game_state, action)
@@ -0,0 +1,49 @@
+# tests/services/test_ai_strategy.py
+import pytest
+
+from app.models.deck import Card
+from app.models.enum import Position
+from app.services.ai.ai_strategy import (
+    HAND_CLASSES, OPENING_RANGES, OPENING_TABLES, compile_range, get_hand_representation,
+    in_opening_range, load_opening_ranges, parse_range,
+)
+
+def _labels(notation):
+    return {HAND_CLASSES[i] for i in parse_range(notation)}
+
+def test_parse_range_notation():
+    assert _labels("TT+") == {"TT", "JJ", "QQ", "KK", "AA"}
+    assert _labels("KTo+") == {"KTo", "KJo", "KQo"}
+    assert _labels("A2s-A4s, 22-33") == {"A2s", "A3s", "A4s", "22", "33"}
+    assert _labels("QJ") == {"QJs", "QJo"}
+    # 表記で書いたレンジが既存のレンジ表と一致する
+    assert _labels("88+, ATs+, KJs+, AQo+") == OPENING_RANGES[Position.LJ]
+
+@pytest.mark.parametrize("notation", ["AAs", "A1s", "A2s-K2s", "22-A2s", "A2s-A5o"])
+def test_parse_range_rejects_invalid_tokens(notation):
+    with pytest.raises(ValueError):
+        parse_range(notation)
+
+def test_compiled_tables_match_label_sets():
+    # 全1326コンボで、コンパイル済みの表と文字列ラベルでの判定が一致する
+    for position, hands in OPENING_RANGES.items():
+        table = OPENING_TABLES[position]
+        for c1 in range(52):
+            for c2 in range(52):
+                if c1 == c2:
+                    continue
+                cards = [Card.from_id(c1), Card.from_id(c2)]
+                assert table[c1 * 52 + c2] == (get_hand_representation(cards) in hands)
+    assert not in_opening_range(Position.BB, [Card('A', 's'), Card('A', 'h')])
+
+def test_load_opening_ranges(tmp_path):
+    path = tmp_path / "ranges.txt"
+    path.write_text("# 6-max\nBTN: 22+, A2s+  # wide\nLJ: QQ+\n", encoding="utf-8")
+    tables = load_opening_ranges(path)
+    assert tables[Position.LJ] == compile_range("QQ+")
+    assert in_opening_range(Position.BTN, [Card('2', 's'), Card('A', 's')], tables)
+    assert not in_opening_range(Position.LJ, [Card('J', 's'), Card('J', 'h')], tables)
+
+    path.write_text("UTG: AA\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_opening_ranges(path)
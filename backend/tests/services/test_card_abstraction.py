@@ -0,0 +1,66 @@
+# tests/services/test_card_abstraction.py
+import numpy as np
+import pytest
+
+from app.models.deck import Card
+from app.services.ai import card_abstraction
+from app.services.ai.card_abstraction import (
+    build_street, canonical_key, load_abstraction, river_strength, save_abstraction,
+)
+from app.services.evaluation_service import evaluate_hand
+
+def _ids(text):
+    return [Card(text[i], text[i + 1]).id for i in range(0, len(text), 2)]
+
+def _cards(text):
+    return [Card(text[i], text[i + 1]) for i in range(0, len(text), 2)]
+
+def test_river_strength_matches_brute_force():
+    board = _cards("Ks9h5d2c2s")
+    strength = river_strength([c.id for c in board])
+    hero = _cards("Kd9c")
+    hero_rank = evaluate_hand(hero, board)
+    used = {c.id for c in board + hero}
+    share = total = 0
+    for i in range(52):
+        for j in range(i + 1, 52):
+            if i in used or j in used:
+                continue
+            rank = evaluate_hand([Card.from_id(i), Card.from_id(j)], board)
+            share += 1.0 if hero_rank < rank else 0.5 if hero_rank == rank else 0.0
+            total += 1
+    hole_index = card_abstraction._ALL_HOLES.tolist().index(sorted(c.id for c in hero))
+    assert strength[hole_index] == pytest.approx(share / total)
+    assert np.isnan(strength[card_abstraction._ALL_HOLES.tolist().index(sorted(_ids("Ks2c")))])
+
+def test_canonical_key_identifies_suit_isomorphic_hands():
+    # スートを入れ替えただけのハンドは同じキー、スートの関係が違えば別のキー
+    assert canonical_key(_ids("AsKs"), _ids("Qs7h2d")) == canonical_key(_ids("AhKh"), _ids("Qh7c2s"))
+    assert canonical_key(_ids("AsKs"), _ids("Qs7h2d")) == canonical_key(_ids("KdAd"), _ids("2h7sQd"))
+    assert canonical_key(_ids("AsKs"), _ids("Qs7h2d")) != canonical_key(_ids("AsKs"), _ids("Qh7s2d"))
+    assert canonical_key(_ids("AsKh"), _ids("Qs7h2d")) != canonical_key(_ids("AhKs"), _ids("Qs7h2d"))
+
+def test_build_save_and_lookup(tmp_path):
+    boards = [_ids("Ks9h5d2c2s"), _ids("AhKhQhJh3c")]
+    keys, buckets = build_street("river", num_buckets=10, boards=boards, workers=1)
+    assert np.all(np.diff(keys.astype(np.int64)) > 0)
+    path = tmp_path / "river.bin"
+    save_abstraction(path, keys, buckets, 5, 10)
+
+    table = load_abstraction(path)
+    assert isinstance(table.keys, np.memmap) and not table.keys.flags.writeable
+    # ロイヤルフラッシュは最上位、同じ形のハンドはスートが違っても同じバケット
+    assert table.bucket(_cards("ThAs"), _cards("AhKhQhJh3c")) == 9
+    assert table.bucket(_cards("Kd9c"), _cards("Ks9h5d2c2s")) == table.bucket(_cards("Kh9d"), _cards("Kc9s5h2d2c"))
+    assert table.bucket(_cards("7c3d"), _cards("Ks9h5d2c2s")) < table.bucket(_cards("KdKc"), _cards("Ks9h5d2c2s"))
+    with pytest.raises(KeyError):
+        table.bucket(_cards("7c3d"), _cards("Ks9h5d4c2s"))
+    with pytest.raises(ValueError):
+        table.bucket(_cards("7c3d"), _cards("Ks9h5d"))
+
+def test_turn_strength_averages_rivers():
+    board = _ids("AhKhQhJh")
+    ehs, ehs2 = card_abstraction.board_strengths(board)
+    royal = card_abstraction._ALL_HOLES.tolist().index(sorted(_ids("Th2c")))
+    assert ehs[royal] == pytest.approx(1.0)
+    assert np.nanmin(ehs2 - ehs ** 2) >= -1e-12  # E[HS²] >= E[HS]²
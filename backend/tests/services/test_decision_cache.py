@@ -0,0 +1,119 @@
+# tests/services/test_decision_cache.py
+import threading
+
+import numpy as np
+import pytest
+
+from app.models.action import Action
+from app.models.deck import Card
+from app.models.enum import ActionType, Round
+from app.services import hand_manager
+from app.services.ai import ai_agent_service
+from app.services.ai.ai_strategy import HAND_CLASS_INDEX
+from app.services.ai.decision_cache import ActionTemplate, DecisionCache, info_state_key
+from app.services.ai.push_fold_solver import PushFoldTable
+from app.services.game_orchestrator import GameOrchestrator
+from app.simulation.headless import build_game
+
+def test_lru_eviction_and_counters():
+    cache = DecisionCache(maxsize=2)
+    cache.put("a", ActionTemplate(ActionType.CHECK))
+    cache.put("b", ActionTemplate(ActionType.FOLD))
+    assert cache.get("a") == ActionTemplate(ActionType.CHECK)  # "a" が最近使われた側になる
+    cache.put("c", ActionTemplate(ActionType.CALL))
+    assert cache.get("b") is None
+    assert len(cache) == 2 and cache.evictions == 1
+
+    with pytest.raises(ValueError):
+        DecisionCache(maxsize=0)
+
+def test_cached_decisions_match_uncached():
+    """キャッシュ経由の判断が、毎回判断した場合と同じアクションになる"""
+    cache = DecisionCache()
+
+    class CheckingOrchestrator(GameOrchestrator):
+        def _get_action_for_player(self, game_state):
+            action = ai_agent_service.decide_action(game_state, cache=cache)
+            assert action == ai_agent_service.decide_action(game_state)
+            return action
+
+    game_state = build_game(6, seed=3)
+    orchestrator = CheckingOrchestrator(game_state, headless=True)
+    for _ in range(300):
+        for seat in game_state.table.seats:
+            seat.stack = 10000
+        orchestrator.play_hand()
+    assert cache.hits > 0 and cache.misses > 0
+    assert 0 < cache.hit_rate < 1
+
+def test_stale_template_falls_back_to_decision():
+    """保存されたアクションが今の局面で選べなければ、判断し直して上書きする"""
+    game_state = build_game(3, seed=1)
+    hand_manager.start_new_hand(game_state)
+    cache = DecisionCache()
+    key = info_state_key(game_state)
+    cache.put(key, ActionTemplate(ActionType.CHECK))  # BBに直面しているのでチェックはできない
+
+    action = ai_agent_service.decide_action(game_state, cache=cache)
+    assert action == ai_agent_service.decide_action(game_state)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert cache.get(key).action_type == action.action_type
+
+def test_template_rescales_bet_to_big_blind():
+    game_state = build_game(3, seed=1, big_blind=200)
+    hand_manager.start_new_hand(game_state)
+    seat = game_state.table.seats[game_state.current_seat_index]
+    template = ActionTemplate.from_action(Action("x", ActionType.RAISE, 250), big_blind=100)
+    assert template.to_action(game_state) == Action(seat.player.player_id, ActionType.RAISE, 500)
+
+def test_cache_is_safe_to_share_between_threads():
+    cache = DecisionCache(maxsize=8)
+    template = ActionTemplate(ActionType.CHECK)
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(5000):
+                cache.put((offset, i % 16), template)
+                cache.get((1 - offset, i % 16))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(t % 2,)) for t in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors and len(cache) == 8
+
+def test_push_fold_decision_is_not_replayed_deeper():
+    """表の範囲内 (25.2BB) のオールインを、範囲外 (39BB) の局面で使い回さない"""
+    probabilities = np.zeros((25, 2, 169), dtype=np.uint8)
+    probabilities[:, :, HAND_CLASS_INDEX["AA"]] = 255
+    push_fold = PushFoldTable(probabilities)
+    cache = DecisionCache()
+
+    actions = []
+    for stack in (2520, 3900):
+        game_state = build_game(2, stack=stack, big_blind=100, seed=4)
+        hand_manager.start_new_hand(game_state)
+        game_state.table.seats[game_state.current_seat_index].hole_cards = [Card('A', 's'), Card('A', 'h')]
+        actions.append(ai_agent_service.decide_action(game_state, cache=cache, push_fold=push_fold))
+        assert actions[-1] == ai_agent_service.decide_action(game_state, push_fold=push_fold)
+    assert actions[0].amount == 2520 and actions[1].amount < 3900
+
+def test_postflop_decisions_are_not_stored():
+    """フロップ以降の局面はほとんど再利用されないので、覚えずに毎回判断する"""
+    game_state = build_game(3, seed=1)
+    hand_manager.start_new_hand(game_state)
+    game_state.current_round = Round.FLOP
+    hand_manager.proceed_to_next_round(game_state)
+    assert info_state_key(game_state) is None
+
+    cache, calls = DecisionCache(), []
+    def decide(gs):
+        calls.append(gs)
+        return ai_agent_service.decide_action(gs)
+    for _ in range(2):
+        cache.decide(game_state, decide)
+    assert len(calls) == 2 and len(cache) == 0 and (cache.hits, cache.misses) == (0, 0)
@@ -0,0 +1,37 @@
+# tests/services/test_equity_service.py
+import pytest
+from app.models.deck import Card
+from app.services import equity_service
+
+AA = [Card('A', 's'), Card('A', 'h')]
+KK = [Card('K', 's'), Card('K', 'h')]
+
+def test_aces_vs_kings_preflop():
+    result = equity_service.estimate_equity([AA, KK], samples=20000, seed=1)
+    assert result.samples == 20000
+    assert 0.79 < result.equity[0] < 0.85
+    assert result.equity[0] + result.equity[1] == pytest.approx(1.0)
+
+def test_complete_board_is_exact():
+    board = [Card('A', 'd'), Card('7', 'c'), Card('2', 'h'), Card('9', 's'), Card('4', 'd')]
+    result = equity_service.estimate_equity([AA, KK], board=board, samples=100)
+    assert result.win == [1.0, 0.0]
+    assert result.samples == 1
+
+def test_seeded_runs_reproduce_across_workers():
+    kwargs = dict(board=[Card('Q', 'd'), Card('J', 'd'), Card('2', 'c')], samples=3000, seed=123, batch_size=500)
+    single = equity_service.estimate_equity([AA, KK], workers=1, **kwargs)
+    again = equity_service.estimate_equity([AA, KK], workers=1, **kwargs)
+    pooled = equity_service.estimate_equity([AA, KK], workers=2, **kwargs)
+    equity_service.shutdown_executor()
+    assert single == again == pooled
+
+def test_time_budget_runs_at_least_one_batch():
+    result = equity_service.estimate_equity([AA, KK], time_budget=0.0, batch_size=100)
+    assert result.samples == 100
+
+def test_rejects_duplicate_cards():
+    with pytest.raises(ValueError):
+        equity_service.estimate_equity([AA, [Card('A', 's'), Card('K', 'd')]], samples=10)
+    with pytest.raises(ValueError):
+        equity_service.estimate_equity([AA, KK], dead_cards=[Card('K', 'h')], samples=10)
@@ -1,7 +1,10 @@
 # tests/services/test_evaluation_service.py
-from app.services import evaluation_service
-from app.models.deck import Card
-from app.models.enum import SeatStatus
+import random
+import pytest
+from app.services import evaluation_service, action_service
+from app.models.action import Action
+from app.models.deck import Card, FULL_DECK
+from app.models.enum import SeatStatus, ActionType
 
 def test_find_winners_simple_case(game_state):
     # セットアップ
@@ -43,3 +46,60 @@ def test_find_winners_split_pot(game_state):
     assert s1 in winner_seats
     assert winners[0][1] == 300
     assert winners[1][1] == 300
+
+def test_evaluate_hands_batch_matches_evaluate_hand():
+    rng = random.Random(7)
+    hands = [rng.sample(FULL_DECK, 7) for _ in range(3000)]
+    hole_ids = [[c.id for c in h[:2]] for h in hands]
+    board_ids = [[c.id for c in h[2:]] for h in hands]
+
+    ranks = evaluation_service.evaluate_hands_batch(hole_ids, board_ids)
+
+    assert ranks.shape == (3000,)
+    for rank, hand in zip(ranks, hands):
+        assert rank == evaluation_service.evaluate_hand(hand[:2], hand[2:])
+
+def test_evaluate_hands_batch_rejects_bad_shapes():
+    with pytest.raises(ValueError):
+        evaluation_service.evaluate_hands_batch([[0, 1, 2]], [[3, 4, 5, 6, 7]])
+    with pytest.raises(ValueError):
+        evaluation_service.evaluate_hands_batch([[0, 1]], [[3, 4]])
+    # 重複したカード（どの行にあっても）
+    for hole, board in (([[0, 0]], [[4, 8, 12]]), ([[48, 48]], [[48, 49, 50, 51, 0]]),
+                        ([[0, 1], [2, 3]], [[4, 5, 6], [7, 8, 3]])):
+        with pytest.raises(ValueError):
+            evaluation_service.evaluate_hands_batch(hole, board)
+
+def test_find_winners_side_pot_from_ledger(game_state):
+    s0, s1, s2 = game_state.table.seats[0:3]
+    s1.stack = 300
+    game_state.dealer_seat_index = 0
+    for seat, action_type, amount in [(s0, ActionType.BET, 1000), (s1, ActionType.CALL, None), (s2, ActionType.CALL, None)]:
+        action_service.process_action(game_state, Action(seat.player.player_id, action_type, amount))
+    game_state.table.collect_bets()
+
+    game_state.table.community_cards = [Card('A', 's'), Card('K', 'd'), Card('5', 'c'), Card('8', 'h'), Card('2', 'c')]
+    s0.hole_cards = [Card('Q', 'c'), Card('J', 'c')]  # High card
+    s1.hole_cards = [Card('A', 'h'), Card('A', 'd')]  # Trips
+    s2.hole_cards = [Card('K', 's'), Card('K', 'h')]  # Trips (lower)
+
+    winners = dict((seat.index, amount) for seat, amount in evaluation_service.find_winners(game_state))
+
+    assert winners == {1: 900, 2: 1400}
+
+def test_find_winners_odd_chip_goes_left_of_dealer(game_state):
+    s0, s1, s2 = game_state.table.seats[0:3]
+    game_state.dealer_seat_index = 1
+    game_state.table.community_cards = [Card('A', 's'), Card('K', 'd'), Card('5', 'c'), Card('8', 'h'), Card('T', 'c')]
+    s0.hole_cards = [Card('A', 'c'), Card('J', 'c')]
+    s1.hole_cards = [Card('A', 'h'), Card('J', 'h')]
+    s2.hole_cards = [Card('2', 's'), Card('3', 's')]
+    s0.bet_total = s1.bet_total = 101
+    s2.bet_total = 99
+    s2.status = SeatStatus.FOLDED
+    game_state.table.pot = 301
+
+    winners = dict((seat.index, amount) for seat, amount in evaluation_service.find_winners(game_state))
+
+    # ディーラー(1)の左隣から: 座席2(フォールド) -> 座席0 -> 座席1
+    assert winners == {0: 151, 1: 150}
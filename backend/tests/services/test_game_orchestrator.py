@@ -1,6 +1,8 @@
 # tests/services/test_game_orchestrator.py
 from unittest.mock import patch
 from app.services.game_orchestrator import GameOrchestrator
+from app.models.events import EventSink
+from app.models.enum import GameEvent
 
 def test_run_game_calls_play_hand(game_state):
     """run_gameがplay_handを正しい回数呼び出すかテスト"""
@@ -25,3 +27,25 @@ def test_get_action_for_player_ai(mock_decide_action, game_state):
     # プライベートメソッドをテスト
     orchestrator._get_action_for_player(game_state)
     mock_decide_action.assert_called_once_with(game_state)
+
+def test_headless_play_hand_prints_nothing(game_state, capsys):
+    """ヘッドレスモードではコンソールに何も出力しない"""
+    orchestrator = GameOrchestrator(game_state, headless=True)
+    orchestrator.run_game(num_hands=3)
+    assert capsys.readouterr().out == ""
+    assert sum(s.stack for s in game_state.table.seats) == 30000
+
+def test_event_sink_receives_hand_events(game_state):
+    """イベントの受け取り先にハンドの開始・アクション・終了が通知される"""
+    class RecordingSink(EventSink):
+        def __init__(self):
+            self.events = []
+        def emit(self, event, **data):
+            self.events.append(event)
+
+    sink = RecordingSink()
+    winners = GameOrchestrator(game_state, event_sink=sink).play_hand()
+    assert sink.events[0] == GameEvent.HAND_STARTED
+    assert GameEvent.ACTION in sink.events
+    assert sink.events[-1] == GameEvent.HAND_COMPLETE
+    assert sum(amount for _, amount in winners) > 0
@@ -0,0 +1,30 @@
+# tests/services/test_hand_evaluator.py
+import random
+from treys import Evaluator
+from app.models.deck import Card, FULL_DECK
+from app.services.hand_evaluator import get_hand_evaluator, load_or_build_tables
+
+def test_matches_treys_for_5_to_7_cards():
+    engine = get_hand_evaluator()
+    treys = Evaluator()
+    rng = random.Random(42)
+    for n in (5, 6, 7):
+        for _ in range(2000):
+            cards = rng.sample(FULL_DECK, n)
+            expected = treys.evaluate([c.treys_int for c in cards[:2]], [c.treys_int for c in cards[2:]])
+            assert engine.evaluate(cards) == expected
+
+def test_rank_class_names():
+    engine = get_hand_evaluator()
+    royal = [Card('A', 's'), Card('K', 's'), Card('Q', 's'), Card('J', 's'), Card('T', 's'), Card('2', 'h'), Card('3', 'd')]
+    assert engine.evaluate(royal) == 1
+    assert engine.describe(engine.evaluate(royal)) == "Royal Flush"
+    assert engine.describe(7462) == "High Card"
+
+def test_tables_round_trip_through_cache(tmp_path):
+    path = tmp_path / "evaluator.bin"
+    built = load_or_build_tables(path)
+    assert path.exists()
+    loaded = load_or_build_tables(path)
+    assert list(loaded[0]) == list(built[0])
+    assert loaded[1] == built[1]
@@ -0,0 +1,49 @@
+# tests/services/test_hand_history.py
+import pytest
+from app.services.hand_history import (
+    HandHistoryReader, HandHistoryRecorder, HandHistoryWriter, RECORD_DTYPE,
+)
+from app.services.game_orchestrator import GameOrchestrator
+from app.models.enum import ActionType
+
+def _play(game_state, path, hands):
+    with HandHistoryWriter(path, buffer_size=4) as writer:
+        GameOrchestrator(game_state, event_sink=HandHistoryRecorder(writer), headless=True).run_game(hands)
+
+def test_recorded_hand_matches_game(game_state, tmp_path):
+    path = tmp_path / "hands.bin"
+    _play(game_state, path, 1)
+
+    reader = HandHistoryReader(path)
+    assert len(reader) == 1
+    hand = reader[0]
+    assert hand.hand_seed == game_state.table.hand_seed
+    assert hand.dealer == game_state.dealer_seat_index
+    assert hand.seated == [0, 1, 2]
+    assert hand.starting_stacks[:3] == [10000, 10000, 10000]
+    assert [c.id for c in hand.board] == [c.id for c in game_state.table.community_cards]
+    for seat in game_state.table.seats[:3]:
+        assert hand.hole_cards(seat.index) == seat.hole_cards
+        assert seat.stack == 10000 - seat.bet_total + hand.payouts[seat.index]
+    actions = hand.actions
+    assert [a[1] for a in actions[:2]] == [ActionType.POST_SB, ActionType.POST_BB]
+    assert len(actions) == len(game_state.history)
+
+def test_writer_appends_and_reader_skips_partial_record(game_state, tmp_path):
+    path = tmp_path / "hands.bin"
+    _play(game_state, path, 3)
+    _play(game_state, path, 2)
+    assert len(HandHistoryReader(path)) == 5
+
+    with open(path, "ab") as f:
+        f.write(b"\0" * (RECORD_DTYPE.itemsize // 2))
+    assert len(HandHistoryReader(path)) == 5
+    # 次に書き込むときは書きかけのレコードを捨ててから追記する
+    _play(game_state, path, 1)
+    assert len(HandHistoryReader(path)) == 6
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a hand history file")
+    with pytest.raises(ValueError):
+        HandHistoryReader(path)
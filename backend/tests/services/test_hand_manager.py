@@ -1,6 +1,8 @@
 # tests/services/test_hand_manager.py
-from app.services import hand_manager, position_service
-from app.models.enum import GameStatus, Position
+import pytest
+from app.services import hand_manager, position_service, round_manager
+from app.models.enum import GameStatus, Position, SeatStatus
+from app.simulation.headless import build_game, run_headless
 
 def test_start_new_hand(game_state):
     # 初期ディーラー位置を設定
@@ -40,3 +42,32 @@ def test_conclude_hand(game_state):
     assert game_state.status == GameStatus.HAND_COMPLETE
     assert game_state.table.seats[1].stack == initial_stack + 1000
 
+
+def test_conclude_hand_runs_out_board_when_all_in(game_state):
+    hand_manager.start_new_hand(game_state)
+    for seat in position_service.get_occupied_seats(game_state):
+        seat.bet(seat.stack)
+        seat.status = SeatStatus.ALL_IN
+
+    winners = hand_manager._conclude_hand(game_state)
+
+    assert len(game_state.table.community_cards) == 5
+    assert sum(amount for _, amount in winners) == 30000
+    assert sum(s.stack for s in game_state.table.seats) == 30000
+
+def test_debug_checks_cross_check_counters(monkeypatch):
+    """デバッグモードでは終了判定のビットマスクを座席の走査と突き合わせる"""
+    monkeypatch.setattr(round_manager, "DEBUG_CHECKS", True)
+    run_headless(build_game(4, stack=2000, seed=3), 200, rebuy_stack=2000)
+
+    game_state = build_game(3, seed=3)
+    hand_manager.start_new_hand(game_state)
+    round_manager.start_betting_round(game_state)
+    # 座席を直接書き換えるとビットマスクとずれるので検出される
+    for seat in game_state.table.seats[:3]:
+        seat.acted = True
+        seat.current_bet = game_state.amount_to_call
+    with pytest.raises(AssertionError):
+        round_manager.is_betting_round_over(game_state)
+    game_state.recount_settled()
+    assert round_manager.is_betting_round_over(game_state)
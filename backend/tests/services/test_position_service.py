@@ -34,3 +34,17 @@ def test_get_first_to_act_index(game_state):
     game_state.current_round = Round.FLOP
     assert position_service.get_first_to_act_index(game_state) == 1
 
+
+def test_position_layout_rotates_with_dealer(game_state):
+    """ディーラーの位置ごとのポジションの並びは表から引く"""
+    assert position_service.position_layout(2, 1) == (Position.BB, Position.BTN)
+    assert position_service.position_layout(3, 2) == (Position.SB, Position.BB, Position.BTN)
+
+    game_state.dealer_seat_index = 2
+    position_service.assign_positions(game_state)
+    assert [s.position for s in game_state.table.seats[:3]] == [Position.SB, Position.BB, Position.BTN]
+    assert position_service.get_seat_by_position(game_state, Position.BB).index == 1
+    # 直接書き換えたポジションも見つけられる
+    game_state.table.seats[0].position = Position.BB
+    game_state.table.seats[1].position = Position.SB
+    assert position_service.get_seat_by_position(game_state, Position.BB).index == 0
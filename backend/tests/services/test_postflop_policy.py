@@ -0,0 +1,75 @@
+# tests/services/test_postflop_policy.py
+import time
+
+import numpy as np
+
+from app.models.deck import Card
+from app.models.enum import ActionType, Round
+from app.services import hand_manager
+from app.services.ai import ai_agent_service
+from app.services.ai.ai_strategy import compile_range
+from app.services.ai.postflop_policy import PostflopPolicy, estimate_equity, warm_up
+from app.simulation.headless import build_game
+
+def _cards(text):
+    return [Card(text[i], text[i + 1]) for i in range(0, len(text), 2)]
+
+def _river_spot(hole, board, amount_to_call=0):
+    """ヘッズアップのリバーで、手番のプレイヤーに hole を持たせた局面"""
+    game_state = build_game(2, seed=5)
+    hand_manager.start_new_hand(game_state)
+    game_state.table.collect_bets()
+    for seat in game_state.table.seats:
+        seat.current_bet = 0
+    game_state.current_round = Round.RIVER
+    game_state.table.community_cards = _cards(board)
+    seat = game_state.table.seats[game_state.current_seat_index]
+    seat.hole_cards = _cards(hole)
+    other = next(s for s in game_state.table.seats if s.is_occupied and s is not seat)
+    other.hole_cards = _cards("2c3d")
+    other.current_bet = amount_to_call
+    other.stack -= amount_to_call
+    game_state.amount_to_call = amount_to_call
+    game_state.min_raise_amount = amount_to_call * 2 or game_state.big_blind
+    return game_state
+
+def test_estimate_converges_to_known_equity():
+    # AKs (ナッツフラッシュドロー + オーバーカード) のランダムハンドに対するエクイティは約 0.72
+    estimate = estimate_equity(_cards("AsKs"), _cards("Qs7h2s"), 1, time.perf_counter() + 10,
+                               max_samples=40000, rng=np.random.default_rng(0))
+    assert estimate.samples == 40000
+    assert abs(estimate.equity - 0.725) < 0.015
+
+def test_estimate_stops_at_deadline():
+    budget = 0.01
+    warm_up()  # 評価エンジンの表の準備は締め切りの外で行う
+    start = time.perf_counter()
+    estimate = estimate_equity(_cards("AsKs"), _cards("Qs7h2s"), 3, start + budget, max_samples=10 ** 9)
+    elapsed = time.perf_counter() - start
+    assert estimate.samples > 0
+    assert elapsed < budget + 0.05
+
+def test_villain_range_changes_equity():
+    # トップペアはランダムなハンドより QQ+ に対してずっと弱い
+    deadline = time.perf_counter() + 10
+    vs_random = estimate_equity(_cards("AhTd"), _cards("Ts7c2h"), 1, deadline, max_samples=5000,
+                                rng=np.random.default_rng(1))
+    vs_premium = estimate_equity(_cards("AhTd"), _cards("Ts7c2h"), 1, deadline, max_samples=5000,
+                                 villain_range=compile_range("QQ+"), rng=np.random.default_rng(1))
+    assert vs_premium.equity < 0.3 < 0.8 < vs_random.equity
+
+def test_policy_bets_strong_hands_and_folds_weak_ones():
+    policy = PostflopPolicy(time_budget=1.0, seed=0)
+    # ロイヤルフラッシュならポットサイズでベット
+    game_state = _river_spot("AsKs", "QsJsTs2d3h")
+    action = ai_agent_service.decide_action(game_state, postflop=policy)
+    assert action.action_type == ActionType.BET
+    assert action.amount == game_state.table.pot
+
+    # 7ハイでポットより大きいベットに直面したらフォールド
+    game_state = _river_spot("7d4c", "AsKhQd9c2s", amount_to_call=1000)
+    assert ai_agent_service.decide_action(game_state, postflop=policy).action_type == ActionType.FOLD
+
+    # 弱い手でもチェックできるならチェック
+    game_state = _river_spot("7d4c", "AsKhQd9c2s")
+    assert ai_agent_service.decide_action(game_state, postflop=policy).action_type == ActionType.CHECK
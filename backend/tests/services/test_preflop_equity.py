@@ -0,0 +1,41 @@
+# tests/services/test_preflop_equity.py
+import numpy as np
+import pytest
+from app.models.deck import Card
+from app.services import preflop_equity
+from app.services.ai.ai_strategy import HAND_CLASSES, HAND_CLASS_INDEX, hand_class_index
+
+def test_hand_class_index_matches_labels():
+    assert len(set(HAND_CLASSES)) == 169
+    assert HAND_CLASSES[hand_class_index([Card('K', 'd'), Card('A', 'd')])] == "AKs"
+    assert HAND_CLASSES[hand_class_index([Card('K', 'd'), Card('A', 'c')])] == "AKo"
+    assert HAND_CLASSES[hand_class_index([Card('7', 'h'), Card('7', 'c')])] == "77"
+
+def test_tables_round_trip_through_memmap(tmp_path):
+    rng = np.random.default_rng(0)
+    heads_up = rng.random((169, 169))
+    vs_random = rng.random((169, 8))
+    path = tmp_path / "preflop.bin"
+    preflop_equity.save_tables(path, heads_up, vs_random)
+
+    tables = preflop_equity.load_tables(path)
+
+    assert isinstance(tables.heads_up, np.memmap)
+    aa, kk = HAND_CLASS_INDEX["AA"], HAND_CLASS_INDEX["KK"]
+    assert tables.heads_up_equity("AA", "KK") == pytest.approx(heads_up[aa, kk])
+    assert tables.heads_up_equity([Card('A', 's'), Card('A', 'h')], kk) == pytest.approx(heads_up[aa, kk])
+    assert tables.equity_vs_random("KK", 3) == pytest.approx(vs_random[kk, 2])
+    with pytest.raises(ValueError):
+        tables.equity_vs_random("KK", 9)
+
+def test_exact_matchup_equity_aces_vs_kings():
+    aces = (Card('A', 's').id, Card('A', 'h').id)
+    kings = (Card('K', 'd').id, Card('K', 'c').id)
+    assert preflop_equity.exact_matchup_equity(aces, kings) == pytest.approx(0.8126, abs=5e-4)
+
+def test_monte_carlo_entries():
+    aa, kk = HAND_CLASS_INDEX["AA"], HAND_CLASS_INDEX["KK"]
+    _, _, equity = preflop_equity._heads_up_entry((aa, kk, 20000, 0))
+    assert equity == pytest.approx(0.82, abs=0.02)
+    _, _, equity = preflop_equity._vs_random_entry((aa, 1, 20000, 0))
+    assert equity == pytest.approx(0.85, abs=0.02)
@@ -0,0 +1,96 @@
+# tests/services/test_preflop_tree_solver.py
+import numpy as np
+import pytest
+
+from app.models.deck import Card
+from app.models.enum import ActionType, Position
+from app.services import action_service, hand_manager
+from app.services.ai import ai_agent_service
+from app.services.ai.ai_strategy import HAND_CLASS_INDEX
+from app.services.ai.preflop_tree_solver import (
+    BB_VS_JAM, BB_VS_OPEN, BTN_OPEN, BTN_VS_3BET, NUM_ROWS, PreflopTreeTable, _ROW_OFFSETS,
+    load_table, save_table, solve_preflop_tree,
+)
+from app.services.ai.push_fold_solver import matchup_weights
+from app.simulation.headless import build_game
+from tests.services.test_push_fold_solver import _synthetic_equity
+
+def test_cfr_converges_to_low_exploitability():
+    equity = _synthetic_equity()
+    coarse = solve_preflop_tree(equity, 40, iterations=20)
+    fine = solve_preflop_tree(equity, 40, iterations=500)
+    assert fine.exploitability < coarse.exploitability
+    assert fine.exploitability < 1e-3
+    for strategy in fine.strategies:
+        assert np.allclose(strategy.sum(axis=1), 1)
+    aa, trash = HAND_CLASS_INDEX["AA"], HAND_CLASS_INDEX["32o"]
+    assert fine.strategies[BTN_OPEN][aa, 0] < 0.01 and fine.strategies[BTN_OPEN][trash, 0] > 0.99
+    assert fine.strategies[BB_VS_OPEN][aa, 0] < 0.01 and fine.strategies[BB_VS_JAM][aa, 1] > 0.99
+    # 深いほどオールインのリスクが大きいので、BB の3ベット（オールイン）は減る
+    deep = solve_preflop_tree(equity, 100, iterations=500)
+    assert deep.strategies[BB_VS_OPEN][:, 2].sum() < fine.strategies[BB_VS_OPEN][:, 2].sum()
+
+    with pytest.raises(ValueError):
+        solve_preflop_tree(equity, 2)
+
+def test_table_round_trip(tmp_path):
+    table = np.zeros((5, NUM_ROWS, 169))
+    table[:, _ROW_OFFSETS[BTN_OPEN] + 1, HAND_CLASS_INDEX["AA"]] = 1.0
+    table[2, _ROW_OFFSETS[BB_VS_JAM] + 1, HAND_CLASS_INDEX["KK"]] = 0.6
+    path = tmp_path / "preflop_tree.bin"
+    save_table(path, table, min_bb=30, open_size=3.0)
+    loaded = load_table(path)
+    assert (loaded.min_bb, loaded.max_bb, loaded.open_size, loaded.small_blind_ratio) == (30, 34, 3.0, 0.0)
+    assert loaded.covers(29.5) and loaded.covers(34.4) and not loaded.covers(29.4) and not loaded.covers(34.5)
+    assert loaded.action(BTN_OPEN, 31, HAND_CLASS_INDEX["AA"]) == "open"
+    assert loaded.action(BB_VS_JAM, 32, HAND_CLASS_INDEX["KK"]) == "call"
+    assert loaded.action(BB_VS_JAM, 33, HAND_CLASS_INDEX["KK"]) == "fold"
+
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        load_table(path)
+
+def test_decide_action_follows_preflop_tree():
+    probabilities = np.zeros((75, NUM_ROWS, 169), dtype=np.uint8)
+    aa, kk = HAND_CLASS_INDEX["AA"], HAND_CLASS_INDEX["KK"]
+    probabilities[:, _ROW_OFFSETS[BTN_OPEN] + 1, [aa, kk]] = 255           # AA / KK はオープン
+    probabilities[:, _ROW_OFFSETS[BB_VS_OPEN] + 2, aa] = 255                 # BB は AA で3ベット
+    probabilities[:, _ROW_OFFSETS[BTN_VS_3BET] + 1, aa] = 255                # BTN は AA でだけコール
+    tree = PreflopTreeTable(probabilities)
+
+    game_state = build_game(2, stack=5000, big_blind=100, seed=4)   # 50BB
+    hand_manager.start_new_hand(game_state)
+    btn = game_state.table.seats[game_state.current_seat_index]
+    bb = next(s for s in game_state.table.seats if s.position == Position.BB)
+    assert btn.position == Position.BTN
+    btn.hole_cards, bb.hole_cards = [Card('K', 's'), Card('K', 'h')], [Card('A', 'd'), Card('A', 'c')]
+    action = ai_agent_service.decide_action(game_state, preflop_tree=tree)
+    assert action.action_type == ActionType.RAISE and action.amount == 250
+
+    action_service.process_action(game_state, action)
+    game_state.current_seat_index = bb.index
+    action = ai_agent_service.decide_action(game_state, preflop_tree=tree)
+    assert action.action_type == ActionType.RAISE and action.amount == bb.stack + bb.current_bet
+
+    action_service.process_action(game_state, action)
+    game_state.current_seat_index = btn.index
+    assert ai_agent_service.decide_action(game_state, preflop_tree=tree).action_type == ActionType.FOLD
+    btn.hole_cards = [Card('A', 's'), Card('A', 'h')]
+    assert ai_agent_service.decide_action(game_state, preflop_tree=tree).action_type == ActionType.CALL
+
+    # 表の範囲より浅いスタックや、SB を払う前提で解いた表ではレンジ表で判断する
+    for stack, table in ((2000, tree), (5000, PreflopTreeTable(probabilities, small_blind_ratio=0.5))):
+        other = build_game(2, stack=stack, big_blind=100, seed=4)
+        hand_manager.start_new_hand(other)
+        other.table.seats[other.current_seat_index].hole_cards = [Card('7', 's'), Card('2', 'h')]
+        assert ai_agent_service.decide_action(other, preflop_tree=table) == ai_agent_service.decide_action(other)
+
+@pytest.mark.slow
+def test_real_equity_solution_is_an_equilibrium(real_heads_up):
+    weights = matchup_weights()
+    for depth in (26, 40, 100):
+        solution = solve_preflop_tree(real_heads_up, depth, weights=weights)
+        assert solution.exploitability < 1e-3
+        root = solution.strategies[BTN_OPEN]
+        assert root[HAND_CLASS_INDEX["AA"], 0] < 0.01 and root[HAND_CLASS_INDEX["72o"], 0] > 0.99
+        assert solution.strategies[BB_VS_JAM][HAND_CLASS_INDEX["AA"], 1] > 0.99
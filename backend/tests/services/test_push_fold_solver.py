@@ -0,0 +1,138 @@
+# tests/services/test_push_fold_solver.py
+import numpy as np
+import pytest
+
+from app.models.deck import Card
+from app.models.enum import ActionType, Position
+from app.services import action_service, hand_manager
+from app.services.ai import ai_agent_service
+from app.services.ai.ai_strategy import HAND_CLASS_COMBOS, HAND_CLASS_INDEX, HAND_CLASSES
+from app.services.ai.push_fold_solver import (
+    BB, SB, PushFoldTable, load_table, matchup_weights, save_table, solve_push_fold,
+)
+from app.simulation.headless import build_game
+
+_RANKS = "23456789TJQKA"
+
+def _synthetic_equity():
+    """ランクの合計で強さを決めた簡易的な対戦エクイティ（a が b に勝つ確率 + 引き分けの半分）"""
+    strength = np.array([
+        _RANKS.index(label[0]) + _RANKS.index(label[1]) + (8 if len(label) == 2 else 0) + (1 if label.endswith("s") else 0)
+        for label in HAND_CLASSES
+    ], dtype=float)
+    return 0.5 + 0.3 * np.tanh((strength[:, None] - strength[None, :]) / 6)
+
+def test_matchup_weights_account_for_card_removal():
+    weights = matchup_weights()
+    assert weights.sum() == pytest.approx(1.0)
+    assert np.allclose(weights, weights.T)
+    aa, kk, aks = HAND_CLASS_INDEX["AA"], HAND_CLASS_INDEX["KK"], HAND_CLASS_INDEX["AKs"]
+    # AA 同士は残り2枚の1通り x 6、AA と KK は 6 x 6、AA と AKs は (Aを2枚使う6通り x 残りのスート2通り)
+    assert weights[aa, aa] / weights[aa, kk] == pytest.approx(6 / 36)
+    assert weights[aa, aks] / weights[aa, kk] == pytest.approx(12 / 36)
+
+def test_cfr_converges_to_low_exploitability():
+    equity = _synthetic_equity()
+    coarse = solve_push_fold(equity, 10, iterations=20)
+    fine = solve_push_fold(equity, 10, iterations=500)
+    assert fine.exploitability < coarse.exploitability
+    assert fine.exploitability < 1e-3
+    aa, trash = HAND_CLASS_INDEX["AA"], HAND_CLASS_INDEX["32o"]
+    assert fine.push[aa] > 0.99 and fine.call[aa] > 0.99
+    assert fine.push[trash] < 0.01 and fine.call[trash] < 0.01
+    # スタックが浅いほど push レンジは広くなる
+    assert solve_push_fold(equity, 3, iterations=500).push.sum() > fine.push.sum()
+    # 取りに行くブラインドが少ないほど push レンジは狭くなる
+    assert solve_push_fold(equity, 10, small_blind=0.5, iterations=500).push.sum() > fine.push.sum()
+
+def test_table_round_trip(tmp_path):
+    table = np.zeros((5, 2, 169))
+    table[:, SB, HAND_CLASS_INDEX["AA"]] = 1.0
+    table[2, BB, HAND_CLASS_INDEX["KK"]] = 0.5
+    path = tmp_path / "push_fold.bin"
+    save_table(path, table)
+    loaded = load_table(path)
+    assert loaded.max_bb == 5 and loaded.covers(5.2) and not loaded.covers(6)
+    assert loaded.small_blind_ratio == 0.0
+    assert loaded.push_probability(4, HAND_CLASS_INDEX["AA"]) == 1.0
+    assert loaded.call_probability(3, HAND_CLASS_INDEX["KK"]) == pytest.approx(0.5, abs=1 / 255)
+    assert loaded.call_probability(0.2, HAND_CLASS_INDEX["KK"]) == 0.0
+
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        load_table(path)
+
+def test_decide_action_follows_push_fold_table():
+    probabilities = np.zeros((20, 2, 169), dtype=np.uint8)
+    probabilities[:, :, HAND_CLASS_INDEX["AA"]] = 255
+    push_fold = PushFoldTable(probabilities)
+
+    game_state = build_game(2, stack=1000, seed=4)
+    hand_manager.start_new_hand(game_state)
+    btn = game_state.table.seats[game_state.current_seat_index]
+    assert btn.position == Position.BTN
+    btn.hole_cards = [Card('A', 's'), Card('A', 'h')]
+    action = ai_agent_service.decide_action(game_state, push_fold=push_fold)
+    assert action.action_type == ActionType.RAISE and action.amount == btn.stack + btn.current_bet
+
+    # BB は相手のオールインに表のハンドでだけコールする
+    clone = game_state.clone()
+    action_service.process_action(clone, action)
+    clone.current_seat_index = next(s.index for s in clone.table.seats if s.position == Position.BB)
+    bb = clone.table.seats[clone.current_seat_index]
+    bb.hole_cards = [Card('A', 'd'), Card('A', 'c')]
+    assert ai_agent_service.decide_action(clone, push_fold=push_fold).action_type == ActionType.CALL
+    bb.hole_cards = [Card('K', 'd'), Card('K', 'c')]
+    assert ai_agent_service.decide_action(clone, push_fold=push_fold).action_type == ActionType.FOLD
+
+    # ヘッズアップでは SB を払わないので、SB 0.5 で解いた表は使わない
+    assert all(a.action_type != ActionType.POST_SB for a in game_state.history)
+    assert ai_agent_service.decide_action(game_state, push_fold=PushFoldTable(probabilities, 0.5)) == \
+        ai_agent_service.decide_action(game_state)
+
+    btn.hole_cards = [Card('7', 's'), Card('2', 'h')]
+    assert ai_agent_service.decide_action(game_state, push_fold=push_fold).action_type == ActionType.FOLD
+
+    # 表の範囲より深いスタックではレンジ表で判断する
+    deep = build_game(2, stack=10000, seed=4)
+    hand_manager.start_new_hand(deep)
+    assert ai_agent_service.decide_action(deep, push_fold=push_fold) == ai_agent_service.decide_action(deep)
+
+
+def _share(probabilities):
+    """確率 0.5 以上のハンドが全 1326 通りに占める割合"""
+    combos = np.array([len(c) for c in HAND_CLASS_COMBOS])
+    return combos[probabilities >= 0.5].sum() / combos.sum()
+
+@pytest.mark.slow
+def test_matches_nash_chart_with_half_small_blind(real_heads_up):
+    """SB 0.5 / 10BB / アンティなしの公開されているナッシュ均衡の表と比べる"""
+    solution = solve_push_fold(real_heads_up, 10, small_blind=0.5)
+    assert solution.exploitability < 1e-3
+    # 表では push が約58%、コールが約37%
+    assert _share(solution.push) == pytest.approx(0.58, abs=0.02)
+    assert _share(solution.call) == pytest.approx(0.37, abs=0.02)
+    pushes = {"22", "A2o", "K2s", "K2o", "Q2s", "J9o", "T7s", "65s"}
+    folds = {"72o", "32o", "83o", "94o", "J2o", "T2s"}
+    calls = {"33", "A2o", "K9o", "K5s", "QTs", "JTs", "A8s"}
+    call_folds = {"72o", "J7o", "T8o", "95s", "Q2o"}
+    for label in pushes | calls:
+        i = HAND_CLASS_INDEX[label]
+        assert label not in pushes or solution.push[i] > 0.5, label
+        assert label not in calls or solution.call[i] > 0.5, label
+    for label in folds | call_folds:
+        i = HAND_CLASS_INDEX[label]
+        assert label not in folds or solution.push[i] < 0.5, label
+        assert label not in call_folds or solution.call[i] < 0.5, label
+
+@pytest.mark.slow
+def test_engine_blinds_solution_is_an_equilibrium(real_heads_up):
+    """エンジンのブラインド (SB 0) の解も均衡で、取りに行くブラインドが減る分だけレンジが狭い"""
+    weights = matchup_weights()
+    for depth in (3, 10, 25):
+        half = solve_push_fold(real_heads_up, depth, small_blind=0.5, weights=weights)
+        engine = solve_push_fold(real_heads_up, depth, weights=weights)
+        assert engine.exploitability < 1e-3
+        assert _share(engine.push) < _share(half.push)
+        assert _share(engine.call) <= _share(half.call)
+        assert engine.push[HAND_CLASS_INDEX["AA"]] > 0.99 and engine.push[HAND_CLASS_INDEX["72o"]] < 0.01
@@ -0,0 +1,50 @@
+# tests/services/test_replay_service.py
+import pytest
+from app.models.action import Action
+from app.models.enum import ActionType, GameEvent, GameStatus
+from app.models.events import CompositeEventSink, EventSink
+from app.services.game_orchestrator import GameOrchestrator
+from app.services.hand_history import HandHistoryReader, HandHistoryRecorder, HandHistoryWriter
+from app.services.replay_service import HandLog, replay
+
+class _FinalStacks(EventSink):
+    def __init__(self):
+        self.stacks = []
+    def emit(self, event, **data):
+        if event == GameEvent.HAND_COMPLETE:
+            self.stacks.append([s.stack for s in data["game_state"].table.seats])
+
+@pytest.fixture
+def recorded(game_state, tmp_path):
+    path = tmp_path / "hands.bin"
+    finals = _FinalStacks()
+    with HandHistoryWriter(path) as writer:
+        sink = CompositeEventSink(HandHistoryRecorder(writer), finals)
+        GameOrchestrator(game_state, event_sink=sink, headless=True).run_game(20)
+    return HandHistoryReader(path), finals.stacks
+
+def test_replay_reproduces_recorded_hands(recorded):
+    reader, final_stacks = recorded
+    for record, stacks in zip(reader, final_stacks):
+        game_state = replay(HandLog.from_record(record))
+        assert game_state.status == GameStatus.HAND_COMPLETE
+        assert [s.stack for s in game_state.table.seats] == stacks
+        assert [c.id for c in game_state.table.community_cards] == [c.id for c in record.board]
+
+def test_replay_stops_before_requested_action(recorded):
+    reader, _ = recorded
+    record = reader[0]
+    log = HandLog.from_record(record)
+    game_state = replay(log, upto=3)
+    seat_index, action_type, _ = record.actions[3]
+    assert game_state.status == GameStatus.IN_PROGRESS
+    assert game_state.current_seat_index == seat_index
+    assert len(game_state.history) == 3
+
+def test_replay_rejects_action_out_of_turn(recorded):
+    reader, _ = recorded
+    log = HandLog.from_record(reader[0])
+    wrong_seat = log.actions[3].player_id
+    actions = log.actions[:2] + [Action(wrong_seat, ActionType.CALL)] + log.actions[2:]
+    with pytest.raises(ValueError):
+        replay(HandLog(**{**log.__dict__, "actions": actions}))
@@ -0,0 +1,94 @@
+# tests/services/test_stats_service.py
+from collections import Counter
+
+from app.models.action import Action
+from app.models.enum import ActionType, GameEvent, Round
+from app.models.events import CompositeEventSink, EventSink
+from app.services import action_service, hand_manager
+from app.services.stats_service import (
+    CBET_FACED, FOLD_TO_CBET, HANDS, PFR, THREE_BET_CHANCES, THREE_BETS, VPIP, PlayerStatsTracker,
+)
+from app.simulation.headless import build_game, run_headless
+
+def _act(game_state, seat_index, action_type, amount=None):
+    player_id = game_state.table.seats[seat_index].player.player_id
+    action_service.process_action(game_state, Action(player_id, action_type, amount))
+
+def test_scripted_hand_updates_counters():
+    game_state = build_game(3, stack=10000, big_blind=100, seed=1)
+    tracker = PlayerStatsTracker()
+    game_state.event_sink = tracker
+    hand_manager.start_new_hand(game_state)
+    seats = {s.position.value: s.index for s in game_state.table.seats if s.is_occupied}
+
+    # BTN がオープン、SB が 3ベット、BB はフォールド、BTN がコール
+    _act(game_state, seats["BTN"], ActionType.RAISE, 250)
+    _act(game_state, seats["SB"], ActionType.RAISE, 800)
+    _act(game_state, seats["BB"], ActionType.FOLD)
+    _act(game_state, seats["BTN"], ActionType.CALL)
+    # フロップで SB（最後のレイザー）が cベット、BTN がフォールド
+    game_state.current_round = Round.FLOP
+    hand_manager.proceed_to_next_round(game_state)
+    _act(game_state, seats["SB"], ActionType.BET, 800)
+    _act(game_state, seats["BTN"], ActionType.FOLD)
+
+    def counts(position):
+        return tracker.counts(game_state.table.seats[seats[position]].player.player_id)
+
+    btn, sb, bb = counts("BTN"), counts("SB"), counts("BB")
+    assert [btn[c] for c in (HANDS, VPIP, PFR, THREE_BET_CHANCES, CBET_FACED, FOLD_TO_CBET)] == [1, 1, 1, 0, 1, 1]
+    assert [sb[c] for c in (VPIP, PFR, THREE_BET_CHANCES, THREE_BETS)] == [1, 1, 1, 1]
+    assert [bb[c] for c in (VPIP, PFR, THREE_BET_CHANCES, THREE_BETS)] == [0, 0, 0, 0]
+
+    profile = tracker.profile(game_state.table.seats[seats["SB"]].player.player_id)
+    assert profile.vpip == 1.0 and profile.three_bet == 1.0 and profile.aggression_factor == 1.0
+    assert tracker.profile("unknown") is None
+
+def test_incremental_counters_match_recount_from_history():
+    class HistoryRecount(EventSink):
+        """ハンド終了時に履歴から VPIP / PFR を数え直す"""
+        def __init__(self):
+            self.hands, self.vpip, self.pfr = Counter(), Counter(), Counter()
+            self.game_state, self.flop_start = None, None
+
+        def emit(self, event, **data):
+            if event == GameEvent.HAND_STARTED:
+                self.game_state, self.flop_start = data["game_state"], None
+            elif event == GameEvent.ROUND_STARTED and data["round"] == Round.FLOP:
+                self.flop_start = len(self.game_state.history)
+            elif event == GameEvent.HAND_COMPLETE:
+                history = data["game_state"].history
+                for seat in data["game_state"].table.seats:
+                    if seat.is_occupied:
+                        self.hands[seat.player.player_id] += 1
+                preflop = history[:self.flop_start]
+                self.vpip.update({a.player_id for a in preflop if a.action_type in (ActionType.CALL, ActionType.RAISE)})
+                self.pfr.update({a.player_id for a in preflop if a.action_type == ActionType.RAISE})
+
+    game_state = build_game(6, seed=7)
+    tracker, recount = PlayerStatsTracker(capacity=2), HistoryRecount()
+    run_headless(game_state, 150, rebuy_stack=10000, event_sink=CompositeEventSink(tracker, recount))
+
+    assert len(tracker) == 6 and len(tracker.counters) >= 6
+    for player_id, hands in recount.hands.items():
+        counts = tracker.counts(player_id)
+        assert counts[HANDS] == hands
+        assert counts[PFR] <= counts[VPIP] <= counts[HANDS]
+        assert counts[VPIP] == recount.vpip[player_id]
+        assert counts[PFR] == recount.pfr[player_id]
+
+def test_interleaved_games_keep_their_own_hand_state():
+    """同じ tracker を共有する2つのゲームのハンドが交互に進んでも混ざらない"""
+    tracker = PlayerStatsTracker()
+    game_a, game_b = build_game(3, seed=1), build_game(3, seed=2)
+    game_a.event_sink, game_b.event_sink = tracker.game_sink(), tracker.game_sink()
+    hand_manager.start_new_hand(game_a)
+    hand_manager.start_new_hand(game_b)
+
+    raiser = game_a.table.seats[game_a.current_seat_index]
+    _act(game_a, raiser.index, ActionType.RAISE, 250)
+    counts = tracker.counts(raiser.player.player_id)
+    assert [counts[c] for c in (HANDS, VPIP, PFR)] == [1, 1, 1]
+    for seat in game_b.table.seats:
+        if seat.is_occupied:
+            assert tracker.counts(seat.player.player_id)[VPIP] == 0
@@ -0,0 +1,26 @@
+# tests/simulation/test_farm.py
+from app.simulation.farm import run_farm, make_jobs
+
+def test_farm_conserves_chips_and_counts_hands():
+    seen = []
+    summary = run_farm(tables=2, hands_per_table=30, num_players=4, seed=1, workers=1, chunk_size=20, on_hand=seen.append)
+    assert summary.hands == 60
+    assert len(seen) == 60
+    assert sum(summary.seat_deltas.values()) == 0
+    assert sum(summary.position_deltas.values()) == 0
+    assert sum(summary.position_hands.values()) == 60 * 4
+
+def test_farm_results_do_not_depend_on_workers():
+    kwargs = dict(tables=3, hands_per_table=20, num_players=3, seed=7, chunk_size=10)
+    single = run_farm(workers=1, **kwargs)
+    pooled = run_farm(workers=2, **kwargs)
+    assert dict(single.seat_deltas) == dict(pooled.seat_deltas)
+    assert dict(single.position_deltas) == dict(pooled.position_deltas)
+    assert single.showdowns == pooled.showdowns
+
+def test_jobs_split_hands_into_chunks():
+    jobs = list(make_jobs(tables=2, hands_per_table=25, chunk_size=10))
+    assert [(j.table_index, j.first_hand, j.hands) for j in jobs] == [
+        (0, 0, 10), (0, 10, 10), (0, 20, 5), (1, 0, 10), (1, 10, 10), (1, 20, 5),
+    ]
+    assert len({j.seed for j in jobs}) == len(jobs)
@@ -0,0 +1,56 @@
+# tests/simulation/test_vector_engine.py
+import numpy as np
+from app.models.enum import GameEvent
+from app.models.events import EventSink
+from app.services.game_orchestrator import GameOrchestrator
+from app.simulation.headless import build_game
+from app.simulation.vector_engine import VectorTables, ai_policy
+
+class _CaptureHandStart(EventSink):
+    """ハンド開始時（シャッフル直後）の GameState を配列に写しておく"""
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.engine = None
+
+    def emit(self, event, **data):
+        if event == GameEvent.HAND_STARTED:
+            self.engine = VectorTables.from_game_states([self.game_state])
+
+def test_matches_object_engine_hand_by_hand():
+    for seed in range(20):
+        game_state = build_game(2 + seed % 5, seed=seed)
+        rng = np.random.default_rng(seed)
+        for seat in game_state.table.seats:
+            if seat.is_occupied:
+                seat.stack = int(rng.integers(60, 3000))
+        sink = _CaptureHandStart(game_state)
+        orchestrator = GameOrchestrator(game_state, event_sink=sink, headless=True)
+        for _ in range(3):
+            orchestrator.play_hand()
+            engine = sink.engine
+            engine.start_hands(shuffle=False)
+            while engine.step(ai_policy):
+                pass
+            assert engine.stack[0].tolist() == [s.stack for s in game_state.table.seats]
+            assert engine.community_cards[0, :engine.community_count[0]].tolist() == [c.id for c in game_state.table.community_cards]
+            for seat in game_state.table.seats:
+                if seat.is_occupied and seat.stack == 0:
+                    seat.stack = 500
+
+def test_run_conserves_chips():
+    engine = VectorTables.create(num_tables=200, num_players=6, stack=1000, seed=3)
+    hands = engine.run(ai_policy, hands_per_table=5, rebuy_stack=1000)
+    assert hands == 1000
+    assert engine.stack.sum() == 200 * 6 * 1000
+
+def test_round_trip_through_game_state():
+    game_state = build_game(4, seed=1)
+    engine = VectorTables.create(num_tables=1, num_players=4, seed=5)
+    engine.start_hands()
+    engine.step(ai_policy)
+    engine.to_game_states([game_state])
+    again = VectorTables.from_game_states([game_state])
+    for name in ("stack", "current_bet", "bet_total", "status", "acted", "position", "hole_cards", "deck",
+                 "deck_position", "current_seat", "amount_to_call", "min_raise_amount", "last_raiser", "dealer"):
+        assert np.array_equal(getattr(engine, name), getattr(again, name)), name
+    assert game_state.table.pot_ledger.total == engine.bet_total.sum()
@@ -14,6 +14,12 @@ function App() {
     const [error, setError] = useState('');
     const [humanPlayer, setHumanPlayer] = useState(null);
 
+    // ゲームが始まったら状態の配信を購読する（ポーリングしない）
+    useEffect(() => {
+        if (!gameId) return undefined;
+        return api.subscribeGame(gameId, setGameState);
+    }, [gameId]);
+
     // gameStateが更新されたら、人間プレイヤーの情報を更新する
     useEffect(() => {
         if (gameState) {
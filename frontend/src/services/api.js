@@ -1,5 +1,7 @@
 // src/services/api.js
 const API_BASE_URL = 'http://localhost:8000'; // FastAPIサーバーのURL
+const WS_BASE_URL = API_BASE_URL.replace(/^http/, 'ws');
+const RECONNECT_DELAY_MS = 1000;
 
 const request = async (endpoint, options = {}) => {
     const url = `${API_BASE_URL}${endpoint}`;
@@ -19,6 +21,56 @@ const request = async (endpoint, options = {}) => {
     return response.json();
 };
 
+// 差分を状態に適用する（変わったフィールドを上書きし、座席は index で差し替える）
+const applyDelta = (state, delta) => {
+    const seats = [...state.seats];
+    for (const seat of delta.seats) {
+        seats[seat.index] = seat;
+    }
+    return { ...state, ...delta.changes, seats };
+};
+
+// ゲームの状態の配信を購読する。接続時にスナップショット、その後は差分を受け取り、
+// 状態が変わるたびに onState(state) を呼ぶ。切断されたら最後のバージョンから再開する。
+// 戻り値の関数を呼ぶと購読をやめる。
+const subscribeGame = (gameId, onState) => {
+    let state = null;
+    let version = null;
+    let socket = null;
+    let closed = false;
+
+    const connect = () => {
+        const since = version === null ? '' : `?since=${version}`;
+        socket = new WebSocket(`${WS_BASE_URL}/games/${gameId}/ws${since}`);
+        socket.onmessage = (event) => {
+            const update = JSON.parse(event.data);
+            if (update.type === 'snapshot') {
+                state = update.state;
+            } else if (state !== null && update.version === version + 1) {
+                state = applyDelta(state, update);
+            } else {
+                // 差分が抜けたらスナップショットから取り直す
+                version = null;
+                socket.close();
+                return;
+            }
+            version = update.version;
+            onState(state);
+        };
+        socket.onclose = () => {
+            if (!closed) {
+                setTimeout(connect, RECONNECT_DELAY_MS);
+            }
+        };
+    };
+
+    connect();
+    return () => {
+        closed = true;
+        socket.close();
+    };
+};
+
 const api = {
     createGame: (data) => {
         return request('/games', {
@@ -39,7 +91,8 @@ const api = {
          return request(`/games/${gameId}/next_hand`, {
             method: 'POST',
         });
-    }
+    },
+    subscribeGame,
 };
 
 export default api;
\ No newline at end of file